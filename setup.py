@@ -140,6 +140,7 @@ main_sources = [
     "torch/csrc/Storage.cpp",
     "torch/csrc/utils.cpp",
     "torch/csrc/serialization.cpp",
+    "torch/csrc/allocators.cpp",
 ]
 
 try:
@@ -55,6 +55,21 @@ class TestAutograd(TestCase):
         z.backward(torch.ones(5, 5))
         self.assertEqual(counter[0], 5)
 
+    def test_sparse_mm(self):
+        indices = torch.LongTensor([[0, 2, 1, 2], [1, 0, 3, 1]])
+        sparse = Variable(torch.sparse.DoubleTensor(indices, torch.randn(4),
+            torch.LongStorage([3, 4])))
+        dense = Variable(torch.randn(4, 5))
+        output = SparseMM()(sparse, dense)[0]
+        self.assertEqual(output.data, torch.mm(sparse.data.toDense(), dense.data))
+
+        grad_output = torch.randn(3, 5)
+        output.backward(grad_output)
+        self.assertEqual(dense.grad, torch.mm(sparse.data.toDense().t(), grad_output))
+        dense_grad = torch.mm(grad_output, dense.data.t())
+        self.assertEqual(sparse.grad.toDense(),
+            dense_grad.mul(sparse.data.toDense().ne(0).double()))
+
 
 L = 20
 M = 10
@@ -65,6 +80,13 @@ tests = [
     (Mul, (), ((M, M), (M, M))),
     (Div, (), ((M, M), torch.rand(M, M) + 1e-2)),
     (Pow, (), (torch.rand(M, M), torch.rand(M, M) + 0.1)),
+    (Add, (), ((M, M), (M,)), 'broadcast'),
+    (Sub, (), ((M, 1), (1, M)), 'broadcast'),
+    (Mul, (), ((S, 1, S), (S, S)), 'broadcast'),
+    (Div, (), ((M, M), torch.rand(1, M) + 1e-2), 'broadcast'),
+    (Pow, (), (torch.rand(S, S) + 1e-2, torch.rand(S, 1)), 'broadcast'),
+    (Mul, (), ((M, 1), (1, M)), 'broadcast_same_numel'),
+    (Add, (), ((S, M), (M, S)), 'same_numel'),
     (AddConstant, (3.14,), ((L, L),)),
     (SubConstant, (3.14,), ((L, L),)),
     (SubConstant, (3.14, True), ((L, L),), 'from_tensor'),
@@ -76,6 +98,9 @@ tests = [
     (Index, (1, 2), (torch.rand(S, S, S),)),
     (Index, (slice(0, 3),), (torch.rand(S, S, S),), 'slice'),
     (View, (S*S, S), (torch.rand(S, S, S),)),
+    (BMM, (), ((S, M, S), (S, S, M))),
+    (BAddBMM, (), ((S, M, M), (S, M, S), (S, S, M))),
+    (BAddBMM, (0.5, 2), ((S, M, M), (S, M, S), (S, S, M)), 'coef'),
     (Exp,  (), (torch.rand(S, S, S),)),
     (Log,  (), (torch.rand(S, S, S) + 1e-2,)),
     (Log1p,  (), (torch.rand(S, S, S),)),
@@ -238,6 +238,11 @@ tests = [
     OldModuleTest(nn.MM,
                     input_size=[(4, 5, 3), (4, 3, 2)],
                     reference_fn=lambda i,_: torch.bmm(*i)),
+    OldModuleTest(nn.MM,
+                    (True, True),
+                    input_size=[(4, 3, 5), (4, 2, 3)],
+                    reference_fn=lambda i,_: torch.bmm(i[0].transpose(1, 2), i[1].transpose(1, 2)),
+                    desc='transposed'),
     OldModuleTest(nn.MV,
                     input_size=[(4, 5, 3), (4, 3)],
                     reference_fn=lambda i,_: torch.bmm(i[0], i[1].view(i[1].size(0), i[1].size(1), 1)).squeeze()),
@@ -745,6 +750,15 @@ class TestNN(NNTestCase):
         gradInput = module.backward(input.clone(), input.clone())
         self.assertLess(abs(gradInput.mean() - (1-p)), 0.05)
 
+        # The mask stays a ByteTensor after type conversions
+        self.assertIsInstance(module.noise, torch.ByteTensor)
+        module.double()
+        self.assertIsInstance(module.noise, torch.ByteTensor)
+        input = input.double()
+        output = module.forward(input.clone())
+        gradInput = module.backward(input.clone(), input.clone())
+        self.assertEqual(output, gradInput, 0)
+
     def test_SpatialDropout(self):
         p = 0.2
         b = random.randint(1, 5)
@@ -774,6 +788,29 @@ class TestNN(NNTestCase):
         gradInput = module.backward(input, input)
         self.assertLess(abs(gradInput.mean() - (1-p)), 0.05)
 
+    def test_quantize(self):
+        model = nn.Sequential()
+        model.add(nn.SpatialConvolution(3, 4, 3, 3, 1, 1, 1, 1))
+        model.add(nn.ReLU())
+        model.add(nn.View(2, 4 * 5 * 6))
+        model.add(nn.Linear(4 * 5 * 6, 10))
+        inputs = [torch.randn(2, 3, 5, 6) for i in range(2)]
+        expected = model.forward(inputs[0]).clone()
+        self.assertRaises(ValueError, lambda: model.quantize())
+        self.assertEqual(model.quantize(*inputs), 2)
+        self.assertIsInstance(model.modules[0], nn.QuantizedSpatialConvolution)
+        self.assertIsInstance(model.modules[3], nn.QuantizedLinear)
+        self.assertEqual(model.modules[0].inputRange, max(i.abs().max() for i in inputs))
+        output = model.forward(inputs[0])
+        self.assertIs(output, model.output)
+        self.assertEqual(output, expected, 0.05)
+        self.assertRaises(RuntimeError, lambda: model.backward(inputs[0], output))
+
+        model.float()
+        self.assertIsInstance(model.modules[3].quantizedWeight, torch.CharTensor)
+        self.assertIsInstance(model.modules[3].weightScale, torch.FloatTensor)
+        self.assertEqual(model.forward(inputs[0].float()).double(), output, 1e-4)
+
     def test_ReLU_reference(self):
         input = torch.randn(10, 20)
         module = nn.ReLU()
@@ -1170,6 +1207,99 @@ class TestNN(NNTestCase):
         output = module.forward(input)
         self.assertEqual(output, input[2:5])
 
+    def test_Sequential_planMemory(self):
+        model = nn.Sequential()
+        model.add(nn.Linear(10, 20))
+        model.add(nn.ReLU(True))
+        model.add(nn.Linear(20, 30))
+        model.add(nn.View(2, 60))
+        model.add(nn.Tanh())
+        model.add(nn.Linear(60, 5))
+        model.evaluate()
+        input = torch.randn(4, 10)
+        expected = model.forward(input).clone()
+
+        self.assertIs(model.planMemory(), model)
+        for i in range(3):
+            self.assertEqual(model.forward(input), expected, 0)
+        # The outputs of Linear (and ReLU), Linear (and View), Tanh and Linear
+        # alternate between two buffers
+        storages = [m.output.storage()._cdata for m in model.modules]
+        self.assertEqual(len(set(storages)), 2)
+        self.assertEqual(storages[0], storages[4])
+        self.assertEqual(storages[2], storages[5])
+        self.assertNotEqual(storages[0], storages[2])
+
+        # A new plan is made for a new input size
+        input = torch.randn(8, 10)
+        model.modules[3].resetSize(4, 60)
+        model.planMemory(False)
+        expected = model.forward(input).clone()
+        self.assertEqual(len(set(m.output.storage()._cdata for m in model.modules)), 4)
+        model.planMemory()
+        for i in range(2):
+            self.assertEqual(model.forward(input), expected, 0)
+        self.assertEqual(len(set(m.output.storage()._cdata for m in model.modules)), 2)
+
+        # Every module has its own output again in training mode
+        model.training()
+        model.forward(input)
+        self.assertEqual(len(set(m.output.storage()._cdata for m in model.modules)), 4)
+
+    def test_Sequential_foldBatchNorm(self):
+        def randomize(bn):
+            bn.running_mean.uniform_(-1, 1)
+            bn.running_var.uniform_(0.5, 2)
+            if bn.weight is not None:
+                bn.weight.uniform_(0.5, 2)
+                bn.bias.uniform_(-1, 1)
+            return bn
+
+        model = nn.Sequential()
+        model.add(nn.SpatialConvolution(3, 4, 3, 3))
+        model.add(randomize(nn.SpatialBatchNormalization(4)))
+        model.add(nn.ReLU())
+        model.add(nn.View(2, 64))
+        model.add(nn.Linear(64, 5).noBias())
+        model.add(randomize(nn.BatchNormalization(5, affine=False)))
+        model.add(randomize(nn.BatchNormalization(5)))
+        input = torch.randn(2, 3, 6, 6)
+
+        # Batch normalization in training mode isn't folded
+        self.assertEqual(model.foldBatchNorm(), 0)
+        model.evaluate()
+        expected = model.forward(input).clone()
+        self.assertEqual(model.foldBatchNorm(input), 3)
+        self.assertEqual(len(model), 4)
+        self.assertEqual(model.forward(input), expected, 1e-8)
+        self.assertIs(model.output, model.modules[-1].output)
+
+        # The model is left unchanged if the outputs differ
+        model.add(randomize(nn.BatchNormalization(5)))
+        model.modules[-1].evaluate()
+        weight = model.modules[3].weight
+        self.assertRaises(RuntimeError, lambda: model.foldBatchNorm(input, -1))
+        self.assertEqual(len(model), 5)
+        self.assertIs(model.modules[3].weight, weight)
+
+    def test_summary(self):
+        from torch.nn import summary
+        model = nn.Sequential()
+        model.add(nn.SpatialConvolution(3, 4, 3, 3))
+        model.add(nn.ReLU())
+        model.add(nn.View(2, 64))
+        model.add(nn.Linear(64, 5))
+        result = summary(model, torch.randn(2, 3, 6, 6))
+        self.assertEqual([layer.name for layer in result.layers],
+            ['SpatialConvolution', 'ReLU', 'View', 'Linear'])
+        self.assertEqual(result.layers[0].output_size, (2, 4, 4, 4))
+        self.assertEqual(result.layers[0].parameters, 4 * 3 * 3 * 3 + 4)
+        self.assertEqual(result.layers[0].flops, 2 * 128 * 27)
+        self.assertEqual(result.layers[3].flops, 2 * 10 * 64)
+        self.assertEqual(result.parameters, 112 + 325)
+        self.assertEqual(model.forward(torch.randn(2, 3, 6, 6)).size(), (2, 5))
+        self.assertNotIn('updateOutput', model.modules[0].__dict__)
+
 
 if __name__ == '__main__':
     prepare_tests()
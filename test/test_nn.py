@@ -1,7 +1,11 @@
+import os
 import math
+import shutil
 import torch
+import tempfile
 import unittest
 from copy import deepcopy
+from itertools import product
 
 import torch.nn as nn
 from torch.autograd import Variable
@@ -127,6 +131,343 @@ class TestNN(NNTestCase):
         self.assertEqual(counter['forwards'], 13)
         self.assertEqual(counter['backwards'], 7)
 
+    def test_load_into(self):
+        model = nn.Sequential(nn.Linear(10, 5), nn.Tanh(), nn.Linear(5, 2))
+        other = nn.Sequential(nn.Linear(10, 5), nn.Tanh(), nn.Linear(5, 2))
+        weight = other[0].weight.data
+        with tempfile.TemporaryFile() as f:
+            torch.save(model, f)
+            f.seek(0)
+            torch.load_into(f, other)
+        # Parameters are loaded into the existing tensors
+        self.assertIs(other[0].weight.data, weight)
+        for i in (0, 2):
+            self.assertEqual(other[i].weight.data, model[i].weight.data, 0)
+            self.assertEqual(other[i].bias.data, model[i].bias.data, 0)
+        input = Variable(torch.randn(3, 10))
+        self.assertEqual(model(input), other(input), 0)
+
+    def test_dropout(self):
+        p = 0.2
+        input = torch.Tensor(1000).fill_(1-p)
+
+        for inplace in (False, True):
+            module = nn.Dropout(p, inplace)
+            input_var = Variable(input.clone())
+            output = module(input_var)
+            self.assertLess(abs(output.data.mean() - (1-p)), 0.05)
+            # Gradients are masked in the same way as the output
+            output.backward(input.clone())
+            self.assertEqual(input_var.grad, output.data, 0)
+            self.assertIsInstance(output.creator.mask, torch.ByteTensor)
+
+        module = nn.Dropout(p)
+        module.train = False
+        self.assertEqual(module(Variable(input)).data, input, 0)
+        self.assertRaises(ValueError, lambda: nn.Dropout(1)(Variable(input)))
+
+    def test_conv2d_algorithms(self):
+        # (in_channels, out_channels, kh, kw, dh, dw, padh, padw), input size
+        cases = [
+            ((3, 4, 1, 1), (2, 3, 5, 6)),
+            ((3, 4, 3, 3, 1, 1, 1, 1), (2, 3, 7, 6)),
+            ((3, 4, 3, 3), (2, 3, 6, 5)),
+            ((2, 3, 5, 5, 1, 1, 2, 2), (2, 2, 9, 8)),
+            ((2, 3, 5, 7, 2, 3, 1, 0), (2, 2, 12, 11)),
+        ]
+        for args, input_size in cases:
+            module = nn.Conv2d(*args)
+            input = torch.randn(*input_size)
+            module.algorithm = 'mm'
+            input_var = Variable(input.clone())
+            expected = module(input_var)
+            grad_output = torch.randn(expected.size())
+            expected.backward(grad_output)
+            expected_grad_weight = module.weight.grad.clone()
+            for algorithm in ('1x1', 'winograd', 'fft'):
+                module.algorithm = algorithm
+                input_var_alg = Variable(input.clone())
+                try:
+                    output = module(input_var_alg)
+                except ValueError:
+                    continue
+                self.assertEqual(output.data, expected.data, PRECISION)
+                # Gradients are computed by the MM implementation
+                module.zero_grad_parameters()
+                output.backward(grad_output)
+                self.assertEqual(input_var_alg.grad, input_var.grad, PRECISION)
+                self.assertEqual(module.weight.grad, expected_grad_weight, PRECISION)
+
+        module = nn.Conv2d(3, 4, 3, 3, 2, 2)
+        module.algorithm = 'winograd'
+        self.assertRaises(ValueError, lambda: module(Variable(torch.randn(2, 3, 6, 6))))
+
+    def test_conv2d_autotuner(self):
+        from torch.nn.functions import conv
+        module = nn.Conv2d(3, 4, 3, 3, 1, 1, 1, 1)
+        input = Variable(torch.randn(2, 3, 6, 6))
+        module.algorithm = 'mm'
+        expected = module(input).data
+        module.algorithm = None
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, 'algorithms.json')
+        conv.clear_algorithm_cache()
+        conv.set_algorithm_cache_file(path)
+        try:
+            self.assertEqual(module(input).data, expected, PRECISION)
+            self.assertEqual(len(conv._algorithm_cache), 1)
+            algorithm = list(conv._algorithm_cache.values())[0]
+            self.assertIn(algorithm, ('mm', 'winograd'))
+            # 2x2 kernels aren't benchmarked, because there's only one
+            # algorithm for them
+            nn.Conv2d(3, 4, 2, 2)(input)
+            self.assertEqual(len(conv._algorithm_cache), 1)
+            conv.clear_algorithm_cache()
+            conv.set_algorithm_cache_file(path)
+            self.assertEqual(list(conv._algorithm_cache.values()), [algorithm])
+            self.assertEqual(module(input).data, expected, PRECISION)
+        finally:
+            conv.set_algorithm_cache_file(None)
+            conv.clear_algorithm_cache()
+            shutil.rmtree(tmpdir)
+
+    def test_fold_batchnorm(self):
+        def randomize(bn):
+            bn.running_mean.uniform_(-1, 1)
+            bn.running_var.uniform_(0.5, 2)
+            bn.bias.data.uniform_(-1, 1)
+            bn.train = False
+            return bn
+
+        model = nn.Sequential(
+            nn.Conv2d(3, 4, 3, 3),
+            'bn', randomize(nn.BatchNorm2d(4)),
+            nn.ReLU(),
+        )
+        input = Variable(torch.randn(2, 3, 6, 6))
+        expected = model(input).data.clone()
+        self.assertEqual(model.fold_batchnorm(input), 1)
+        self.assertEqual(len(model.modules), 2)
+        self.assertFalse(hasattr(model, 'bn'))
+        self.assertEqual(model(input).data, expected, 1e-8)
+
+        model = nn.Sequential(nn.Linear(10, 5), randomize(nn.BatchNorm(5)))
+        model[1].train = True
+        self.assertEqual(model.fold_batchnorm(), 0)
+        model[1].train = False
+        weight = model[0].weight.data
+        self.assertRaises(RuntimeError, lambda: model.fold_batchnorm(Variable(torch.randn(3, 10)), -1))
+        self.assertEqual(len(model.modules), 2)
+        self.assertIs(model[0].weight.data, weight)
+
+
+    def test_quantize(self):
+        from torch.nn.functions.quantized import quantize_weight
+        def dequantize(module, input):
+            scale = module.input_range / 127
+            input = input.div(scale).round_().clamp_(-127, 127).mul_(scale)
+            weight = module.quantized_weight.double()
+            weight.mul_(module.weight_scale.view(-1, 1).expandAs(weight))
+            return input, weight
+
+        model = nn.Sequential(nn.Linear(37, 21), nn.Tanh(), nn.Linear(21, 5))
+        inputs = [Variable(torch.randn(7, 37)) for i in range(3)]
+        expected = model(inputs[0]).data.clone()
+        self.assertRaises(ValueError, lambda: model.quantize())
+        self.assertEqual(model.quantize(*inputs), 2)
+        self.assertIsInstance(model[0], nn.QuantizedLinear)
+        self.assertIsInstance(model[2], nn.QuantizedLinear)
+        self.assertEqual(model[0].input_range, max(i.data.abs().max() for i in inputs))
+        output = model(inputs[0]).data
+        self.assertLess((output - expected).abs().max(), 0.05)
+        # Apart from the rounding of the input and weight, the result is exact
+        input, weight = dequantize(model[0], inputs[0].data)
+        self.assertEqual(model[0](inputs[0]).data,
+                torch.mm(input, weight.t()) + model[0].bias.data.view(1, -1).expand(7, 21),
+                1e-10)
+
+        model = nn.Sequential(nn.Conv2d(3, 4, 3, 3, 2, 2, 1, 1), nn.ReLU())
+        input = Variable(torch.randn(2, 3, 7, 6))
+        expected = model(input).data.clone()
+        model.quantize(input)
+        self.assertIsInstance(model[0], nn.QuantizedConv2d)
+        self.assertEqual(model(input).data, expected, 0.05)
+        conv = nn.Conv2d(3, 4, 3, 3, 2, 2, 1, 1)
+        conv.algorithm = 'mm'
+        input, conv.weight.data = dequantize(model[0], input.data)
+        conv.weight.data = conv.weight.data.view(4, 3, 3, 3)
+        conv.bias.data = model[0].bias.data
+        self.assertEqual(model[0](Variable(input)).data, conv(Variable(input)).data, 1e-10)
+
+        weight, scale = quantize_weight(torch.Tensor([[1, -2, 0.5], [0, 0, 0]]))
+        self.assertIsInstance(weight, torch.CharTensor)
+        self.assertEqual(weight, torch.CharTensor([[64, -127, 32], [0, 0, 0]]))
+        self.assertEqual(scale, torch.Tensor([2. / 127, 1]))
+
+    def test_sparse_linear(self):
+        indices = torch.LongTensor([[0, 0, 2, 3, 3], [1, 7, 4, 0, 7]])
+        input = torch.sparse.DoubleTensor(indices, torch.randn(5), torch.LongStorage([4, 8]))
+        module = nn.SparseLinear(8, 3)
+        linear = nn.Linear(8, 3)
+        linear.weight.data.copy_(module.weight.data)
+        linear.bias.data.copy_(module.bias.data)
+
+        output = module(Variable(input, requires_grad=False))
+        expected = linear(Variable(input.toDense()))
+        self.assertEqual(output.data, expected.data)
+        grad_output = torch.randn(4, 3)
+        output.backward(grad_output)
+        expected.backward(grad_output)
+        self.assertEqual(module.weight.grad, linear.weight.grad)
+        self.assertEqual(module.bias.grad, linear.bias.grad)
+
+        # A batch without specified elements
+        module.zero_grad_parameters()
+        output = module(Variable(torch.sparse.DoubleTensor(4, 8), requires_grad=False))
+        self.assertEqual(output.data, module.bias.data.view(1, 3).expand(4, 3))
+        output.backward(grad_output)
+        self.assertEqual(module.weight.grad, torch.zeros(3, 8))
+        self.assertEqual(module.bias.grad, grad_output.sum(0).view(3))
+
+    def test_embedding(self):
+        module = nn.Embedding(10, 4)
+        indices = torch.LongTensor([[1, 5, 1], [7, 5, 1]])
+        output = module(Variable(indices, requires_grad=False))
+        self.assertEqual(output.data.size(), torch.LongStorage([2, 3, 4]))
+        for i, j in product(range(2), range(3)):
+            self.assertEqual(output.data[i][j], module.weight.data[indices[i][j]])
+
+        grad_output = torch.randn(2, 3, 4)
+        output.backward(grad_output)
+        grad = module.weight.grad
+        self.assertTrue(torch.sparse.isSparse(grad))
+        self.assertEqual(grad.indices(), torch.LongTensor([[1, 5, 7]]))
+        expected = torch.zeros(10, 4)
+        for i, j in product(range(2), range(3)):
+            expected[indices[i][j]].add_(grad_output[i][j])
+        self.assertEqual(grad.toDense(), expected)
+        module(Variable(indices, requires_grad=False)).backward(grad_output)
+        self.assertEqual(module.weight.grad.toDense(), expected.mul(2))
+
+        weight = module.weight.data.clone()
+        module.weight.grad.addTo(module.weight.data, -0.1)
+        self.assertEqual(module.weight.data, weight.add(-0.2, expected))
+        module.weight.grad.zero_()
+        self.assertEqual(module.weight.grad.nnz(), 0)
+
+        module = nn.Embedding(10, 4, max_norm=1)
+        weight = module.weight.data.clone()
+        module(Variable(indices.view(-1), requires_grad=False))
+        for i in range(10):
+            if i in (1, 5, 7):
+                self.assertLessEqual(module.weight.data[i].norm(), 1 + 1e-6)
+            else:
+                self.assertEqual(module.weight.data[i], weight[i])
+
+    def test_bilinear(self):
+        from torch.legacy import nn as legacy
+        module = nn.Bilinear(5, 4, 3)
+        legacy_module = legacy.Bilinear(5, 4, 3)
+        legacy_module.weight.copy_(module.weight.data)
+        legacy_module.bias.copy_(module.bias.data)
+        input1, input2 = Variable(torch.randn(6, 5)), Variable(torch.randn(6, 4))
+        legacy_input = [input1.data, input2.data]
+
+        output = module(input1, input2)
+        self.assertEqual(output.data, legacy_module.forward(legacy_input))
+        grad_output = torch.randn(6, 3)
+        output.backward(grad_output)
+        legacy_module.zeroGradParameters()
+        grad_input = legacy_module.backward(legacy_input, grad_output)
+        self.assertEqual(input1.grad, grad_input[0])
+        self.assertEqual(input2.grad, grad_input[1])
+        self.assertEqual(module.weight.grad, legacy_module.gradWeight)
+        self.assertEqual(module.bias.grad, legacy_module.gradBias)
+
+    def _check_rnn(self, module, num_states, step):
+        seq_len, batch_size = 4, 3
+        input = torch.randn(seq_len, batch_size, module.input_size)
+        states = [torch.randn(batch_size, module.hidden_size) for i in range(num_states)]
+        output = module(Variable(input), *[Variable(s) for s in states])
+
+        expected_states = [s.clone() for s in states]
+        for t in range(seq_len):
+            expected_states = step(input[t], *expected_states)
+            self.assertEqual(output[0].data[t], expected_states[0])
+        for result, expected in zip(output[1:], expected_states):
+            self.assertEqual(result.data, expected)
+
+        # Gradients of sum(output[k] * grad_output[k]) vs finite differences
+        variables = [Variable(input)] + [Variable(s) for s in states]
+        output = module(*variables)
+        grad_output = [torch.randn(o.data.size()) for o in output]
+        for p in module.parameters():
+            p.grad.zero_()
+        for o, g in zip(output, grad_output):
+            o.backward(g)
+        def loss():
+            output = module(*[Variable(v.data) for v in variables])
+            return sum((o.data * g).sum() for o, g in zip(output, grad_output))
+        for v in variables + list(module.parameters()):
+            flat = v.data.view(-1)
+            grad = v.grad.contiguous().view(-1)
+            for i in range(0, flat.nElement(), 5):
+                orig = flat[i]
+                flat[i] = orig + 1e-6
+                loss_plus = loss()
+                flat[i] = orig - 1e-6
+                loss_minus = loss()
+                flat[i] = orig
+                self.assertEqual((loss_plus - loss_minus) / 2e-6, grad[i], 1e-5)
+
+    def test_lstm(self):
+        module = nn.LSTM(5, 6)
+        def gates(input, h):
+            gates = torch.mm(input, module.weight_ih.data.t())
+            gates += torch.mm(h, module.weight_hh.data.t())
+            gates += (module.bias_ih.data + module.bias_hh.data).view(1, -1).expandAs(gates)
+            return gates.chunk(4, 1)
+        def step(input, h, c):
+            i, f, g, o = gates(input, h)
+            c = f.sigmoid() * c + i.sigmoid() * g.tanh()
+            return o.sigmoid() * c.tanh(), c
+        self._check_rnn(module, 2, step)
+
+    def test_gru(self):
+        module = nn.GRU(5, 6)
+        def step(input, h):
+            input_gates = torch.mm(input, module.weight_ih.data.t())
+            input_gates += module.bias_ih.data.view(1, -1).expandAs(input_gates)
+            hidden_gates = torch.mm(h, module.weight_hh.data.t())
+            hidden_gates += module.bias_hh.data.view(1, -1).expandAs(hidden_gates)
+            ir, iz, in_ = input_gates.chunk(3, 1)
+            hr, hz, hn = hidden_gates.chunk(3, 1)
+            r = (ir + hr).sigmoid()
+            z = (iz + hz).sigmoid()
+            n = (in_ + r * hn).tanh()
+            return (1 - z) * n + z * h,
+        self._check_rnn(module, 1, step)
+
+    def test_summary(self):
+        model = nn.Sequential(
+            nn.Linear(10, 20),
+            nn.ReLU(),
+            nn.Linear(20, 5),
+        )
+        result = nn.summary(model, Variable(torch.randn(4, 10)))
+        self.assertEqual([layer.name for layer in result.layers], ['Linear', 'ReLU', 'Linear'])
+        self.assertEqual([layer.output_size for layer in result.layers],
+            [(4, 20), (4, 20), (4, 5)])
+        self.assertEqual([layer.parameters for layer in result.layers], [220, 0, 105])
+        self.assertEqual([layer.flops for layer in result.layers],
+            [2 * 4 * 20 * 10, 4 * 20, 2 * 4 * 5 * 20])
+        self.assertEqual(result.parameters, 325)
+        self.assertEqual(result.activation_bytes, (80 + 80 + 20) * 8)
+        self.assertEqual(result.peak_training_bytes, (40 + 2 * 325 + 180 + 80) * 8)
+        self.assertEqual(len(repr(result).split('\n')), 8)
+        # The hooks are removed
+        self.assertEqual(len(model.modules[0].forward_hooks), 0)
+
 
 def add_test(test):
     test_name = test.get_name()
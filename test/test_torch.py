@@ -1,7 +1,12 @@
+import io
+import os
 import sys
+import array
 import math
 import random
+import operator
 import torch
+import shutil
 import tempfile
 import unittest
 from itertools import product
@@ -9,6 +14,15 @@ from common import TestCase, iter_indices
 
 SIZE = 100
 
+def _fill_shared_tensor(queue):
+    queue.get().fill_(3)
+
+
+def _sum_shared_tensor(queue, ready, result):
+    ready.wait()
+    result.put(queue.get().sum())
+
+
 class TestTorch(TestCase):
 
     def test_dot(self):
@@ -445,7 +459,7 @@ class TestTorch(TestCase):
         self.assertEqual(res5, res.sum(0)[0])
 
         res6 = torch.addbmm(.1,res2,.5,b1,b2)
-        self.assertEqual(res6, res2 * .1 + res.sum(0) * .5)
+        self.assertEqual(res6, res2 * .1 + res.sum(0)[0] * .5)
 
     def test_baddbmm(self):
         num_batches = 10
@@ -1939,6 +1953,58 @@ class TestTorch(TestCase):
         self.assertEqual(tensor.expand(8, 5).size().tolist(), target)
         self.assertEqual(tensor.expand(torch.LongStorage((8, 5))).size().tolist(), target)
 
+        # New leading dimensions are added with a stride of 0
+        tensor = torch.rand(5)
+        result = tensor.expand(3, 2, 5)
+        self.assertEqual(result.size().tolist(), [3, 2, 5])
+        self.assertEqual(result.stride().tolist(), [0, 0, 1])
+        self.assertEqual(result[2][1], tensor, 0)
+        self.assertRaises(ValueError, lambda: tensor.expand(3, 4))
+        self.assertRaises(ValueError, lambda: torch.rand(2, 5).expand(5))
+
+    def test_broadcast(self):
+        a = torch.rand(4, 1, 3)
+        b = torch.rand(5, 1)
+        for op in (operator.add, operator.sub, operator.mul, operator.truediv, operator.mod):
+            result = op(a, b)
+            self.assertEqual(result.size().tolist(), [4, 5, 3])
+            for i, j, k in product(range(4), range(5), range(3)):
+                self.assertEqual(result[i][j][k], op(a[i][0][k], b[j][0]))
+            self.assertEqual(op(b, a).size().tolist(), [4, 5, 3])
+
+        bias = torch.rand(3)
+        x = torch.rand(6, 3)
+        self.assertEqual(x + bias, x + bias.view(1, 3).repeatTensor(6, 1), 0)
+        y = x.clone()
+        y += bias
+        self.assertEqual(y, x + bias, 0)
+        y = x.clone()
+        y /= bias
+        self.assertEqual(y, x / bias, 0)
+        self.assertEqual(bias.stride().tolist(), [1])
+        self.assertRaises(ValueError, lambda: x + torch.rand(4))
+        def iadd():
+            y = bias.clone()
+            y += x
+        self.assertRaises(ValueError, iadd)
+        # Shapes that can be broadcast are, even with the same number of
+        # elements
+        c, d = torch.rand(4, 1), torch.rand(1, 4)
+        self.assertEqual((c * d).size().tolist(), [4, 4])
+        self.assertEqual((torch.rand(3) + torch.rand(3, 1)).size().tolist(), [3, 3])
+        y = torch.rand(1, 4)
+        y += torch.rand(4)
+        self.assertEqual(y.size().tolist(), [1, 4])
+        # Tensors with the same number of elements whose shapes can't be
+        # broadcast are still combined element-wise
+        e, f = torch.rand(2, 3), torch.rand(3, 2)
+        self.assertEqual((e + f).size().tolist(), [2, 3])
+        self.assertEqual((e + f).view(-1).tolist(),
+                [a + b for a, b in zip(e.view(-1).tolist(), f.view(-1).tolist())])
+        y = e.clone()
+        y += torch.ones(6)
+        self.assertEqual(y, e + 1)
+
     def test_repeatTensor(self):
         result = torch.Tensor()
         tensor = torch.rand(8, 4)
@@ -1953,6 +2019,37 @@ class TestTorch(TestCase):
         self.assertEqual(result.size().tolist(), target, 'Error in repeatTensor using result and LongStorage')
         self.assertEqual((result.mean(0).view(8, 4)-tensor).abs().max(), 0, 'Error in repeatTensor (not equal)')
 
+        x = torch.range(1, 6).view(2, 3)
+        self.assertEqual(x.repeatTensor(2, 2).tolist(),
+                [[1, 2, 3, 1, 2, 3], [4, 5, 6, 4, 5, 6]] * 2)
+        self.assertEqual(x.t().repeatTensor(1, 2).tolist(), [[1, 4, 1, 4], [2, 5, 2, 5], [3, 6, 3, 6]])
+        self.assertEqual(torch.range(1, 3).repeatTensor(2).tolist(), [1, 2, 3, 1, 2, 3])
+        self.assertEqual(x.repeatTensor([2, 2]), x.repeatTensor(2, 2), 0)
+        self.assertEqual(x.repeatTensor((2, 1, 2)), x.repeatTensor(2, 1, 2), 0)
+        volume = torch.rand(2, 3, 4, 5, 6).transpose(1, 3)
+        result = volume.repeatTensor(2, 1, 3, 1, 2, 1)
+        self.assertEqual(result.size().tolist(), [2, 2, 15, 4, 6, 6])
+        for i, j, k in product(range(2), range(3), range(2)):
+            self.assertEqual(result[i].narrow(1, j * 5, 5).narrow(3, k * 3, 3), volume, 0)
+
+    def test_tile(self):
+        x = torch.range(1, 6).view(2, 3)
+        self.assertEqual(x.tile(2).tolist(), [[1, 2, 3, 1, 2, 3], [4, 5, 6, 4, 5, 6]])
+        self.assertEqual(x.tile(2, 1), x.repeatTensor(2, 1), 0)
+        self.assertEqual(x.tile(2, 1, 1), x.repeatTensor(2, 1, 1), 0)
+        self.assertEqual(x.tile([2, 1]), x.repeatTensor(2, 1), 0)
+
+    def test_asStrided(self):
+        x = torch.range(1, 10)
+        self.assertEqual(x.asStrided((3, 2), (3, 1)).tolist(), [[1, 2], [4, 5], [7, 8]])
+        self.assertEqual(x.asStrided((2, 2), (0, 2), 5).tolist(), [[6, 8], [6, 8]])
+        view = x.narrow(0, 2, 5).asStrided((2,), (3,))
+        self.assertEqual(view.tolist(), [3, 6])
+        view.fill_(0)
+        self.assertEqual(x[2], 0)
+        self.assertRaises(RuntimeError, lambda: x.asStrided((3, 4), (4, 1)))
+        self.assertRaises(RuntimeError, lambda: x.asStrided((3,), (1, 1)))
+
     def test_isSameSizeAs(self):
         t1 = torch.Tensor(3, 4, 9, 10)
         t2 = torch.Tensor(3, 4)
@@ -2096,6 +2193,16 @@ class TestTorch(TestCase):
         tensorNonContig = tensor3D.select(1, 1)
         self.assertFalse(tensorNonContig.isContiguous())
         self.assertEqual(tensorNonContig.tolist(), [[3, 4], [7, 8]])
+        self.assertEqual(tensor3D.transpose(0, 2).tolist(),
+                [[[1, 5], [3, 7]], [[2, 6], [4, 8]]])
+        self.assertEqual(tensor3D.narrow(2, 1, 1).tolist(),
+                [[[2], [4]], [[6], [8]]])
+
+        longTensor = torch.LongTensor([[1, 2, 3], [4, 5, 6]]).t()
+        self.assertEqual(longTensor.tolist(), [[1, 4], [2, 5], [3, 6]])
+        self.assertIsInstance(longTensor.tolist()[0][0], int)
+        self.assertEqual(list(longTensor.select(1, 1)), [4, 5, 6])
+        self.assertEqual(list(torch.ByteStorage([1, 2, 255])), [1, 2, 255])
 
     def test_permute(self):
         orig = [1, 2, 3, 4, 5, 6, 7]
@@ -2105,6 +2212,14 @@ class TestTorch(TestCase):
         self.assertEqual(perm, new)
         self.assertEqual(x.size().tolist(), orig)
 
+        x = torch.rand(2, 3, 4, 5)
+        y = x.permute(2, 0, 3, 1)
+        self.assertEqual(y.size().tolist(), [4, 2, 5, 3])
+        for i, j, k, l in product(range(2), range(3), range(4), range(5)):
+            self.assertEqual(y[k][i][l][j], x[i][j][k][l])
+        self.assertRaises(RuntimeError, lambda: x.permute(0, 1, 1, 2))
+        self.assertRaises(RuntimeError, lambda: x.permute(0, 1, 2))
+
     def test_storageview(self):
         s1 = torch.LongStorage((3, 4, 5))
         s2 = torch.LongStorage(s1, 1)
@@ -2195,6 +2310,37 @@ class TestTorch(TestCase):
         b.fill_(1)
         self.assertEqual(a, a_clone)
 
+    def test_half(self):
+        import pickle
+        # Odd sizes and a transposed view cover both conversion paths
+        for a in (torch.randn(37).float(), torch.randn(7, 9).float().t()):
+            h = a.half()
+            self.assertTrue(isinstance(h, torch.HalfTensor))
+            self.assertEqual(h.type(), 'torch.HalfTensor')
+            self.assertEqual(h.size(), a.size())
+            self.assertEqual(h.float(), a, 1e-2)
+            # Every half value is exactly representable as a float
+            self.assertEqual(h.float().half().float(), h.float(), 0)
+            self.assertEqual(h.double(), a.double(), 1e-2)
+            self.assertEqual(torch.HalfTensor(a.size()).copy_(a.double()).float(), h.float(), 0)
+
+        values = [1, -2.5, 65504, 1e6, float('-inf'), 2 ** -24]
+        h = torch.HalfTensor(values)
+        self.assertEqual(h.tolist(), [1, -2.5, 65504, float('inf'), float('-inf'), 2 ** -24])
+        self.assertNotEqual(torch.HalfTensor([float('nan')])[0], torch.HalfTensor([float('nan')])[0])
+        h[0] = 0.1
+        self.assertEqual(h[0], 0.0999755859375)
+        self.assertEqual(torch.HalfStorage([1, 2])[1], 2)
+
+        h = torch.randn(10, 10).half()
+        self.assertEqual(pickle.loads(pickle.dumps(h)).float(), h.float(), 0)
+        with tempfile.NamedTemporaryFile() as f:
+            torch.save((h, h.storage()), f)
+            f.seek(0)
+            h_, s_ = torch.load(f)
+        self.assertTrue(isinstance(s_, torch.HalfStorage))
+        self.assertEqual(h_.float(), h.float(), 0)
+
     def test_pickle(self):
         if sys.version_info[0] == 2:
             import cPickle as pickle
@@ -2205,6 +2351,318 @@ class TestTorch(TestCase):
         b = pickle.loads(serialized)
         self.assertEqual(a, b)
 
+    def test_pickle_binary(self):
+        if sys.version_info[0] == 2:
+            import cPickle as pickle
+        else:
+            import pickle
+        a = torch.randn(1000, 100).float()
+        b = a.narrow(0, 10, 5).select(1, 3)
+        c = torch.LongTensor(10).random_(1000)
+        for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+            a_, b_, c_, s_ = pickle.loads(pickle.dumps(
+                (a, b, c, c.storage()), protocol=protocol))
+            self.assertTrue(isinstance(a_, torch.FloatTensor))
+            self.assertTrue(isinstance(s_, torch.LongStorage))
+            self.assertEqual(a_, a, 0)
+            self.assertEqual(b_, b, 0)
+            self.assertEqual(c_, c, 0)
+            self.assertEqual(s_, c.storage(), 0)
+            # Only the viewed elements are pickled
+            self.assertEqual(b_.storage().size(), 5)
+        self.assertEqual(pickle.loads(pickle.dumps(torch.Tensor())).dim(), 0)
+
+        if pickle.HIGHEST_PROTOCOL >= 5:
+            buffers = []
+            serialized = pickle.dumps(a, protocol=5, buffer_callback=buffers.append)
+            self.assertEqual(len(buffers), 1)
+            self.assertLess(len(serialized), 1000)
+            self.assertEqual(pickle.loads(serialized, buffers=buffers), a, 0)
+
+    def test_share_memory(self):
+        import pickle
+        import multiprocessing
+        a = torch.randn(10, 5)
+        b = a.narrow(0, 2, 3)
+        values = a.clone()
+        self.assertFalse(a.isShared())
+        self.assertIs(b.share_memory_(), b)
+        self.assertTrue(a.isShared())
+        self.assertTrue(a.storage().isShared())
+        self.assertEqual(a, values, 0)
+        self.assertRaises(RuntimeError, lambda: a.storage().resize_(100))
+        self.assertTrue(torch.FloatTensor().share_memory_().dim() == 0)
+
+        # Unpickled tensors use the same memory
+        a_, b_ = pickle.loads(pickle.dumps((a, b)))
+        self.assertTrue(b_.isShared())
+        self.assertEqual(b_.storageOffset(), 10)
+        self.assertEqual(b_.storage().size(), 50)
+        b_.fill_(7)
+        self.assertEqual(a[3][2], 7)
+        self.assertEqual(a_, a, 0)
+
+        # Including ones in other processes
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_fill_shared_tensor, args=(queue,))
+        process.start()
+        queue.put(a)
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(a, torch.Tensor(10, 5).fill_(3), 0)
+
+        # The memory is released when the last storage using it is freed
+        s = torch.ByteStorage(10).share_memory_()
+        name, size = s._share_handle()
+        s_ = torch.ByteStorage._new_shared(name, size)
+        del s, s_
+        self.assertRaises(RuntimeError, lambda: torch.ByteStorage._new_shared(name, size))
+
+        # Tensors sent to another process can be freed before it receives
+        # them
+        queue = multiprocessing.Queue()
+        ready = multiprocessing.Event()
+        result = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_sum_shared_tensor,
+                args=(queue, ready, result))
+        process.start()
+        t = torch.Tensor(5).fill_(2).share_memory_()
+        storage_type = type(t.storage())
+        # Using the handle once releases the reference it holds
+        name, size = t.storage()._share_handle()
+        storage_type._new_shared(name, size)
+        queue.put(t)
+        del t
+        # Wait until the tensor has been pickled and written to the pipe
+        queue.close()
+        queue.join_thread()
+        ready.set()
+        self.assertEqual(result.get(timeout=10), 10)
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        # The memory is released once the receiver has freed its tensor
+        self.assertRaises(RuntimeError, lambda: storage_type._new_shared(name, size))
+        if sys.platform.startswith('linux'):
+            self.assertFalse(os.path.exists('/dev/shm/' + name.lstrip('/')))
+
+    def test_from_buffer(self):
+        data = array.array('f', [1, 2, 3, 4, 5])
+        s = torch.FloatStorage.from_buffer(data)
+        self.assertEqual(s.tolist(), [1, 2, 3, 4, 5])
+        s[0] = 10
+        self.assertEqual(data[0], 10)
+        self.assertEqual(memoryview(s).tobytes(), data.tobytes())
+
+        s = torch.FloatStorage.from_buffer(data, 4, 2)
+        self.assertEqual(s.tolist(), [2, 3])
+        s = torch.ByteStorage.from_buffer(bytearray(b'\x01\x02\x03'))
+        self.assertEqual(s.tolist(), [1, 2, 3])
+        self.assertRaises(RuntimeError, lambda: torch.FloatStorage.from_buffer(bytearray(3)))
+        # Read-only buffers can't be shared
+        data_bytes = b'\x01\x02\x03\x04'
+        self.assertRaises(BufferError, lambda: torch.ByteStorage.from_buffer(data_bytes))
+        self.assertEqual(data_bytes, b'\x01\x02\x03\x04')
+        self.assertRaises(RuntimeError, lambda: torch.FloatStorage.from_buffer(data, 4, 5))
+        self.assertRaises(RuntimeError, lambda: torch.FloatStorage.from_buffer(data, 21))
+
+        # The storage keeps the memory alive
+        s = torch.DoubleStorage.from_buffer(bytearray(8 * 3))
+        s.fill_(2)
+        self.assertEqual(s.tolist(), [2, 2, 2])
+        # Resizing copies the data out of the buffer
+        data = bytearray(8 * 3)
+        s = torch.DoubleStorage.from_buffer(data)
+        s.fill_(1).resize_(5)
+        s[3] = 3
+        self.assertEqual(s.tolist()[:4], [1, 1, 1, 3])
+        self.assertEqual(len(data), 24)
+        data.append(0)
+
+    def test_from_file(self):
+        with tempfile.NamedTemporaryFile() as f:
+            s = torch.FloatStorage.from_file(f.name, True, 100)
+            self.assertEqual(s.size(), 100)
+            s.fill_(0)
+            x = torch.FloatTensor().set_(s).view(10, 10)
+            x.narrow(0, 2, 3).fill_(5)
+            s.advise('willneed')
+            s.advise('sequential', 10, 30)
+            s.flush()
+            self.assertRaises(ValueError, lambda: s.advise('later'))
+            self.assertRaises(RuntimeError, lambda: s.advise('random', 90, 20))
+            self.assertRaises(RuntimeError, lambda: s.resize_(200))
+
+            # The whole file is mapped by default
+            shared = torch.FloatStorage.from_file(f.name, True)
+            self.assertEqual(shared.size(), 100)
+            self.assertEqual(shared[25], 5)
+            shared[0] = 1
+            self.assertEqual(s[0], 1)
+
+            # Changes to private mappings don't reach the file
+            private = torch.FloatStorage.from_file(f.name)
+            private.fill_(2)
+            self.assertEqual(s[25], 5)
+            self.assertEqual(torch.FloatTensor().set_(private).sum(), 200)
+
+            # Dropped pages are read back from the file
+            s.advise('dontneed')
+            self.assertEqual(torch.FloatTensor().set_(s).sum(), 151)
+            self.assertEqual(torch.FloatTensor().set_(s).indexSelect(0, torch.LongTensor([0, 25])).tolist(), [1, 5])
+        self.assertRaises(RuntimeError, lambda: torch.FloatStorage(10).flush())
+
+    def test_array_interface(self):
+        x = torch.randn(4, 5).narrow(1, 1, 3).t()
+        interface = x.__array_interface__
+        self.assertEqual(interface['shape'], (3, 4))
+        self.assertEqual(interface['strides'], (8, 40))
+        self.assertEqual(interface['typestr'][1:], 'f8')
+        self.assertEqual(interface['data'], (x.storage().data_ptr() + 8, False))
+        self.assertEqual(torch.ByteTensor(2).__array_interface__['typestr'], '|u1')
+        self.assertEqual(torch.HalfTensor([1.5, 2]).__array_interface__['typestr'][1:], 'f2')
+        interface = torch.IntTensor().__array_interface__
+        self.assertEqual(interface['shape'], (0,))
+        # Empty tensors don't point to (temporary) memory
+        self.assertEqual(interface['data'], (0, False))
+        try:
+            import numpy
+        except ImportError:
+            return
+        a = numpy.asarray(x)
+        self.assertEqual(a.tolist(), x.tolist())
+        a[0, 0] = 5
+        self.assertEqual(x[0][0], 5)
+
+    def test_print_summarized(self):
+        self.assertNotIn('...', str(torch.range(1, 1000)))
+        for size in ((2000,), (100, 200), (2, 30, 40), (20, 4, 3, 30)):
+            x = torch.range(1, torch.Tensor(*size).nElement()).view(*size)
+            output = str(x)
+            self.assertIn('...', output)
+            self.assertLess(len(output.split('\n')), 150)
+            self.assertIn('[torch.DoubleTensor of size {}]'.format(
+                'x'.join(str(s) for s in size)), output)
+            # The last element is printed in full
+            self.assertIn(str(x.nElement()), output)
+
+        # Formatting only depends on the printed elements
+        x = torch.Tensor(10000).fill_(1.5)
+        x[5000] = 1e10
+        self.assertNotIn('e+', str(x))
+        self.assertEqual(str(x.narrow(0, 10, 2)), str(torch.Tensor(2).fill_(1.5)))
+
+        torch.set_printoptions(threshold=10000, edgeitems=2)
+        try:
+            self.assertNotIn('...', str(x))
+            self.assertIn('e+', str(x))
+            self.assertEqual(str(torch.range(1, 20000)).count('\n'), 7)
+        finally:
+            torch.set_printoptions(threshold=1000, edgeitems=3)
+        self.assertRaises(ValueError, lambda: torch.set_printoptions(edgeitems=0))
+        self.assertEqual(torch.TensorPrinting.PRINT_OPTS.edgeitems, 3)
+
+    def test_caching_allocator(self):
+        torch.setCachingAllocatorEnabled(True)
+        try:
+            self.assertTrue(torch.isCachingAllocatorEnabled())
+            torch.emptyCache()
+            stats = torch.cachingAllocatorStats()
+            x = torch.FloatStorage(1000)
+            after_alloc = torch.cachingAllocatorStats()
+            self.assertEqual(after_alloc['allocated'] - stats['allocated'], 4096)
+            self.assertEqual(after_alloc['num_allocations'], stats['num_allocations'] + 1)
+            del x
+            freed = torch.cachingAllocatorStats()
+            self.assertEqual(freed['cached'], 4096)
+            self.assertEqual(freed['allocated'], stats['allocated'])
+
+            # Blocks of the same size class are reused
+            y = torch.ByteStorage(4000)
+            reused = torch.cachingAllocatorStats()
+            self.assertEqual(reused['num_cache_misses'], freed['num_cache_misses'])
+            self.assertEqual(reused['cached'], 0)
+            self.assertGreaterEqual(reused['peak_allocated'], reused['allocated'])
+
+            # Resizing keeps the data
+            y.fill_(7).resize_(10000)
+            self.assertEqual(y[3999], 7)
+            a = torch.randn(50, 50)
+            self.assertEqual(a.clone().add_(a).mul_(0.5), a, 0)
+
+            del y
+            torch.emptyCache()
+            self.assertEqual(torch.cachingAllocatorStats()['cached'], 0)
+        finally:
+            torch.setCachingAllocatorEnabled(False)
+        self.assertFalse(torch.isCachingAllocatorEnabled())
+        x = torch.FloatStorage(1000)
+        del x
+        self.assertEqual(torch.cachingAllocatorStats()['cached'], 0)
+
+    def test_memory_stats(self):
+        def stats():
+            return torch.memoryStats().get(torch.ShortStorage,
+                    {'live_bytes': 0, 'peak_bytes': 0, 'num_allocations': 0})
+
+        before = stats()
+        x = torch.ShortStorage(1000)
+        allocated = stats()
+        self.assertEqual(allocated['live_bytes'], before['live_bytes'] + 2000)
+        self.assertEqual(allocated['num_allocations'], before['num_allocations'] + 1)
+        x.resize_(3000)
+        self.assertEqual(stats()['live_bytes'], before['live_bytes'] + 6000)
+        del x
+        freed = stats()
+        self.assertEqual(freed['live_bytes'], before['live_bytes'])
+        self.assertGreaterEqual(freed['peak_bytes'], before['live_bytes'] + 6000)
+        torch.resetPeakMemoryStats()
+        self.assertEqual(stats()['peak_bytes'], freed['live_bytes'])
+
+        # Storages allocated in TH (e.g. results of operations) are counted too
+        t = torch.ShortTensor(10, 10).fill_(1)
+        before_add = stats()
+        r = t + t
+        self.assertEqual(stats()['live_bytes'], before_add['live_bytes'] + 200)
+        del r
+
+        # Views and storages sharing memory with buffers don't own memory
+        x = torch.ShortStorage(1000)
+        before_views = stats()
+        views = [torch.ShortStorage(x, 100 * i, 100) for i in range(5)]
+        data = bytearray(400)
+        buffer_storage = torch.ShortStorage.from_buffer(data)
+        self.assertEqual(stats(), before_views)
+        del views, x
+        self.assertEqual(stats()['live_bytes'], before_views['live_bytes'] - 2000)
+        # Until their data is copied out of the buffer
+        buffer_storage.resize_(300)
+        self.assertEqual(stats()['live_bytes'], before_views['live_bytes'] - 1400)
+        buffer_storage.share_memory_()
+        self.assertEqual(stats()['live_bytes'], before_views['live_bytes'] - 1400)
+        del buffer_storage
+        self.assertEqual(stats()['live_bytes'], before_views['live_bytes'] - 2000)
+
+        torch.setMemoryAttributionEnabled(True)
+        try:
+            self.assertTrue(torch.isMemoryAttributionEnabled())
+            y = torch.ShortStorage(500); line = sys._getframe().f_lineno
+            site = (__file__, line, 'test_memory_stats')
+            sites = torch.memoryStatsBySite()
+            self.assertEqual(sites[site]['live_bytes'], 1000)
+            self.assertEqual(sites[site]['num_allocations'], 1)
+            del y
+            sites = torch.memoryStatsBySite()
+            self.assertEqual(sites[site]['live_bytes'], 0)
+            self.assertEqual(sites[site]['peak_bytes'], 1000)
+
+            # Allocations are attributed to callers of torch.Tensor methods
+            r = t + t; line = sys._getframe().f_lineno
+            sites = torch.memoryStatsBySite()
+            self.assertEqual(sites[(__file__, line, 'test_memory_stats')]['live_bytes'], 200)
+        finally:
+            torch.setMemoryAttributionEnabled(False)
+        self.assertFalse(torch.isMemoryAttributionEnabled())
+
     def test_bernoulli(self):
         t = torch.ByteTensor(10, 10)
 
@@ -2219,6 +2677,69 @@ class TestTorch(TestCase):
         t.bernoulli_(p)
         self.assertTrue(isBinary(t))
 
+    def test_sparse(self):
+        indices = torch.LongTensor([[0, 2, 1, 0, 2], [3, 1, 1, 3, 0]])
+        values = torch.Tensor([1, 2, 3, 4, 5])
+        x = torch.sparse.DoubleTensor(indices, values, torch.LongStorage([3, 4]))
+        self.assertEqual(x.nnz(), 5)
+        self.assertFalse(x.isCoalesced())
+        dense = torch.zeros(3, 4)
+        dense[0][3] = 5
+        dense[2][1] = 2
+        dense[1][1] = 3
+        dense[2][0] = 5
+        self.assertEqual(x.toDense(), dense)
+        self.assertEqual(x.t().toDense(), dense.t())
+
+        y = x.coalesce()
+        self.assertTrue(y.isCoalesced())
+        self.assertEqual(y.nnz(), 4)
+        self.assertEqual(y.indices(), torch.LongTensor([[0, 1, 2, 2], [3, 1, 0, 1]]))
+        self.assertEqual(y.values(), torch.Tensor([5, 3, 5, 2]))
+        self.assertEqual(y.toDense(), dense)
+
+        z = torch.sparse.DoubleTensor(3, 4)
+        z.add_(x).add_(2, y)
+        self.assertEqual(z.nnz(), 9)
+        self.assertEqual(z.toDense(), dense.mul(3))
+        self.assertEqual(x.float().toDense(), dense.float())
+
+        m = torch.randn(4, 6)
+        t = torch.randn(3, 6)
+        self.assertEqual(torch.sparse.spmm(x, m), torch.mm(dense, m))
+        self.assertEqual(torch.sparse.addmm(0.5, t, 2, x, m),
+            torch.addmm(0.5, t, 2, dense, m))
+        res = torch.Tensor()
+        torch.sparse.addmm(res, t, y, m)
+        self.assertEqual(res, torch.addmm(t, dense, m))
+        self.assertEqual(torch.sparse.spmm(x, m.t().contiguous().t()), torch.mm(dense, m))
+
+        # Without specified elements, only beta * t is left
+        empty = torch.sparse.DoubleTensor(3, 4)
+        self.assertEqual(torch.sparse.spmm(empty, m), torch.zeros(3, 6))
+        self.assertEqual(torch.sparse.addmm(0.5, t, 2, empty, m), t.mul(0.5))
+        res = torch.Tensor()
+        torch.sparse.addmm(res, t, empty, m)
+        self.assertEqual(res, t)
+        self.assertEqual(empty.t().size(), torch.LongStorage([4, 3]))
+        self.assertEqual(empty.clone().nnz(), 0)
+        self.assertEqual(empty.float().toDense(), torch.zeros(3, 4).float())
+
+        out_of_range = torch.sparse.DoubleTensor(indices, values, torch.LongStorage([2, 4]))
+        self.assertRaises(RuntimeError, lambda: torch.sparse.spmm(out_of_range, m))
+
+        # Sparse rows of a dense matrix
+        rows = torch.sparse.DoubleTensor(torch.LongTensor([[3, 0, 3]]), m.narrow(0, 0, 3))
+        self.assertEqual(rows.size(), torch.LongStorage([4, 6]))
+        self.assertEqual(rows.nDimensionI(), 1)
+        expected = torch.zeros(4, 6)
+        expected[0].copy_(m[1])
+        expected[3].copy_(m[0] + m[2])
+        self.assertEqual(rows.toDense(), expected)
+        self.assertEqual(rows.coalesce().indices(), torch.LongTensor([[0, 3]]))
+        self.assertEqual(rows.coalesce().toDense(), expected)
+        self.assertEqual(rows.addTo(torch.zeros(6, 4).t(), 2), expected.mul(2))
+
     def test_serialization(self):
         a = [torch.randn(5, 5).float() for i in range(2)]
         b = [a[i % 2] for i in range(4)] + [a[0].storage()]
@@ -2238,5 +2759,130 @@ class TestTorch(TestCase):
         c[1].fill_(20)
         self.assertEqual(c[1], c[3], 0)
 
+    def test_serialization_async(self):
+        a = torch.randn(5, 5).float()
+        b = [a, a.narrow(0, 1, 2), a.storage(), torch.randn(3).long()]
+        expected = [t.clone() for t in b[:2]]
+        with tempfile.NamedTemporaryFile() as f:
+            future = torch.save_async(b, f)
+            # The snapshot is taken before save_async returns
+            a.fill_(10)
+            future.result()
+            f.seek(0)
+            c = torch.load(f)
+        self.assertEqual(c[0], expected[0], 0)
+        self.assertEqual(c[1], expected[1], 0)
+        self.assertEqual(c[3], b[3], 0)
+        self.assertTrue(isinstance(c[2], torch.FloatStorage))
+        c[0].fill_(20)
+        self.assertEqual(c[1], torch.FloatTensor(2, 5).fill_(20), 0)
+        self.assertEqual(c[2], torch.FloatStorage(25).fill_(20), 0)
+
+        # Staging buffers are reused by consecutive saves
+        with tempfile.NamedTemporaryFile() as f:
+            torch.save_async(b, f.name).result()
+            c = torch.load(f)
+        self.assertEqual(c[0], a, 0)
+
+        # In-memory buffers aren't synced to disk
+        f = io.BytesIO()
+        torch.save_async(b, f).result()
+        f.seek(0)
+        c = torch.load(f)
+        self.assertEqual(c[0], a, 0)
+        self.assertEqual(c[3], b[3], 0)
+
+        # Errors of the background write are raised by result()
+        tmpdir = tempfile.mkdtemp()
+        future = torch.save_async(b, os.path.join(tmpdir, 'missing', 'f'))
+        self.assertRaises((IOError, OSError), future.result)
+        self.assertTrue(future.done())
+        shutil.rmtree(tmpdir)
+        torch.serialization.empty_async_cache()
+
+    def test_serialization_sharded(self):
+        a = [torch.randn(5, 5).float(), torch.randn(100).long(), torch.randn(3)]
+        b = a + [a[0].narrow(0, 1, 3), a[1].storage(), {'x': a[2]}]
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'checkpoint')
+            torch.save_sharded(b, path, 4)
+            self.assertEqual(len(os.listdir(tmpdir)), 5)
+            c = torch.load_sharded(path)
+            # Files saved with torch.save can be loaded too
+            unsharded_path = os.path.join(tmpdir, 'unsharded')
+            with open(unsharded_path, 'wb') as f:
+                torch.save(b, f)
+            d = torch.load_sharded(unsharded_path)
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertEqual(d[:4], b[:4], 0)
+        self.assertEqual(d[5]['x'], b[5]['x'], 0)
+        self.assertEqual(c[:4], b[:4], 0)
+        self.assertEqual(c[4], b[4], 0)
+        self.assertTrue(isinstance(c[1], torch.LongTensor))
+        self.assertTrue(isinstance(c[4], torch.LongStorage))
+        c[0].fill_(10)
+        self.assertEqual(c[3], torch.FloatTensor(3, 5).fill_(10), 0)
+        c[5]['x'].fill_(3)
+        self.assertEqual(c[2], torch.Tensor(3).fill_(3), 0)
+
+    def test_load_into(self):
+        a = torch.randn(10, 5)
+        saved = {'a': a, 'b': a.narrow(1, 1, 2), 'c': torch.randn(4).float(),
+                 'd': torch.randn(2, 3)}
+        dest = {'a': torch.zeros(10, 5), 'b': torch.zeros(2, 10).t(),
+                'c': torch.zeros(4), 'd': torch.zeros(3, 2).t()}
+        a_storage = dest['a'].storage()
+        with tempfile.NamedTemporaryFile() as f:
+            torch.save(saved, f)
+            f.seek(0)
+            torch.load_into(f, dest)
+            self.assertEqual(dest['a'].storage()._cdata, a_storage._cdata)
+            self.assertEqual(dest['a'], a, 0)
+            self.assertEqual(dest['b'], saved['b'], 0)
+            # Converted to the type of the destination
+            self.assertTrue(isinstance(dest['c'], torch.DoubleTensor))
+            self.assertEqual(dest['c'], saved['c'], 1e-6)
+            # Copied into a tensor with different strides
+            self.assertEqual(dest['d'], saved['d'], 0)
+
+            f.seek(0)
+            self.assertRaises(KeyError, lambda: torch.load_into(f, {'e': torch.zeros(1)}))
+
+            # Tensors aren't resized to the saved size
+            f.seek(0)
+            dest = {'c': torch.zeros(4), 'd': torch.zeros(3, 2)}
+            try:
+                torch.load_into(f, dest)
+                self.fail('load_into should have raised a ValueError')
+            except ValueError as e:
+                self.assertIn('3x2', str(e))
+                self.assertIn('2x3', str(e))
+            self.assertEqual(dest['c'], torch.zeros(4), 0)
+            self.assertEqual(list(dest['d'].size()), [3, 2])
+
+    def test_serialization_compact(self):
+        a = torch.randn(1000)
+        m = torch.randn(100, 20)
+        b = [a.narrow(0, 100, 10), a.narrow(0, 105, 10), m.select(1, 3),
+             m.storage()]
+        n = torch.randn(50, 50)
+        c = [n.narrow(0, 10, 3), n.narrow(1, 2, 2).narrow(0, 40, 2)]
+        with tempfile.NamedTemporaryFile() as f:
+            torch.save(b + c, f, compact=True)
+            f.seek(0)
+            d = torch.load(f)
+        self.assertEqual(d[:3], b[:3], 0)
+        self.assertEqual(d[4:], c, 0)
+        self.assertEqual(d[0].storage().size(), 15)
+        self.assertEqual(d[0].storageOffset(), 0)
+        self.assertEqual(d[1].storageOffset(), 5)
+        # m's storage was saved directly, so it's kept whole
+        self.assertEqual(d[3].size(), 2000)
+        self.assertEqual(d[4].storage().size(), 40 * 50 + 2 + 52 - 10 * 50)
+        d[0].fill_(1)
+        self.assertEqual(d[1].narrow(0, 0, 5), torch.ones(5), 0)
+
 if __name__ == '__main__':
     unittest.main()
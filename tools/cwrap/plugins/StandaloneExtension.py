@@ -25,6 +25,7 @@ class StandaloneExtension(CWrapPlugin):
         'THDoubleTensor*':  Template('(THDoubleTensor*)(((Tensor*)$arg)->cdata)'),
         'THLongTensor*':    Template('(THLongTensor*)(((Tensor*)$arg)->cdata)'),
         'THIntTensor*':     Template('(THIntTensor*)(((Tensor*)$arg)->cdata)'),
+        'THCharTensor*':    Template('(THCharTensor*)(((Tensor*)$arg)->cdata)'),
         'THCudaTensor*':    Template('(THCudaTensor*)(((Tensor*)$arg)->cdata)'),
         'THCudaLongTensor*': Template('(THCudaLongTensor*)(((Tensor*)$arg)->cdata)'),
         'float':            Template('__getFloat($arg)'),
@@ -42,6 +43,7 @@ class StandaloneExtension(CWrapPlugin):
         'THFloatTensor*':   Template('(PyObject*)Py_TYPE($arg) == THPFloatTensorClass'),
         'THLongTensor*':    Template('(PyObject*)Py_TYPE($arg) == THPLongTensorClass'),
         'THIntTensor*':     Template('(PyObject*)Py_TYPE($arg) == THPIntTensorClass'),
+        'THCharTensor*':    Template('(PyObject*)Py_TYPE($arg) == THPCharTensorClass'),
         'THCudaTensor*':    Template('(PyObject*)Py_TYPE($arg) == THCPFloatTensorClass'),
         'THCudaLongTensor*': Template('(PyObject*)Py_TYPE($arg) == THCPLongTensorClass'),
         'float':            Template('__checkFloat($arg)'),
@@ -225,8 +225,9 @@ PyObject * $name(PyObject *self, PyObject *args)
             entry = Template('  {"$python_name", (PyCFunction)$name, METH_VARARGS$extra_flags, NULL},\n').substitute(
                     python_name=declaration['python_name'], name=declaration['name'], extra_flags=extra_flags
                 )
-            if 'defined_if' in declaration:
-                entry = self.preprocessor_guard(entry, declaration['defined_if'])
+            condition = self.get_condition(declaration)
+            if condition:
+                entry = self.preprocessor_guard(entry, condition)
             tensor_methods += entry
         return self.TENSOR_METHODS_DECLARATION.substitute(methods=tensor_methods, stateless=('' if not stateless else 'stateless_'))
 
@@ -238,9 +239,20 @@ PyObject * $name(PyObject *self, PyObject *args)
     def preprocessor_guard(self, code, condition):
             return '#if ' + condition + '\n' + code + '#endif\n'
 
-    def process_wrapper(self, code, declaration):
+    # CPU half tensors only have the storage and shape functions of TH, so
+    # declarations are left out for them, unless they're marked with cpu_half
+    def get_condition(self, declaration):
+        conditions = []
+        if not declaration.get('cpu_half', False):
+            conditions.append('!IS_CPU_HALF')
         if 'defined_if' in declaration:
-            return self.preprocessor_guard(code, declaration['defined_if'])
+            conditions.append('(' + declaration['defined_if'] + ')')
+        return ' && '.join(conditions)
+
+    def process_wrapper(self, code, declaration):
+        condition = self.get_condition(declaration)
+        if condition:
+            return self.preprocessor_guard(code, condition)
         return code
 
     def process_all_unpacks(self, code, option):
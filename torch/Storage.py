@@ -1,5 +1,25 @@
+import pickle
+
 import torch
 
+_MAP_ADVICE = {
+    'normal': 0,
+    'sequential': 1,
+    'random': 2,
+    'willneed': 3,
+    'dontneed': 4,
+}
+
+
+def _rebuild_shared_storage(storage_type, name, size):
+    return storage_type._new_shared(name, size)
+
+
+def _rebuild_storage(storage_type, buffer):
+    # The data is copied, so that the storage doesn't keep the pickled
+    # buffer alive (and because from_buffer needs a writable buffer)
+    return storage_type.from_buffer(bytearray(buffer))
+
 
 class _StorageBase():
     def __str__(self):
@@ -10,7 +30,7 @@ class _StorageBase():
         return str(self)
 
     def __iter__(self):
-        return iter(map(lambda i: self[i], torch._pyrange(self.size())))
+        return iter(self.tolist())
 
     def copy_(self, other):
         torch._C._storageCopy(self, other)
@@ -27,11 +47,77 @@ class _StorageBase():
         memo[self._cdata] = new_storage
         return new_storage
 
-    def __reduce__(self):
-        return type(self), (self.tolist(),)
+    def __reduce_ex__(self, protocol):
+        if self.isShared():
+            # Only the name of the shared memory is pickled, so the storage
+            # that's unpickled (e.g. in another process) uses the same memory.
+            # The pickle holds a reference to the memory, which is handed over
+            # to the unpickled storage, so this one can be freed before the
+            # pickle is loaded (e.g. after queue.put()). Every pickle has to
+            # be loaded exactly once; ones that are never loaded keep the
+            # memory alive until the system is restarted.
+            return _rebuild_shared_storage, (type(self),) + self._share_handle()
+        try:
+            buffer = memoryview(self)
+        except TypeError:
+            # Storages that don't expose their memory (e.g. CUDA ones)
+            return type(self), (self.tolist(),)
+        if protocol >= 5 and hasattr(pickle, 'PickleBuffer'):
+            # Allows passing the data out-of-band
+            return _rebuild_storage, (type(self), pickle.PickleBuffer(self))
+        return _rebuild_storage, (type(self), buffer.tobytes())
 
     def clone(self):
         return type(self)(self.size()).copy_(self)
 
+    @classmethod
+    def from_buffer(cls, buffer, offset=0, count=-1):
+        """Creates a storage that shares memory with an object implementing
+        the buffer protocol (e.g. bytearray, mmap or a NumPy array).
+
+        offset is given in bytes. By default, the storage spans the rest of
+        the buffer. The object is kept alive for as long as the storage uses
+        its memory. The buffer has to be writable; read-only objects, like
+        bytes, raise a BufferError.
+        """
+        return cls._new_with_buffer(buffer, offset, count)
+
+    @classmethod
+    def from_file(cls, filename, shared=False, size=0):
+        """Creates a storage backed by a memory-mapped file.
+
+        Pages of the file are read only when they are accessed, so the file
+        can be larger than the available RAM. If shared is True, changes are
+        written back to the file (which is created or extended to hold size
+        elements if needed); otherwise they are private to the process. If
+        size is 0, the storage spans the whole file. File-mapped storages
+        can't be resized.
+        """
+        return cls._new_with_mapping(filename, bool(shared), size)
+
+    def flush(self):
+        """Writes changes of a shared file-mapped storage back to the file."""
+        self._flush()
+
+    def advise(self, advice, offset=0, size=-1):
+        """Tells the OS how a file-mapped storage is going to be accessed.
+
+        advice is one of 'normal', 'sequential', 'random', 'willneed' (read
+        the pages ahead of time) or 'dontneed' (drop the pages from memory;
+        they'll be read from the file again if needed, so changes to
+        storages that aren't shared are lost). It applies to size elements
+        starting at offset, by default to the whole storage.
+        """
+        if advice not in _MAP_ADVICE:
+            raise ValueError("advice should be one of {}, but got '{}'".format(
+                ', '.join(sorted(_MAP_ADVICE)), advice))
+        self._advise(_MAP_ADVICE[advice], offset, size)
+
+    def isShared(self):
+        # CPU storages override this - they can be moved to shared memory
+        # with share_memory_()
+        return False
+
     def tolist(self):
-        return [v for v in self]
+        # CPU storages override this with a native implementation
+        return [self[i] for i in torch._pyrange(self.size())]
@@ -21,6 +21,34 @@ def _infer_sizes(sizes, total):
     return sizes
 
 
+def _rebuild_tensor(tensor_type, storage, storage_offset, size, stride):
+    return tensor_type().set_(storage, storage_offset,
+            torch.LongStorage(size), torch.LongStorage(stride))
+
+
+def _broadcast_size(*sizes):
+    # Follows NumPy's rules: sizes are aligned to the right, and dimensions
+    # of size 1 (or missing ones) are stretched to match the others
+    result = []
+    for i in torch._pyrange(1, max(len(size) for size in sizes) + 1):
+        dim_sizes = set(size[len(size) - i] for size in sizes if len(size) >= i)
+        dim_sizes.discard(1)
+        if len(dim_sizes) > 1:
+            raise ValueError('sizes {} can\'t be broadcast together'.format(
+                ', '.join('x'.join(str(s) for s in size) for size in sizes)))
+        result.append(dim_sizes.pop() if dim_sizes else 1)
+    return result[::-1]
+
+
+def _repeats(args):
+    # The repeats can also be given as a single sequence (e.g. a LongStorage,
+    # a list or a tuple)
+    if len(args) == 1 and (torch.isLongStorage(args[0]) or
+                           isinstance(args[0], (list, tuple))):
+        return list(args[0])
+    return list(args)
+
+
 class _TensorBase(object):
     def new(self, *args, **kwargs):
         return self.__class__(*args, **kwargs)
@@ -63,6 +91,9 @@ class _TensorBase(object):
     def byte(self):
         return self.type(torch.ByteTensor)
 
+    def half(self):
+        return self.type(torch.HalfTensor)
+
     def copy_(self, other):
         torch._C._tensorCopy(self, other)
         return self
@@ -77,8 +108,65 @@ class _TensorBase(object):
         memo[self._cdata] = new_tensor
         return new_tensor
 
-    def __reduce__(self):
-        return type(self), (self.tolist(),)
+    def __copy__(self):
+        return self.clone()
+
+    def __reduce_ex__(self, protocol):
+        if self.nElement() == 0:
+            return type(self), ()
+        tensor = self
+        # Don't pickle parts of the storage that the tensor doesn't use (unless
+        # it's in shared memory, and only its name is pickled)
+        if not self.isShared() and not (self.isContiguous() and self.storageOffset() == 0 and
+                self.storage().size() == self.nElement()):
+            tensor = self.clone()
+        return _rebuild_tensor, (type(self), tensor.storage(),
+                tensor.storageOffset(), tuple(tensor.size()), tuple(tensor.stride()))
+
+    def share_memory_(self):
+        """Moves the storage of the tensor to shared memory.
+
+        Tensors with storages in shared memory are pickled by the name of the
+        memory, so sending them to another process (e.g. through a
+        multiprocessing.Queue) doesn't copy the data and both processes see
+        the changes made by the other one. Storages in shared memory can't be
+        resized.
+        """
+        storage = self.storage()
+        if storage is not None:
+            storage.share_memory_()
+        return self
+
+    def isShared(self):
+        storage = self.storage()
+        return storage is not None and storage.isShared()
+
+    @property
+    def __array_interface__(self):
+        # Lets NumPy (and anything else that supports the array interface)
+        # view the tensor's data without copying. Empty tensors have no
+        # memory: a temporary storage only gives the element type, and the
+        # data pointer is null.
+        storage = self.storage() if self.dim() > 0 else self.new(1).storage()
+        try:
+            buffer = memoryview(storage)
+        except TypeError:
+            raise AttributeError("{} doesn't expose its memory".format(torch.typename(self)))
+        kind = {'e': 'f', 'f': 'f', 'd': 'f', 'B': 'u'}.get(buffer.format, 'i')
+        byteorder = '|' if buffer.itemsize == 1 else ('<' if sys.byteorder == 'little' else '>')
+        interface = {
+            'typestr': byteorder + kind + str(buffer.itemsize),
+            'version': 3,
+        }
+        if self.dim() == 0:
+            interface['data'] = (0, False)
+            interface['shape'] = (0,)
+        else:
+            interface['data'] = (storage.data_ptr() +
+                    self.storageOffset() * buffer.itemsize, buffer.readonly)
+            interface['shape'] = tuple(self.size())
+            interface['strides'] = tuple(s * buffer.itemsize for s in self.stride())
+        return interface
 
     def __repr__(self):
         return str(self)
@@ -87,6 +175,8 @@ class _TensorBase(object):
         return TensorPrinting.printTensor(self)
 
     def __iter__(self):
+        if self.dim() == 1:
+            return iter(self.tolist())
         return iter(map(lambda i: self.select(0, i), torch._pyrange(self.size(0))))
 
     def split(self, split_size, dim=0):
@@ -104,9 +194,10 @@ class _TensorBase(object):
         return self.split(split_size, dim)
 
     def tolist(self):
+        # CPU tensors override this with a native implementation
         dim = self.dim()
         if dim == 1:
-            return [v for v in self]
+            return [self[i] for i in torch._pyrange(self.size(0))]
         elif dim > 0:
             return [subt.tolist() for subt in self]
         return []
@@ -132,100 +223,115 @@ class _TensorBase(object):
     def viewAs(self, tensor):
         return self.view(tensor.size())
 
-    def permute(self, *args):
-        perm = list(args)
-        tensor = self
-        n_dims = tensor.dim()
-        assert len(perm) == n_dims, 'Invalid permutation'
-        for i, p in enumerate(perm):
-            if p != i and p != -1:
-                j = i
-                while True:
-                    assert 0 <= perm[j] and perm[j] < n_dims, 'Invalid permutation'
-                    tensor = tensor.transpose(j, perm[j])
-                    perm[j], j = -1, perm[j]
-                    if perm[j] == i:
-                        break
-                perm[j] = -1
-        return tensor
-
     def expandAs(self, tensor):
         return self.expand(tensor.size())
 
     def expand(self, *args):
-        result = self.new()
         sizes = args[0] if len(args) == 1 and torch.isLongStorage(args[0]) else torch.LongStorage(args)
-        src = self
-
-        src_dim = src.dim()
-        src_stride = src.stride()
-        src_size = src.size()
-
-        if sizes.size() != src_dim:
-            raise ValueError('the number of dimensions provided must equal tensor.dim()')
-
-        # create a new geometry for tensor:
+        sizes = sizes.tolist()
+        src_dim = self.dim()
+
+        if len(sizes) < src_dim:
+            raise ValueError('the number of dimensions provided must be at least tensor.dim()')
+
+        # create a new geometry for tensor - new leading dimensions and
+        # dimensions of size 1 get a stride of 0
+        num_new_dims = len(sizes) - src_dim
+        src_size = self.size().tolist()
+        src_stride = self.stride().tolist()
+        stride = [0] * num_new_dims
         for i, size in enumerate(src_size):
             if size == 1:
-                src_size[i] = sizes[i]
-                src_stride[i] = 0
-            elif size != sizes[i]:
+                stride.append(0)
+            elif size == sizes[num_new_dims + i]:
+                stride.append(src_stride[i])
+            else:
                 raise ValueError('incorrect size: only supporting singleton expansion (size=1)')
 
-        result.set_(src.storage(), src.storageOffset(),
-                                src_size, src_stride)
-        return result
+        return self.asStrided(sizes, stride)
+
+    def _broadcast(self, other):
+        # Returns self and other expanded to a common size, without copying.
+        # Tensors with the same number of elements whose shapes can't be
+        # broadcast (e.g. sizes 2x3 and 6) are still combined element-wise,
+        # as they were before broadcasting was supported
+        if not torch.isTensor(other) or self.isSameSizeAs(other):
+            return self, other
+        try:
+            size = _broadcast_size(self.size(), other.size())
+        except ValueError:
+            if self.nElement() == other.nElement():
+                return self, other
+            raise
+        return self.expand(*size), other.expand(*size)
+
+    def _expand_other(self, other):
+        # Expands the right-hand side of an in-place operation to self's size
+        if not torch.isTensor(other) or self.isSameSizeAs(other):
+            return other
+        try:
+            return other.expandAs(self)
+        except ValueError:
+            if self.nElement() == other.nElement():
+                return other
+            raise
 
     def repeatTensor(self, *args):
-        # If args == (torch.LongStorage,), then we need to unpack the tuple
-        repeats = list(args[0] if len(args) == 1 else args)
-        result = self.new()
-        src = self.contiguous()
+        repeats = _repeats(args)
 
-        if len(repeats) < src.dim():
+        if len(repeats) < self.dim():
             raise ValueError('Number of dimensions of repeat dims can not be smaller than number of dimensions of tensor')
 
-        xtensor = src.new().set_(src)
-        xsize = xtensor.size().tolist()
-        for i in torch._pyrange(len(repeats)-src.dim()):
-            xsize = [1] + xsize
-
-        size = torch.LongStorage([a * b for a, b in zip(xsize, repeats)])
-        xtensor.resize_(torch.LongStorage(xsize))
-        result.resize_(size)
-        urtensor = result.new(result)
-        for i in torch._pyrange(xtensor.dim()):
-            urtensor = urtensor.unfold(i,xtensor.size(i),xtensor.size(i))
-        for i in torch._pyrange(urtensor.dim()-xtensor.dim()):
-            xsize = [1] + xsize
-        xtensor.resize_(torch.LongStorage(xsize))
-        xxtensor = xtensor.expandAs(urtensor)
-        urtensor.copy_(xxtensor)
+        num_new_dims = len(repeats) - self.dim()
+        xsize = [1] * num_new_dims + self.size().tolist()
+        xstride = [0] * num_new_dims + self.stride().tolist()
+        result = self.new(torch.LongStorage([a * b for a, b in zip(xsize, repeats)]))
+        if result.nElement() == 0:
+            return result
+
+        # View result as repeats x xsize blocks and copy self, expanded
+        # along the repeat dimensions, into all of them in one go
+        rstride = result.stride().tolist()
+        urtensor = result.asStrided(repeats + xsize,
+                [st * size for st, size in zip(rstride, xsize)] + rstride)
+        xtensor = self.asStrided(repeats + xsize, [0] * len(repeats) + xstride)
+        urtensor.copy_(xtensor)
         return result
 
-    #TODO: add tests for operators
+    def tile(self, *args):
+        """Like repeatTensor, but when there are fewer repeats than dimensions,
+        the leading dimensions aren't repeated (as in numpy.tile)."""
+        repeats = _repeats(args)
+        repeats = [1] * (self.dim() - len(repeats)) + repeats
+        return self.repeatTensor(*repeats)
+
+    # Binary operators broadcast their arguments (see _broadcast). In-place
+    # ones only expand the right-hand side.
     def __add__(self, other):
-        return self.add(other)
+        a, b = self._broadcast(other)
+        return a.add(b)
     __radd__ = __add__
 
     def __iadd__(self, other):
-        return self.add_(other)
+        return self.add_(self._expand_other(other))
 
     def __sub__(self, other):
-        return self.sub(other)
+        a, b = self._broadcast(other)
+        return a.sub(b)
 
     def __rsub__(self, other):
         return self.new().resizeAs_(self).fill_(other).add_(-1, self)
 
     def __isub__(self, other):
-        return self.sub_(other)
+        return self.sub_(self._expand_other(other))
 
     def __mul__(self, other):
-        return self.mul(other)
+        a, b = self._broadcast(other)
+        return a.mul(b)
     __rmul__ = __mul__
 
     def __imul__(self, other):
-        return self.mul_(other)
+        return self.mul_(self._expand_other(other))
 
     def __matmul__(self, other):
         dim_self = self.dim()
@@ -239,7 +345,8 @@ class _TensorBase(object):
             return torch.mm(self, other)
 
     def __div__(self, other):
-        return self.div(other)
+        a, b = self._broadcast(other)
+        return a.div(b)
     __truediv__ = __div__
 
     def __rdiv__(self, other):
@@ -247,10 +354,12 @@ class _TensorBase(object):
     __rtruediv__ = __rdiv__
 
     def __idiv__(self, other):
-        return self.div_(other)
+        return self.div_(self._expand_other(other))
+    __itruediv__ = __idiv__
 
     def __mod__(self, other):
-        return self.remainder(other)
+        a, b = self._broadcast(other)
+        return a.remainder(b)
 
     def __neg__(self):
         return self.neg()
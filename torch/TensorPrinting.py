@@ -1,17 +1,61 @@
 import math
 import torch
 from functools import reduce
+from itertools import product
 
 _pyrange = torch._pyrange
 
-def _printformat(storage):
-    int_mode = True
-    # TODO: use fmod?
-    for value in storage:
-        if value != math.ceil(value):
-            int_mode = False
-            break
-    tensor = torch.DoubleTensor(torch.DoubleStorage(storage.size()).copy_(storage)).abs()
+
+class __PrinterOptions(object):
+    threshold = 1000
+    edgeitems = 3
+
+
+PRINT_OPTS = __PrinterOptions()
+
+
+def set_printoptions(threshold=None, edgeitems=None):
+    """Sets options for printing tensors.
+
+    Tensors with more than threshold elements are summarized: only the first
+    and last edgeitems (at least 1) entries of every dimension are printed.
+    """
+    if threshold is not None:
+        PRINT_OPTS.threshold = threshold
+    if edgeitems is not None:
+        if edgeitems < 1:
+            raise ValueError("edgeitems should be at least 1, but got {}".format(edgeitems))
+        PRINT_OPTS.edgeitems = edgeitems
+
+
+def _summarize(self):
+    return self.nElement() > PRINT_OPTS.threshold
+
+
+def _edge_indices(size, summarize):
+    # None marks the place of the skipped entries
+    edgeitems = PRINT_OPTS.edgeitems
+    if summarize and size > 2 * edgeitems:
+        return list(_pyrange(edgeitems)) + [None] + list(_pyrange(size - edgeitems, size))
+    return list(_pyrange(size))
+
+
+def _edge_values(self, summarize):
+    # Returns the elements that will be printed as a 1D DoubleTensor
+    if not summarize:
+        parts = [self]
+    elif self.nDimension() == 1:
+        parts = [self.narrow(0, i, 1) for i in _edge_indices(self.size(0), True) if i is not None]
+    else:
+        parts = [_edge_values(self.select(0, i), True)
+                 for i in _edge_indices(self.size(0), True) if i is not None]
+    return torch.cat([torch.DoubleTensor(part.nElement()).copy_(part) for part in parts], 0)
+
+
+def _printformat(tensor, summarize):
+    tensor = _edge_values(tensor, summarize)
+    int_mode = tensor.equal(tensor.clone().ceil_())
+    tensor = tensor.abs()
     exp_min = tensor.min()
     if exp_min != 0:
         exp_min = math.floor(math.log10(exp_min)) + 1
@@ -52,8 +96,10 @@ def _printformat(storage):
 
 SCALE_FORMAT = '{:.5f} *\n'
 
-def _printMatrix(self, indent=''):
-    fmt, scale, sz = _printformat(self.storage())
+def _printMatrix(self, indent='', summarize=False):
+    fmt, scale, sz = _printformat(self, summarize)
+    if summarize:
+        return _printSummarizedMatrix(self, indent, fmt, scale, sz)
     nColumnPerLine = math.floor((80-len(indent))/(sz+1))
     strt = ''
     firstColumn = 0
@@ -70,46 +116,59 @@ def _printMatrix(self, indent=''):
         firstColumn = lastColumn + 1
     return strt
 
-def _printTensor(self):
-    counter_dim = self.nDimension()-2
-    counter = torch.LongStorage(counter_dim).fill_(0)
-    counter[0] = -1
-    finished = False
+def _printSummarizedMatrix(self, indent, fmt, scale, sz):
+    columns = _edge_indices(self.size(1), True)
     strt = ''
-    while True:
-        for i in _pyrange(counter_dim):
-            counter[i] += 1
-            if counter[i] == self.size(i):
-                if i == counter_dim-1:
-                    finished = True
-                counter[i] = 0
-            else:
-                break
-        if finished:
-            break
-        if strt != '':
-           strt += '\n'
-        strt += '({},.,.) = \n'.format(','.join(str(i) for i in counter))
-        submatrix = reduce(lambda t,i: t.select(0, i), counter, self)
-        strt += _printMatrix(submatrix, ' ')
+    if scale != 1:
+        strt += SCALE_FORMAT.format(scale)
+    for l in _edge_indices(self.size(0), True):
+        strt += indent + (' ' if scale != 1 else '')
+        if l is None:
+            strt += '...\n'
+            continue
+        row = self.select(0, l)
+        strt += ' '.join('...'.rjust(sz) if c is None else fmt.format(row[c]/scale) for c in columns) + '\n'
     return strt
 
-def _printVector(tensor):
-    fmt, scale, _ = _printformat(tensor.storage())
+def _printTensor(self, summarize=False):
+    counter_dim = self.nDimension()-2
+    # The first dimension changes the fastest
+    indices = [_edge_indices(self.size(i), summarize) for i in _pyrange(counter_dim)]
+    blocks = []
+    for counter in product(*reversed(indices)):
+        counter = counter[::-1]
+        if None in counter:
+            if blocks[-1] != '...\n':
+                blocks.append('...\n')
+            continue
+        strt = '({},.,.) = \n'.format(','.join(str(i) for i in counter))
+        submatrix = reduce(lambda t,i: t.select(0, i), counter, self)
+        strt += _printMatrix(submatrix, ' ', summarize)
+        blocks.append(strt)
+    return '\n'.join(blocks)
+
+def _printVector(tensor, summarize=False):
+    fmt, scale, _ = _printformat(tensor, summarize)
     strt = ''
     if scale != 1:
         strt += SCALE_FORMAT.format(scale)
-    return '\n'.join(fmt.format(val/scale) for val in tensor) + '\n'
+    if summarize:
+        return strt + '\n'.join('...' if i is None else fmt.format(tensor[i]/scale)
+                                for i in _edge_indices(tensor.size(0), True)) + '\n'
+    return strt + '\n'.join(fmt.format(val/scale) for val in tensor) + '\n'
 
 def printTensor(self):
     if self.nDimension() == 0:
         return '[{} with no dimension]\n'.format(torch.typename(self))
-    elif self.nDimension() == 1:
-        strt = _printVector(self)
+    summarize = _summarize(self)
+    # Half tensors have no math, so they're printed as floats
+    values = self.float() if isinstance(self, torch.HalfTensor) else self
+    if self.nDimension() == 1:
+        strt = _printVector(values, summarize)
     elif self.nDimension() == 2:
-        strt = _printMatrix(self)
+        strt = _printMatrix(values, '', summarize)
     else:
-        strt = _printTensor(self)
+        strt = _printTensor(values, summarize)
 
     size_str = 'x'.join(str(size) for size in self.size())
     strt += '[{} of size {}]\n'.format(torch.typename(self), size_str)
@@ -47,10 +47,12 @@ def setDefaultTensorType(t):
 def getDefaultTensorType():
     return _defaultTensorTypeName
 
-from .serialization import save, load
+from .serialization import save, save_async, save_sharded, load, load_sharded, \
+    load_into
 
 from .Storage import _StorageBase
 from .Tensor import _TensorBase
+from .TensorPrinting import set_printoptions
 
 ################################################################################
 # Define Storage and Tensor classes
@@ -70,6 +72,8 @@ class CharStorage(_C.CharStorageBase, _StorageBase):
     pass
 class ByteStorage(_C.ByteStorageBase, _StorageBase):
     pass
+class HalfStorage(_C.HalfStorageBase, _StorageBase):
+    pass
 
 class DoubleTensor(_C.DoubleTensorBase, _TensorBase):
     pass
@@ -85,6 +89,8 @@ class CharTensor(_C.CharTensorBase, _TensorBase):
     pass
 class ByteTensor(_C.ByteTensorBase, _TensorBase):
     pass
+class HalfTensor(_C.HalfTensorBase, _TensorBase):
+    pass
 
 _storage_classes.add(DoubleStorage)
 _storage_classes.add(FloatStorage)
@@ -93,6 +99,7 @@ _storage_classes.add(IntStorage)
 _storage_classes.add(ShortStorage)
 _storage_classes.add(CharStorage)
 _storage_classes.add(ByteStorage)
+_storage_classes.add(HalfStorage)
 
 _tensor_classes.add(DoubleTensor)
 _tensor_classes.add(FloatTensor)
@@ -101,6 +108,7 @@ _tensor_classes.add(IntTensor)
 _tensor_classes.add(ShortTensor)
 _tensor_classes.add(CharTensor)
 _tensor_classes.add(ByteTensor)
+_tensor_classes.add(HalfTensor)
 
 # This shadows Torch.py and Storage.py
 setDefaultTensorType('torch.DoubleTensor')
@@ -122,6 +130,7 @@ del IntStorageBase
 del ShortStorageBase
 del CharStorageBase
 del ByteStorageBase
+del HalfStorageBase
 del DoubleTensorBase
 del FloatTensorBase
 del LongTensorBase
@@ -129,3 +138,6 @@ del IntTensorBase
 del ShortTensorBase
 del CharTensorBase
 del ByteTensorBase
+del HalfTensorBase
+
+from . import sparse
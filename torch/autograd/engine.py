@@ -1,5 +1,19 @@
 from collections import Counter
 
+import torch
+
+
+def _accumulate_grad(grad, new_grad):
+    """Returns grad + new_grad, computed in place of grad where possible.
+    Sums of sparse gradients stay sparse, and adding a sparse gradient to a
+    dense one only visits its specified elements."""
+    if torch.sparse.isSparse(new_grad) and not torch.sparse.isSparse(grad):
+        return new_grad.addTo(grad)
+    if torch.sparse.isSparse(grad) and not torch.sparse.isSparse(new_grad):
+        return grad.addTo(new_grad.clone())
+    return grad.add_(new_grad)
+
+
 class ExecutionEngine(object):
     def __init__(self):
         pass
@@ -37,7 +51,9 @@ class ExecutionEngine(object):
         return True
 
     def run_backward(self, variable, grad):
-        ready = [(variable.creator, (grad,))]
+        output_grad = [None for _ in variable.creator.output_ids]
+        output_grad[variable.creator.output_ids[id(variable)]] = grad
+        ready = [(variable.creator, output_grad)]
         not_ready = {}
 
         dependencies = self._compute_dependencies(variable.creator)
@@ -58,11 +74,11 @@ class ExecutionEngine(object):
                         if not prev_grad[output_nr]:
                             prev_grad[output_nr] = d_prev_fn
                         else:
-                            prev_grad[output_nr].add_(d_prev_fn)
+                            prev_grad[output_nr] = _accumulate_grad(prev_grad[output_nr], d_prev_fn)
                         del not_ready[prev_fn]
                     else:
-                        assert output_nr == 0
-                        prev_grad = (d_prev_fn,)
+                        prev_grad = [None for _ in prev_fn.output_ids]
+                        prev_grad[output_nr] = d_prev_fn
                     ready.append((prev_fn, prev_grad))
                 else:
                     if prev_fn in not_ready:
@@ -73,7 +89,7 @@ class ExecutionEngine(object):
                     if not prev_grad[output_nr]:
                         prev_grad[output_nr] = d_prev_fn
                     else:
-                        prev_grad[output_nr].add_(d_prev_fn)
+                        prev_grad[output_nr] = _accumulate_grad(prev_grad[output_nr], d_prev_fn)
 
                     not_ready[prev_fn] = prev_grad
 
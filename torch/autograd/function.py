@@ -25,12 +25,15 @@ class Function(object):
         self.output_ids = {id(var): i for i, var in enumerate(output)}
         return output
 
-    def _do_backward(self, grad_output):
-        grad_input = self.backward(grad_output)
+    def _do_backward(self, *grad_output):
+        grad_input = self.backward(*grad_output)
         if not isinstance(grad_input, tuple):
             grad_input = (grad_input,)
         assert len(grad_input) == len(self.previous_functions), \
             self.__class__.__name__ + ' returned an invalid number of gradient tensors'
+        # Hooks of functions with a single output get its gradient
+        if len(grad_output) == 1:
+            grad_output = grad_output[0]
 
         for hook, idx in self.backward_hooks.values():
             gi = grad_input if idx is None else grad_input[idx]
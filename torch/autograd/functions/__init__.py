@@ -1,3 +1,4 @@
 from .basic_ops import *
 from .tensor import *
 from .pointwise import *
+from .blas import *
@@ -3,53 +3,88 @@ from ..variable import Variable
 from ..function import Function
 
 
-class Add(Function):
+def _sum_to_size(tensor, size):
+    # Reverses broadcasting - sums the gradient over all dimensions that
+    # were expanded in forward
+    size = list(size)
+    if tensor.size().tolist() == size:
+        return tensor
+    num_new_dims = tensor.dim() - len(size)
+    if num_new_dims < 0 or any(s != 1 and s != tensor.size(num_new_dims + i)
+                               for i, s in enumerate(size)):
+        # The input wasn't broadcast, but combined element-wise with one of
+        # the same number of elements
+        return tensor.contiguous().view(*size)
+    for dim in range(tensor.dim()):
+        if dim < num_new_dims or (size[dim - num_new_dims] == 1 and tensor.size(dim) != 1):
+            tensor = tensor.sum(dim)
+    return tensor.view(*size)
+
+
+class _BroadcastingFunction(Function):
+
+    def _broadcast(self, a, b):
+        self.input_sizes = (a.size(), b.size())
+        return a._broadcast(b)
+
+    def _reduce_grads(self, grad_a, grad_b):
+        size_a, size_b = self.input_sizes
+        return _sum_to_size(grad_a, size_a), _sum_to_size(grad_b, size_b)
+
+
+class Add(_BroadcastingFunction):
 
     def forward(self, a, b):
+        a, b = self._broadcast(a, b)
         return a.add(b)
 
     def backward(self, grad_output):
-        return grad_output, grad_output
+        return self._reduce_grads(grad_output, grad_output)
 
 
-class Sub(Function):
+class Sub(_BroadcastingFunction):
 
     def forward(self, a, b):
+        a, b = self._broadcast(a, b)
         return a.sub(b)
 
     def backward(self, grad_output):
-        return grad_output, grad_output.neg()
+        return self._reduce_grads(grad_output, grad_output.neg())
 
 
-class Mul(Function):
+class Mul(_BroadcastingFunction):
 
     def forward(self, a, b):
+        a, b = self._broadcast(a, b)
         self.input = (a, b)
         return a.mul(b)
 
     def backward(self, grad_output):
-        return grad_output.mul(self.input[1]), grad_output.mul(self.input[0])
+        return self._reduce_grads(grad_output.mul(self.input[1]), grad_output.mul(self.input[0]))
 
 
-class Div(Function):
+class Div(_BroadcastingFunction):
 
     def forward(self, a, b):
+        a, b = self._broadcast(a, b)
         self.input = (a, b)
         return a.div(b)
 
     def backward(self, grad_output):
         a, b = self.input
-        return grad_output.div(b), grad_output.neg().mul(a).div_(b).div_(b)
+        return self._reduce_grads(grad_output.div(b), grad_output.neg().mul(a).div_(b).div_(b))
 
-class Pow(Function):
+class Pow(_BroadcastingFunction):
 
     def forward(self, a, b):
+        a, b = self._broadcast(a, b)
         self.input = (a, b)
         return a.pow(b)
 
     def backward(self, grad_output):
         a, b = self.input
-        return grad_output.mul(b).mul_(a.pow(b-1)), grad_output.mul(a.pow(b)).mul_(a.log())
+        return self._reduce_grads(grad_output.mul(b).mul_(a.pow(b-1)),
+                grad_output.mul(a.pow(b)).mul_(a.log()))
 
 class AddConstant(Function):
 
@@ -0,0 +1,66 @@
+import torch
+from ..function import Function
+
+
+def _sparse_mm_grad(sparse, dense, grad_output):
+    # The gradient w.r.t. a sparse matrix is only defined for its specified
+    # elements, so it has the same indices
+    if sparse.nnz() == 0:
+        return sparse.new()
+    indices = sparse.indices()
+    values = grad_output.indexSelect(0, indices[0]).mul_(
+        dense.indexSelect(0, indices[1])).sum(1).view(-1)
+    return type(sparse)(indices, values, sparse.size())
+
+
+class SparseMM(Function):
+
+    def forward(self, sparse, dense):
+        self.input = (sparse, dense)
+        return torch.sparse.spmm(sparse, dense)
+
+    def backward(self, grad_output):
+        sparse, dense = self.input
+        grad_sparse = _sparse_mm_grad(sparse, dense, grad_output) if \
+            self.needs_input_grad[0] else None
+        grad_dense = torch.sparse.spmm(sparse.t(), grad_output) if \
+            self.needs_input_grad[1] else None
+        return grad_sparse, grad_dense
+
+
+class BAddBMM(Function):
+
+    def __init__(self, beta=1, alpha=1):
+        super(BAddBMM, self).__init__()
+        self.beta = beta
+        self.alpha = alpha
+
+    def forward(self, add_batch, batch1, batch2):
+        self.input = (batch1, batch2)
+        return torch.baddbmm(self.beta, add_batch, self.alpha, batch1, batch2)
+
+    def backward(self, grad_output):
+        batch1, batch2 = self.input
+        grad_add_batch = grad_output.mul(self.beta) if \
+            self.needs_input_grad[0] else None
+        grad_batch1 = torch.bmm(grad_output, batch2.transpose(1, 2)).mul_(self.alpha) if \
+            self.needs_input_grad[1] else None
+        grad_batch2 = torch.bmm(batch1.transpose(1, 2), grad_output).mul_(self.alpha) if \
+            self.needs_input_grad[2] else None
+        return grad_add_batch, grad_batch1, grad_batch2
+
+
+class BMM(Function):
+
+    def forward(self, batch1, batch2):
+        self.input = (batch1, batch2)
+        return torch.bmm(batch1, batch2)
+
+    def backward(self, grad_output):
+        batch1, batch2 = self.input
+        return (
+            torch.bmm(grad_output, batch2.transpose(1, 2)) if \
+                self.needs_input_grad[0] else None,
+            torch.bmm(batch1.transpose(1, 2), grad_output) if \
+                self.needs_input_grad[1] else None,
+        )
@@ -1,5 +1,8 @@
 from collections import OrderedDict
+
+import torch
 from .function import Function
+from .engine import _accumulate_grad
 
 class Leaf(Function):
 
@@ -17,5 +20,11 @@ class Leaf(Function):
         assert len(grad_output) == 1
         for hook in self.backward_hooks.values():
             hook(grad_output, grad_output)
-        self.variable.grad.add_(grad_output[0])
+        grad = grad_output[0]
+        if self.variable._grad is None and torch.sparse.isSparse(grad):
+            # Sparse gradients are kept sparse, so that their size only
+            # depends on the number of specified elements
+            self.variable._grad = grad.clone()
+        else:
+            self.variable._grad = _accumulate_grad(self.variable.grad, grad)
         return tuple()
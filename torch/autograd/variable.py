@@ -90,6 +90,9 @@ class Variable(object):
         else:
             return PowConstant(other)(self)[0]
 
+    def bmm(self, batch):
+        return BMM()(self, batch)[0]
+
     def view(self, *sizes):
         return View(*sizes)(self)[0]
 
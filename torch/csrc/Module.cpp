@@ -17,6 +17,7 @@ PyObject *THPIntStorageClass    = NULL;
 PyObject *THPShortStorageClass  = NULL;
 PyObject *THPCharStorageClass   = NULL;
 PyObject *THPByteStorageClass   = NULL;
+PyObject *THPHalfStorageClass   = NULL;
 
 PyObject *THPDoubleTensorClass  = NULL;
 PyObject *THPFloatTensorClass   = NULL;
@@ -25,6 +26,7 @@ PyObject *THPIntTensorClass     = NULL;
 PyObject *THPShortTensorClass   = NULL;
 PyObject *THPCharTensorClass    = NULL;
 PyObject *THPByteTensorClass    = NULL;
+PyObject *THPHalfTensorClass    = NULL;
 
 PyObject *THPDefaultTensorClass = NULL;
 PyObject *THPGeneratorClass     = NULL;
@@ -51,6 +53,7 @@ static bool THPModule_loadClasses(PyObject *self)
   ASSERT_NOT_NULL(THPShortStorageClass  = PyMapping_GetItemString(module_dict,(char*)"ShortStorage"));
   ASSERT_NOT_NULL(THPCharStorageClass   = PyMapping_GetItemString(module_dict,(char*)"CharStorage"));
   ASSERT_NOT_NULL(THPByteStorageClass   = PyMapping_GetItemString(module_dict,(char*)"ByteStorage"));
+  ASSERT_NOT_NULL(THPHalfStorageClass   = PyMapping_GetItemString(module_dict,(char*)"HalfStorage"));
 
   ASSERT_NOT_NULL(THPDoubleTensorClass  = PyMapping_GetItemString(module_dict,(char*)"DoubleTensor"));
   ASSERT_NOT_NULL(THPFloatTensorClass   = PyMapping_GetItemString(module_dict,(char*)"FloatTensor"));
@@ -59,6 +62,7 @@ static bool THPModule_loadClasses(PyObject *self)
   ASSERT_NOT_NULL(THPShortTensorClass   = PyMapping_GetItemString(module_dict,(char*)"ShortTensor"));
   ASSERT_NOT_NULL(THPCharTensorClass    = PyMapping_GetItemString(module_dict,(char*)"CharTensor"));
   ASSERT_NOT_NULL(THPByteTensorClass    = PyMapping_GetItemString(module_dict,(char*)"ByteTensor"));
+  ASSERT_NOT_NULL(THPHalfTensorClass    = PyMapping_GetItemString(module_dict,(char*)"HalfTensor"));
 
   THPDefaultTensorClass = THPDoubleTensorClass;
 
@@ -133,6 +137,7 @@ static bool THPModule_assignStateless(PyObject *self)
   INIT_STATELESS(Short);
   INIT_STATELESS(Char);
   INIT_STATELESS(Byte);
+  INIT_STATELESS(Half);
   Py_DECREF(arg);
   return true;
 #undef INIT_STATELESS
@@ -211,6 +216,43 @@ static PyObject * THPModule_setRNGState(PyObject *module, PyObject *args)
   Py_RETURN_NONE;
 }
 
+static PyObject * THPModule_setCachingAllocatorEnabled(PyObject *module, PyObject *arg)
+{
+  HANDLE_TH_ERRORS
+  int enabled = PyObject_IsTrue(arg);
+  if (enabled == -1)
+    return NULL;
+  THPCachingAllocator_setEnabled(enabled);
+  Py_RETURN_NONE;
+  END_HANDLE_TH_ERRORS
+}
+
+static PyObject * THPModule_isCachingAllocatorEnabled(PyObject *module)
+{
+  if (THPCachingAllocator_isEnabled())
+    Py_RETURN_TRUE;
+  Py_RETURN_FALSE;
+}
+
+static PyObject * THPModule_emptyCache(PyObject *module)
+{
+  HANDLE_TH_ERRORS
+  THPCachingAllocator_emptyCache();
+  Py_RETURN_NONE;
+  END_HANDLE_TH_ERRORS
+}
+
+static PyObject * THPModule_cachingAllocatorStats(PyObject *module)
+{
+  THPCachingAllocatorStats stats = THPCachingAllocator_getStats();
+  return Py_BuildValue("{s:l,s:l,s:l,s:l,s:l}",
+      "allocated", stats.allocated,
+      "cached", stats.cached,
+      "peak_allocated", stats.peak_allocated,
+      "num_allocations", stats.num_allocations,
+      "num_cache_misses", stats.num_cache_misses);
+}
+
 static PyObject * THPModule_manualSeed(PyObject *module, PyObject *args)
 {
   THGenerator *generator = THPDefaultGenerator->cdata;
@@ -353,6 +395,7 @@ IMPLEMENT_STATELESS(indexAdd)
 IMPLEMENT_STATELESS(indexFill)
 IMPLEMENT_STATELESS(narrow)
 IMPLEMENT_STATELESS(addmm)
+IMPLEMENT_STATELESS(_spaddmm)
 IMPLEMENT_STATELESS(addmv)
 IMPLEMENT_STATELESS(addr)
 IMPLEMENT_STATELESS(ger)
@@ -489,6 +532,15 @@ static PyMethodDef TorchMethods[] = {
   {"getRNGState",     (PyCFunction)THPModule_getRNGState,       METH_VARARGS, NULL},
   {"setRNGState",     (PyCFunction)THPModule_setRNGState,       METH_VARARGS, NULL},
   {"manualSeed",      (PyCFunction)THPModule_manualSeed,        METH_VARARGS, NULL},
+  {"setCachingAllocatorEnabled", (PyCFunction)THPModule_setCachingAllocatorEnabled, METH_O, NULL},
+  {"isCachingAllocatorEnabled", (PyCFunction)THPModule_isCachingAllocatorEnabled, METH_NOARGS, NULL},
+  {"cachingAllocatorStats", (PyCFunction)THPModule_cachingAllocatorStats, METH_NOARGS, NULL},
+  {"emptyCache",      (PyCFunction)THPModule_emptyCache,        METH_NOARGS,  NULL},
+  {"memoryStats",     (PyCFunction)THPModule_memoryStats,       METH_NOARGS,  NULL},
+  {"memoryStatsBySite", (PyCFunction)THPModule_memoryStatsBySite, METH_NOARGS, NULL},
+  {"resetPeakMemoryStats", (PyCFunction)THPModule_resetPeakMemoryStats, METH_NOARGS, NULL},
+  {"setMemoryAttributionEnabled", (PyCFunction)THPModule_setMemoryAttributionEnabled, METH_O, NULL},
+  {"isMemoryAttributionEnabled", (PyCFunction)THPModule_isMemoryAttributionEnabled, METH_NOARGS, NULL},
 
   {"sigmoid",         (PyCFunction)THPModule_sigmoid,           METH_VARARGS, NULL},
   {"log",             (PyCFunction)THPModule_log,               METH_VARARGS, NULL},
@@ -583,6 +635,7 @@ static PyMethodDef TorchMethods[] = {
   {"indexFill",       (PyCFunction)THPModule_indexFill,         METH_VARARGS, NULL},
   {"narrow",          (PyCFunction)THPModule_narrow,            METH_VARARGS, NULL},
   {"addmm",           (PyCFunction)THPModule_addmm,             METH_VARARGS, NULL},
+  {"_spaddmm",        (PyCFunction)THPModule__spaddmm,          METH_VARARGS, NULL},
   {"addmv",           (PyCFunction)THPModule_addmv,             METH_VARARGS, NULL},
   {"addr",            (PyCFunction)THPModule_addr,              METH_VARARGS, NULL},
   {"ger",             (PyCFunction)THPModule_ger,               METH_VARARGS, NULL},
@@ -679,6 +732,7 @@ PyMODINIT_FUNC PyInit__C()
   ASSERT_TRUE(module = PyModule_Create(&torchmodule));
 #endif
   ASSERT_TRUE(THPGenerator_init(module));
+  THPStorage_initMemoryAccounting();
 
   ASSERT_TRUE(THPDoubleStorage_init(module));
   ASSERT_TRUE(THPFloatStorage_init(module));
@@ -687,6 +741,7 @@ PyMODINIT_FUNC PyInit__C()
   ASSERT_TRUE(THPShortStorage_init(module));
   ASSERT_TRUE(THPCharStorage_init(module));
   ASSERT_TRUE(THPByteStorage_init(module));
+  ASSERT_TRUE(THPHalfStorage_init(module));
 
   ASSERT_TRUE(THPDoubleTensor_init(module));
   ASSERT_TRUE(THPFloatTensor_init(module));
@@ -695,6 +750,7 @@ PyMODINIT_FUNC PyInit__C()
   ASSERT_TRUE(THPShortTensor_init(module));
   ASSERT_TRUE(THPCharTensor_init(module));
   ASSERT_TRUE(THPByteTensor_init(module));
+  ASSERT_TRUE(THPHalfTensor_init(module));
 
 #ifdef WITH_CUDA
   // This will only initialise base classes and attach them to library namespace
@@ -13,6 +13,7 @@ extern PyObject *THPIntStorageClass;
 extern PyObject *THPShortStorageClass;
 extern PyObject *THPCharStorageClass;
 extern PyObject *THPByteStorageClass;
+extern PyObject *THPHalfStorageClass;
 
 extern PyObject *THPDoubleTensorClass;
 extern PyObject *THPFloatTensorClass;
@@ -21,5 +22,6 @@ extern PyObject *THPIntTensorClass;
 extern PyObject *THPShortTensorClass;
 extern PyObject *THPCharTensorClass;
 extern PyObject *THPByteTensorClass;
+extern PyObject *THPHalfTensorClass;
 
 #endif
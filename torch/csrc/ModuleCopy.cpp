@@ -5,7 +5,8 @@ void TH_CONCAT_3(_THPCopy_,THNAME,_copyLong)(PyObject *dst, PyObject *src);    \
 void TH_CONCAT_3(_THPCopy_,THNAME,_copyInt)(PyObject *dst, PyObject *src);     \
 void TH_CONCAT_3(_THPCopy_,THNAME,_copyShort)(PyObject *dst, PyObject *src);   \
 void TH_CONCAT_3(_THPCopy_,THNAME,_copyChar)(PyObject *dst, PyObject *src);    \
-void TH_CONCAT_3(_THPCopy_,THNAME,_copyByte)(PyObject *dst, PyObject *src);
+void TH_CONCAT_3(_THPCopy_,THNAME,_copyByte)(PyObject *dst, PyObject *src);    \
+void TH_CONCAT_3(_THPCopy_,THNAME,_copyHalf)(PyObject *dst, PyObject *src);
 DECLARE_COPY(THDoubleTensor)
 DECLARE_COPY(THFloatTensor)
 DECLARE_COPY(THLongTensor)
@@ -13,6 +14,7 @@ DECLARE_COPY(THIntTensor)
 DECLARE_COPY(THShortTensor)
 DECLARE_COPY(THCharTensor)
 DECLARE_COPY(THByteTensor)
+DECLARE_COPY(THHalfTensor)
 
 DECLARE_COPY(THDoubleStorage)
 DECLARE_COPY(THFloatStorage)
@@ -21,6 +23,7 @@ DECLARE_COPY(THIntStorage)
 DECLARE_COPY(THShortStorage)
 DECLARE_COPY(THCharStorage)
 DECLARE_COPY(THByteStorage)
+DECLARE_COPY(THHalfStorage)
 #undef DECLARE_COPY
 
 static bool THPModule_initCopy(PyObject *unused)
@@ -32,7 +35,8 @@ static bool THPModule_initCopy(PyObject *unused)
   tensor_copy_handlers.insert({{TYPE, THPIntTensorClass},     TH_CONCAT_3(_THPCopy_,THNAME,_copyInt)});     \
   tensor_copy_handlers.insert({{TYPE, THPShortTensorClass},   TH_CONCAT_3(_THPCopy_,THNAME,_copyShort)});   \
   tensor_copy_handlers.insert({{TYPE, THPCharTensorClass},    TH_CONCAT_3(_THPCopy_,THNAME,_copyChar)});    \
-  tensor_copy_handlers.insert({{TYPE, THPByteTensorClass},    TH_CONCAT_3(_THPCopy_,THNAME,_copyByte)});
+  tensor_copy_handlers.insert({{TYPE, THPByteTensorClass},    TH_CONCAT_3(_THPCopy_,THNAME,_copyByte)});    \
+  tensor_copy_handlers.insert({{TYPE, THPHalfTensorClass},    TH_CONCAT_3(_THPCopy_,THNAME,_copyHalf)});
 
 #define INIT_STORAGE_COPY(TYPE, THNAME)                                        \
   storage_copy_handlers.insert({{TYPE, THPDoubleStorageClass},  TH_CONCAT_3(_THPCopy_,THNAME,_copyDouble)});  \
@@ -41,7 +45,8 @@ static bool THPModule_initCopy(PyObject *unused)
   storage_copy_handlers.insert({{TYPE, THPIntStorageClass},     TH_CONCAT_3(_THPCopy_,THNAME,_copyInt)});     \
   storage_copy_handlers.insert({{TYPE, THPShortStorageClass},   TH_CONCAT_3(_THPCopy_,THNAME,_copyShort)});   \
   storage_copy_handlers.insert({{TYPE, THPCharStorageClass},    TH_CONCAT_3(_THPCopy_,THNAME,_copyChar)});    \
-  storage_copy_handlers.insert({{TYPE, THPByteStorageClass},    TH_CONCAT_3(_THPCopy_,THNAME,_copyByte)});
+  storage_copy_handlers.insert({{TYPE, THPByteStorageClass},    TH_CONCAT_3(_THPCopy_,THNAME,_copyByte)});    \
+  storage_copy_handlers.insert({{TYPE, THPHalfStorageClass},    TH_CONCAT_3(_THPCopy_,THNAME,_copyHalf)});
 
   INIT_TENSOR_COPY(THPDoubleTensorClass, THDoubleTensor);
   INIT_TENSOR_COPY(THPFloatTensorClass, THFloatTensor);
@@ -50,6 +55,7 @@ static bool THPModule_initCopy(PyObject *unused)
   INIT_TENSOR_COPY(THPShortTensorClass, THShortTensor);
   INIT_TENSOR_COPY(THPCharTensorClass, THCharTensor);
   INIT_TENSOR_COPY(THPByteTensorClass, THByteTensor);
+  INIT_TENSOR_COPY(THPHalfTensorClass, THHalfTensor);
 
   INIT_STORAGE_COPY(THPDoubleStorageClass,  THDoubleStorage);
   INIT_STORAGE_COPY(THPFloatStorageClass,   THFloatStorage);
@@ -58,6 +64,7 @@ static bool THPModule_initCopy(PyObject *unused)
   INIT_STORAGE_COPY(THPShortStorageClass,   THShortStorage);
   INIT_STORAGE_COPY(THPCharStorageClass,    THCharStorage);
   INIT_STORAGE_COPY(THPByteStorageClass,    THByteStorage);
+  INIT_STORAGE_COPY(THPHalfStorageClass,    THHalfStorage);
 
   return true;
 #undef INIT_TENSOR_COPY
@@ -2,12 +2,265 @@
 #include <structmember.h>
 
 #include <stdbool.h>
+#include <utility>
 #include <TH/TH.h>
 #include "THP.h"
 
 #include "generic/Storage.cpp"
 #include <TH/THGenerateAllTypes.h>
+#include "generic/Storage.cpp"
+#include <TH/THGenerateHalfType.h>
 
 #include "generic/StorageCopy.cpp"
 #include <TH/THGenerateAllTypes.h>
+#include "generic/StorageCopy.cpp"
+#include <TH/THGenerateHalfType.h>
+
+
+#include <algorithm>
+#include <atomic>
+#include <map>
+#include <mutex>
+#include <unordered_map>
+#include <vector>
+#include <frameobject.h>
+
+namespace {
+
+struct MemoryStats {
+  long live_bytes = 0;
+  long peak_bytes = 0;
+  long num_allocations = 0;
+
+  void update(int event, long delta) {
+    if (event == TH_STORAGE_EVENT_ALLOC)
+      num_allocations++;
+    live_bytes += delta;
+    peak_bytes = std::max(peak_bytes, live_bytes);
+  }
+};
+
+// Code object (holding a reference) and line number of an allocation
+typedef std::pair<PyObject*, int> Site;
+
+// No Python code can be run while holding the mutex, because it could free
+// storages and call back into the hook. If both are needed, the GIL has to be
+// acquired first.
+std::mutex memory_mutex;
+// Keyed by type names given by TH, which are constant strings
+std::unordered_map<const char*, MemoryStats> type_stats;
+std::atomic<bool> attribution_enabled(false);
+std::map<Site, MemoryStats> site_stats;
+// Sites of storages allocated while attribution was enabled
+std::unordered_map<void*, Site> storage_sites;
+
+// Files of thin wrappers (like torch/Tensor.py) that allocations aren't
+// attributed to - their callers are more interesting. Protected by the GIL.
+std::vector<PyObject*> skipped_files;
+
+bool isSkipped(PyObject *code)
+{
+  PyObject *filename = ((PyCodeObject*)code)->co_filename;
+  for (PyObject *skipped : skipped_files) {
+    if (filename == skipped || PyObject_RichCompareBool(filename, skipped, Py_EQ) == 1)
+      return true;
+  }
+  return false;
+}
+
+// Finds the innermost Python line outside of skipped files
+bool currentSite(Site &site)
+{
+  PyFrameObject *frame = PyEval_GetFrame();
+  Py_XINCREF(frame);
+  while (frame) {
+#if PY_VERSION_HEX >= 0x03090000
+    PyObject *code = (PyObject*)PyFrame_GetCode(frame);
+#else
+    PyObject *code = (PyObject*)frame->f_code;
+    Py_INCREF(code);
+#endif
+    if (!isSkipped(code)) {
+      site = Site(code, PyFrame_GetLineNumber(frame));
+      Py_DECREF(frame);
+      return true;
+    }
+    Py_DECREF(code);
+#if PY_VERSION_HEX >= 0x03090000
+    PyFrameObject *back = PyFrame_GetBack(frame);
+#else
+    PyFrameObject *back = frame->f_back;
+    Py_XINCREF(back);
+#endif
+    Py_DECREF(frame);
+    frame = back;
+  }
+  return false;
+}
+
+void memoryHook(const char *type, void *storage, int event, long delta)
+{
+  if (event == TH_STORAGE_EVENT_ALLOC && attribution_enabled && Py_IsInitialized()) {
+    // Storages can be allocated from threads that don't hold the GIL
+    PyGILState_STATE gil = PyGILState_Ensure();
+    Site site;
+    bool has_site = currentSite(site);
+    {
+      std::lock_guard<std::mutex> lock(memory_mutex);
+      type_stats[type].update(event, delta);
+      if (has_site) {
+        auto it = site_stats.find(site);
+        if (it == site_stats.end()) {
+          it = site_stats.emplace(site, MemoryStats()).first;
+        } else {
+          Py_DECREF(site.first);
+        }
+        it->second.update(event, delta);
+        storage_sites[storage] = it->first;
+      }
+    }
+    PyGILState_Release(gil);
+    return;
+  }
+
+  std::lock_guard<std::mutex> lock(memory_mutex);
+  type_stats[type].update(event, delta);
+  if (event == TH_STORAGE_EVENT_ALLOC || storage_sites.empty())
+    return;
+  auto it = storage_sites.find(storage);
+  if (it != storage_sites.end()) {
+    site_stats[it->second].update(event, delta);
+    if (event == TH_STORAGE_EVENT_FREE)
+      storage_sites.erase(it);
+  }
+}
+
+PyObject * statsToDict(const MemoryStats &stats)
+{
+  return Py_BuildValue("{s:l,s:l,s:l}",
+      "live_bytes", stats.live_bytes,
+      "peak_bytes", stats.peak_bytes,
+      "num_allocations", stats.num_allocations);
+}
+
+} // anonymous namespace
+
+void THPStorage_initMemoryAccounting()
+{
+  THSetStorageMemoryHook(memoryHook);
+}
+
+PyObject * THPModule_memoryStats(PyObject *module)
+{
+  HANDLE_TH_ERRORS
+  std::vector<std::pair<const char*, MemoryStats>> stats;
+  {
+    std::lock_guard<std::mutex> lock(memory_mutex);
+    stats.assign(type_stats.begin(), type_stats.end());
+  }
+  THPObjectPtr torch_module = PyImport_ImportModule("torch");
+  if (!torch_module)
+    return NULL;
+  THPObjectPtr result = PyDict_New();
+  if (!result)
+    return NULL;
+  for (auto &type_and_stats : stats) {
+    // Use storage classes as keys
+    THPObjectPtr key = PyObject_GetAttrString(torch_module, type_and_stats.first);
+    if (!key)
+      return NULL;
+    THPObjectPtr value = statsToDict(type_and_stats.second);
+    if (!value || PyDict_SetItem(result, key, value) < 0)
+      return NULL;
+  }
+  return result.release();
+  END_HANDLE_TH_ERRORS
+}
+
+PyObject * THPModule_memoryStatsBySite(PyObject *module)
+{
+  HANDLE_TH_ERRORS
+  std::vector<std::pair<Site, MemoryStats>> stats;
+  {
+    std::lock_guard<std::mutex> lock(memory_mutex);
+    for (auto &site_and_stats : site_stats) {
+      Py_INCREF(site_and_stats.first.first);
+      stats.push_back(site_and_stats);
+    }
+  }
+  // Every code object in stats has to be released, even on error
+  std::vector<THPObjectPtr> codes;
+  codes.reserve(stats.size());
+  for (auto &site_and_stats : stats)
+    codes.emplace_back(site_and_stats.first.first);
+
+  THPObjectPtr result = PyDict_New();
+  if (!result)
+    return NULL;
+  for (auto &site_and_stats : stats) {
+    PyObject *code = site_and_stats.first.first;
+    THPObjectPtr filename = PyObject_GetAttrString(code, "co_filename");
+    THPObjectPtr name = PyObject_GetAttrString(code, "co_name");
+    if (!filename || !name)
+      return NULL;
+    THPObjectPtr key = Py_BuildValue("(OiO)", filename.get(),
+        site_and_stats.first.second, name.get());
+    THPObjectPtr value = statsToDict(site_and_stats.second);
+    if (!key || !value || PyDict_SetItem(result, key, value) < 0)
+      return NULL;
+  }
+  return result.release();
+  END_HANDLE_TH_ERRORS
+}
+
+PyObject * THPModule_resetPeakMemoryStats(PyObject *module)
+{
+  std::lock_guard<std::mutex> lock(memory_mutex);
+  for (auto &type_and_stats : type_stats)
+    type_and_stats.second.peak_bytes = type_and_stats.second.live_bytes;
+  for (auto &site_and_stats : site_stats)
+    site_and_stats.second.peak_bytes = site_and_stats.second.live_bytes;
+  Py_RETURN_NONE;
+}
+
+PyObject * THPModule_setMemoryAttributionEnabled(PyObject *module, PyObject *arg)
+{
+  HANDLE_TH_ERRORS
+  int enabled = PyObject_IsTrue(arg);
+  if (enabled == -1)
+    return NULL;
+  if (enabled && skipped_files.empty()) {
+    for (const char *name : {"torch.Tensor", "torch.Storage"}) {
+      THPObjectPtr module = PyImport_ImportModule(name);
+      if (!module)
+        return NULL;
+      PyObject *filename = PyObject_GetAttrString(module, "__file__");
+      if (!filename)
+        return NULL;
+      skipped_files.push_back(filename);
+    }
+  }
+  std::vector<PyObject*> codes;
+  {
+    std::lock_guard<std::mutex> lock(memory_mutex);
+    if (enabled && !attribution_enabled) {
+      // Start from scratch every time attribution is enabled
+      for (auto &site_and_stats : site_stats)
+        codes.push_back(site_and_stats.first.first);
+      site_stats.clear();
+      storage_sites.clear();
+    }
+    attribution_enabled = enabled;
+  }
+  for (PyObject *code : codes)
+    Py_DECREF(code);
+  Py_RETURN_NONE;
+  END_HANDLE_TH_ERRORS
+}
 
+PyObject * THPModule_isMemoryAttributionEnabled(PyObject *module)
+{
+  if (attribution_enabled)
+    Py_RETURN_TRUE;
+  Py_RETURN_FALSE;
+}
@@ -10,5 +10,16 @@
 
 #include "generic/Storage.h"
 #include <TH/THGenerateAllTypes.h>
+#include "generic/Storage.h"
+#include <TH/THGenerateHalfType.h>
+
+// Accounting of memory used by CPU storages, per storage type and optionally
+// per Python line that allocated them
+void THPStorage_initMemoryAccounting();
+PyObject * THPModule_memoryStats(PyObject *module);
+PyObject * THPModule_memoryStatsBySite(PyObject *module);
+PyObject * THPModule_resetPeakMemoryStats(PyObject *module);
+PyObject * THPModule_setMemoryAttributionEnabled(PyObject *module, PyObject *arg);
+PyObject * THPModule_isMemoryAttributionEnabled(PyObject *module);
 
 #endif
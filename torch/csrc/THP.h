@@ -24,6 +24,7 @@
 #include "Module.h"
 #include "utils.h" // This requires defined Storage and Tensor types
 #include "serialization.h"
+#include "allocators.h"
 #ifdef WITH_NUMPY
 #include "numpy.h"
 #endif
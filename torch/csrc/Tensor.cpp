@@ -11,6 +11,10 @@
 
 #include "generic/Tensor.cpp"
 #include <TH/THGenerateAllTypes.h>
+#include "generic/Tensor.cpp"
+#include <TH/THGenerateHalfType.h>
 
 #include "generic/TensorCopy.cpp"
 #include <TH/THGenerateAllTypes.h>
+#include "generic/TensorCopy.cpp"
+#include <TH/THGenerateHalfType.h>
@@ -14,5 +14,7 @@
 
 #include "generic/Tensor.h"
 #include <TH/THGenerateAllTypes.h>
+#include "generic/Tensor.h"
+#include <TH/THGenerateHalfType.h>
 
 #endif
@@ -0,0 +1,247 @@
+#include <Python.h>
+#include <algorithm>
+#include <cstring>
+#include <map>
+#include <mutex>
+#include <random>
+#include <unordered_map>
+#include <vector>
+
+#include <unistd.h>
+
+#include "THP.h"
+
+PyBufferAllocator::~PyBufferAllocator() {
+  release();
+}
+
+void PyBufferAllocator::release() {
+  if (!data)
+    return;
+  // Storages can be freed from threads that don't hold the GIL
+  PyGILState_STATE gil = PyGILState_Ensure();
+  PyBuffer_Release(&buffer);
+  PyGILState_Release(gil);
+  data = nullptr;
+}
+
+void* PyBufferAllocator::malloc(long size) {
+  return (*THDefaultAllocator.malloc)(nullptr, size);
+}
+
+void* PyBufferAllocator::realloc(void* ptr, long size) {
+  if (data && ptr == data) {
+    // The borrowed memory can't be resized, so copy it out
+    long available = (char*)buffer.buf + buffer.len - (char*)data;
+    void *new_ptr = this->malloc(size);
+    memcpy(new_ptr, ptr, std::min(size, available));
+    release();
+    return new_ptr;
+  }
+  return (*THDefaultAllocator.realloc)(nullptr, ptr, size);
+}
+
+void PyBufferAllocator::free(void* ptr) {
+  if (!data || ptr != data)
+    (*THDefaultAllocator.free)(nullptr, ptr);
+  delete this;
+}
+
+static void * PyBufferAllocator_malloc(void *ctx, long size) {
+  return ((PyBufferAllocator*)ctx)->malloc(size);
+}
+
+static void * PyBufferAllocator_realloc(void *ctx, void *ptr, long size) {
+  return ((PyBufferAllocator*)ctx)->realloc(ptr, size);
+}
+
+static void PyBufferAllocator_free(void *ctx, void *ptr) {
+  ((PyBufferAllocator*)ctx)->free(ptr);
+}
+
+THAllocator THPBufferAllocator = {
+  PyBufferAllocator_malloc,
+  PyBufferAllocator_realloc,
+  PyBufferAllocator_free
+};
+
+namespace {
+
+// Blocks are rounded up to one of 8 size classes per power of two, so at most
+// 1/8 of each block is wasted, and the smallest block is 64 bytes
+const long kMinBlockSize = 64;
+
+long roundSize(long size) {
+  long power = kMinBlockSize;
+  while (power < size)
+    power <<= 1;
+  long step = std::max(kMinBlockSize, power / 8);
+  return (size + step - 1) / step * step;
+}
+
+struct CachingAllocator {
+  void* malloc(long size);
+  void* realloc(void *ptr, long size);
+  void free(void *ptr);
+  void emptyCache();
+
+  std::mutex mutex;
+  bool enabled = false;
+  bool installed = false;
+  // Functions of THDefaultAllocator before the caching allocator was
+  // installed - used for memory that wasn't allocated by it
+  THAllocator original;
+  // Block size of every pointer given out by the allocator
+  std::unordered_map<void*, long> blocks;
+  // Free blocks of every size class
+  std::map<long, std::vector<void*>> free_blocks;
+  THPCachingAllocatorStats stats = {0, 0, 0, 0, 0};
+};
+
+CachingAllocator caching_allocator;
+
+void* CachingAllocator::malloc(long size) {
+  if (size == 0)
+    return NULL;
+  long block_size = roundSize(size);
+  void *ptr = NULL;
+  {
+    std::lock_guard<std::mutex> lock(mutex);
+    if (!enabled)
+      return (*original.malloc)(nullptr, size);
+    stats.num_allocations++;
+    auto it = free_blocks.find(block_size);
+    if (it != free_blocks.end() && !it->second.empty()) {
+      ptr = it->second.back();
+      it->second.pop_back();
+      stats.cached -= block_size;
+    }
+  }
+  bool cache_miss = !ptr;
+  if (cache_miss) {
+    try {
+      ptr = THAlloc(block_size);
+    } catch (...) {
+      // Give the cached memory back and try again
+      emptyCache();
+      ptr = THAlloc(block_size);
+    }
+  }
+  std::lock_guard<std::mutex> lock(mutex);
+  if (cache_miss)
+    stats.num_cache_misses++;
+  blocks[ptr] = block_size;
+  stats.allocated += block_size;
+  stats.peak_allocated = std::max(stats.peak_allocated, stats.allocated);
+  return ptr;
+}
+
+void* CachingAllocator::realloc(void *ptr, long size) {
+  long block_size;
+  {
+    std::lock_guard<std::mutex> lock(mutex);
+    auto it = blocks.find(ptr);
+    if (!ptr || it == blocks.end())
+      block_size = -1;
+    else
+      block_size = it->second;
+  }
+  if (!ptr)
+    return malloc(size);
+  if (block_size < 0)
+    return (*original.realloc)(nullptr, ptr, size);
+  if (size > 0 && roundSize(size) == block_size)
+    return ptr;
+  void *new_ptr = malloc(size);
+  if (new_ptr)
+    memcpy(new_ptr, ptr, std::min(size, block_size));
+  free(ptr);
+  return new_ptr;
+}
+
+void CachingAllocator::free(void *ptr) {
+  if (!ptr)
+    return;
+  {
+    std::lock_guard<std::mutex> lock(mutex);
+    auto it = blocks.find(ptr);
+    if (it != blocks.end()) {
+      long block_size = it->second;
+      blocks.erase(it);
+      stats.allocated -= block_size;
+      if (enabled) {
+        free_blocks[block_size].push_back(ptr);
+        stats.cached += block_size;
+        return;
+      }
+    }
+  }
+  (*original.free)(nullptr, ptr);
+}
+
+void CachingAllocator::emptyCache() {
+  std::lock_guard<std::mutex> lock(mutex);
+  for (auto &size_blocks : free_blocks) {
+    for (void *ptr : size_blocks.second)
+      THFree(ptr);
+  }
+  free_blocks.clear();
+  stats.cached = 0;
+}
+
+void * CachingAllocator_malloc(void *ctx, long size) {
+  return caching_allocator.malloc(size);
+}
+
+void * CachingAllocator_realloc(void *ctx, void *ptr, long size) {
+  return caching_allocator.realloc(ptr, size);
+}
+
+void CachingAllocator_free(void *ctx, void *ptr) {
+  caching_allocator.free(ptr);
+}
+
+} // anonymous namespace
+
+void THPCachingAllocator_setEnabled(bool enabled) {
+  {
+    std::lock_guard<std::mutex> lock(caching_allocator.mutex);
+    if (!caching_allocator.installed) {
+      // Once installed, the allocator stays in place, because there might be
+      // live storages with memory that has to be returned to it
+      caching_allocator.original = THDefaultAllocator;
+      THDefaultAllocator.malloc = CachingAllocator_malloc;
+      THDefaultAllocator.realloc = CachingAllocator_realloc;
+      THDefaultAllocator.free = CachingAllocator_free;
+      caching_allocator.installed = true;
+    }
+    caching_allocator.enabled = enabled;
+  }
+  if (!enabled)
+    caching_allocator.emptyCache();
+}
+
+bool THPCachingAllocator_isEnabled() {
+  std::lock_guard<std::mutex> lock(caching_allocator.mutex);
+  return caching_allocator.enabled;
+}
+
+void THPCachingAllocator_emptyCache() {
+  caching_allocator.emptyCache();
+}
+
+THPCachingAllocatorStats THPCachingAllocator_getStats() {
+  std::lock_guard<std::mutex> lock(caching_allocator.mutex);
+  return caching_allocator.stats;
+}
+
+std::string THPSharedMemory_newName() {
+  static std::mutex mutex;
+  // The random part makes it unlikely to collide with objects left behind by
+  // a process that had the same pid
+  static unsigned int random = std::random_device()();
+  static long counter = 0;
+  std::lock_guard<std::mutex> lock(mutex);
+  return "/torch_" + std::to_string(getpid()) + "_" + std::to_string(random) +
+      "_" + std::to_string(counter++);
+}
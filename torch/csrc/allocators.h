@@ -0,0 +1,46 @@
+#ifndef THP_ALLOCATORS_INC
+#define THP_ALLOCATORS_INC
+
+#include <string>
+
+// Borrows memory of an object implementing the buffer protocol. The buffer
+// (and so the object) is released when the storage is freed or resized.
+class PyBufferAllocator {
+public:
+  PyBufferAllocator(Py_buffer *view, void *data): buffer(*view), data(data) {}
+  ~PyBufferAllocator();
+
+  void* malloc(long size);
+  void* realloc(void* ptr, long size);
+  void free(void* ptr);
+
+  void release();
+
+  Py_buffer buffer;
+  void *data;
+};
+
+extern THAllocator THPBufferAllocator;
+
+// Keeps memory of freed CPU storages in free lists of size classes and
+// reuses it for new allocations, instead of going to malloc/free every time.
+// When enabled, it's installed into THDefaultAllocator, so it's used by all
+// storages that don't have a custom allocator.
+struct THPCachingAllocatorStats {
+  long allocated;         // bytes of blocks in use
+  long cached;            // bytes of free blocks kept in the cache
+  long peak_allocated;    // maximum of allocated
+  long num_allocations;   // all allocations served by the allocator
+  long num_cache_misses;  // allocations that had to call malloc
+};
+
+void THPCachingAllocator_setEnabled(bool enabled);
+bool THPCachingAllocator_isEnabled();
+void THPCachingAllocator_emptyCache();
+THPCachingAllocatorStats THPCachingAllocator_getStats();
+
+// Returns a new name for a POSIX shared memory object, unique within the
+// process (see Storage.share_memory_)
+std::string THPSharedMemory_newName();
+
+#endif
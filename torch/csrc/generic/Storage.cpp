@@ -88,7 +88,8 @@ static PyObject * THPStorage_(pynew)(PyTypeObject *type, PyObject *args, PyObjec
       self->cdata = ptr;
     } else if (storage_arg) {
       real *data_ptr = storage_arg->cdata->data + storage_arg_offset;
-      THStoragePtr storage = THStorage_(newWithData)(LIBRARY_STATE data_ptr, storage_arg_size);
+      THStoragePtr storage = THStorage_(newWithDataAndAllocator)(LIBRARY_STATE
+          data_ptr, storage_arg_size, &THDefaultAllocator, NULL);
       storage->flag = TH_STORAGE_REFCOUNTED | TH_STORAGE_VIEW;
       storage->view = storage_arg->cdata;
       THStorage_(retain)(LIBRARY_STATE storage_arg->cdata);
@@ -157,6 +158,8 @@ static PyObject * THPStorage_(get)(THPStorage *self, PyObject *index)
     return PyFloat_FromDouble(THStorage_(get)(LIBRARY_STATE self->cdata, nindex));
 #elif defined(THC_REAL_IS_HALF)
     return PyFloat_FromDouble(THC_half2float(THStorage_(get)(LIBRARY_STATE self->cdata, nindex)));
+#elif defined(TH_REAL_IS_HALF)
+    return PyFloat_FromDouble(TH_half2float(THStorage_(get)(LIBRARY_STATE self->cdata, nindex)));
 #else
     return PyLong_FromLong(THStorage_(get)(LIBRARY_STATE self->cdata, nindex));
 #endif
@@ -223,6 +226,61 @@ static int THPStorage_(set)(THPStorage *self, PyObject *index, PyObject *value)
   END_HANDLE_TH_ERRORS_RET(-1)
 }
 
+#ifndef THC_GENERIC_FILE
+
+#if defined(TH_REAL_IS_DOUBLE)
+#define THP_BUFFER_FORMAT "d"
+#elif defined(TH_REAL_IS_FLOAT)
+#define THP_BUFFER_FORMAT "f"
+#elif defined(TH_REAL_IS_LONG)
+#define THP_BUFFER_FORMAT "l"
+#elif defined(TH_REAL_IS_INT)
+#define THP_BUFFER_FORMAT "i"
+#elif defined(TH_REAL_IS_SHORT)
+#define THP_BUFFER_FORMAT "h"
+#elif defined(TH_REAL_IS_CHAR)
+#define THP_BUFFER_FORMAT "b"
+#elif defined(TH_REAL_IS_BYTE)
+#define THP_BUFFER_FORMAT "B"
+#elif defined(TH_REAL_IS_HALF)
+#define THP_BUFFER_FORMAT "e"
+#endif
+
+// Exposes storage memory as a writable, one dimensional buffer
+static int THPStorage_(getbuffer)(THPStorage *self, Py_buffer *view, int flags)
+{
+  HANDLE_TH_ERRORS
+  Py_ssize_t *shape = new Py_ssize_t[1];
+  shape[0] = self->cdata->size;
+  view->buf = self->cdata->data;
+  view->obj = (PyObject*)self;
+  Py_INCREF(self);
+  view->len = self->cdata->size * sizeof(real);
+  view->readonly = 0;
+  view->itemsize = sizeof(real);
+  view->format = (flags & PyBUF_FORMAT) ? (char*)THP_BUFFER_FORMAT : NULL;
+  view->ndim = 1;
+  view->shape = shape;
+  view->strides = NULL;
+  view->suboffsets = NULL;
+  view->internal = shape;
+  return 0;
+  END_HANDLE_TH_ERRORS_RET(-1)
+}
+
+static void THPStorage_(releasebuffer)(THPStorage *self, Py_buffer *view)
+{
+  delete[] (Py_ssize_t*)view->internal;
+}
+
+#undef THP_BUFFER_FORMAT
+
+// Fields are assigned in init, because this struct differs between
+// Python 2 and 3
+static PyBufferProcs THPStorage_(bufferprocs);
+
+#endif
+
 static PyMappingMethods THPStorage_(mappingmethods) = {
   (lenfunc)THPStorage_(length),
   (binaryfunc)THPStorage_(get),
@@ -282,6 +340,14 @@ bool THPStorage_(init)(PyObject *module)
 {
   THPStorageType.tp_methods = THPStorage_(methods);
   THPStorageType.tp_members = THPStorage_(members);
+#ifndef THC_GENERIC_FILE
+  THPStorage_(bufferprocs).bf_getbuffer = (getbufferproc)THPStorage_(getbuffer);
+  THPStorage_(bufferprocs).bf_releasebuffer = (releasebufferproc)THPStorage_(releasebuffer);
+  THPStorageType.tp_as_buffer = &THPStorage_(bufferprocs);
+#if PY_MAJOR_VERSION == 2
+  THPStorageType.tp_flags |= Py_TPFLAGS_HAVE_NEWBUFFER;
+#endif
+#endif
   if (PyType_Ready(&THPStorageType) < 0)
     return false;
   Py_INCREF(&THPStorageType);
@@ -20,6 +20,9 @@ IMPLEMENT_COPY_WRAPPER(copyInt,     THPStorage,          THPIntStorage)
 IMPLEMENT_COPY_WRAPPER(copyLong,    THPStorage,          THPLongStorage)
 IMPLEMENT_COPY_WRAPPER(copyFloat,   THPStorage,          THPFloatStorage)
 IMPLEMENT_COPY_WRAPPER(copyDouble,  THPStorage,          THPDoubleStorage)
+#ifndef THC_GENERIC_FILE
+IMPLEMENT_COPY_WRAPPER(copyHalf,    THPStorage,          THPHalfStorage)
+#endif
 
 #ifdef THC_GENERIC_FILE
 // TODO: half
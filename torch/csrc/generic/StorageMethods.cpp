@@ -12,6 +12,13 @@ static PyObject * THPStorage_(elementSize)(THPStorage *self)
   END_HANDLE_TH_ERRORS
 }
 
+static PyObject * THPStorage_(dataPtr)(THPStorage *self)
+{
+  HANDLE_TH_ERRORS
+  return PyLong_FromVoidPtr(THStorage_(data)(LIBRARY_STATE self->cdata));
+  END_HANDLE_TH_ERRORS
+}
+
 static PyObject * THPStorage_(retain)(THPStorage *self)
 {
   HANDLE_TH_ERRORS
@@ -62,6 +69,204 @@ static PyObject * THPStorage_(fill_)(THPStorage *self, PyObject *number_arg)
   END_HANDLE_TH_ERRORS
 }
 
+#ifndef THC_GENERIC_FILE
+static PyObject * THPStorage_(tolist)(THPStorage *self)
+{
+  HANDLE_TH_ERRORS
+  THStorage *storage = self->cdata;
+  THPObjectPtr list = PyList_New(storage->size);
+  if (!list)
+    return NULL;
+  for (long i = 0; i < storage->size; i++) {
+    PyObject *item = THPUtils_(newReal)(storage->data[i]);
+    if (!item)
+      return NULL;
+    PyList_SET_ITEM(list.get(), i, item);
+  }
+  return list.release();
+  END_HANDLE_TH_ERRORS
+}
+#endif
+
+#ifndef THC_GENERIC_FILE
+static PyObject * THPStorage_(newWithBuffer)(PyObject *_unused, PyObject *args)
+{
+  HANDLE_TH_ERRORS
+  PyObject *obj;
+  Py_ssize_t offset = 0;
+  Py_ssize_t count = -1;
+  if (!PyArg_ParseTuple(args, "O|nn", &obj, &offset, &count))
+    return NULL;
+
+  // Storages are always writable, so read-only objects (like bytes, which
+  // can be shared and cached by the interpreter) are refused
+  Py_buffer buffer;
+  if (PyObject_GetBuffer(obj, &buffer, PyBUF_ANY_CONTIGUOUS | PyBUF_WRITABLE) < 0) {
+    if (PyErr_ExceptionMatches(PyExc_BufferError)) {
+      PyErr_Clear();
+      PyErr_SetString(PyExc_BufferError, "storages can only share memory with "
+          "writable buffers (read-only data, like bytes, can be copied into a "
+          "bytearray first)");
+    }
+    return NULL;
+  }
+  if (offset < 0 || offset > buffer.len) {
+    PyBuffer_Release(&buffer);
+    THPUtils_setError("offset must be between 0 and %ld, but got %ld",
+        (long)buffer.len, (long)offset);
+    return NULL;
+  }
+  if (count < 0) {
+    if ((buffer.len - offset) % sizeof(real) != 0) {
+      PyBuffer_Release(&buffer);
+      THPUtils_setError("buffer size (%ld) minus the offset (%ld) must be a multiple "
+          "of the element size (%ld)", (long)buffer.len, (long)offset, (long)sizeof(real));
+      return NULL;
+    }
+    count = (buffer.len - offset) / sizeof(real);
+  } else if (offset + count * (Py_ssize_t)sizeof(real) > buffer.len) {
+    PyBuffer_Release(&buffer);
+    THPUtils_setError("buffer has only %ld bytes after the offset, but %ld elements "
+        "(%ld bytes) were requested", (long)(buffer.len - offset), (long)count,
+        (long)(count * sizeof(real)));
+    return NULL;
+  }
+
+  real *data = (real*)((char*)buffer.buf + offset);
+  THStoragePtr storage = THStorage_(newWithDataAndAllocator)(
+      LIBRARY_STATE data, count, &THPBufferAllocator, new PyBufferAllocator(&buffer, data));
+  PyObject *result = THPStorage_(newObject)(storage);
+  storage.release();
+  return result;
+  END_HANDLE_TH_ERRORS
+}
+#endif
+
+#ifndef THC_GENERIC_FILE
+static PyObject * THPStorage_(newWithMapping)(PyObject *_unused, PyObject *args)
+{
+  HANDLE_TH_ERRORS
+  const char *filename;
+  int shared = 0;
+  long size = 0;
+  if (!PyArg_ParseTuple(args, "s|il", &filename, &shared, &size))
+    return NULL;
+  THStoragePtr storage = THStorage_(newWithMapping)(LIBRARY_STATE filename, size,
+      shared ? TH_ALLOCATOR_MAPPED_SHARED : 0);
+  PyObject *result = THPStorage_(newObject)(storage);
+  storage.release();
+  return result;
+  END_HANDLE_TH_ERRORS
+}
+
+static PyObject * THPStorage_(flush)(THPStorage *self)
+{
+  HANDLE_TH_ERRORS
+  THStorage *storage = self->cdata;
+  THPUtils_assert(storage->allocator == &THMapAllocator, "only file-mapped "
+      "storages can be flushed");
+  {
+    AutoNoGIL no_gil;
+    THMapAllocator_sync((THMapAllocatorContext*)storage->allocatorContext, storage->data);
+  }
+  Py_RETURN_NONE;
+  END_HANDLE_TH_ERRORS
+}
+
+static PyObject * THPStorage_(advise)(THPStorage *self, PyObject *args)
+{
+  HANDLE_TH_ERRORS
+  THStorage *storage = self->cdata;
+  int advice;
+  long offset = 0;
+  long count = -1;
+  if (!PyArg_ParseTuple(args, "i|ll", &advice, &offset, &count))
+    return NULL;
+  THPUtils_assert(storage->allocator == &THMapAllocator, "only file-mapped "
+      "storages can be advised");
+  if (count < 0)
+    count = storage->size - offset;
+  THPUtils_assert(offset >= 0 && offset + count <= storage->size, "elements "
+      "%ld to %ld are out of range for a storage of size %ld", offset,
+      offset + count, storage->size);
+  THMapAllocator_advise(storage->data + offset, count * sizeof(real), advice);
+  Py_RETURN_NONE;
+  END_HANDLE_TH_ERRORS
+}
+#endif
+
+#ifndef THC_GENERIC_FILE
+static PyObject * THPStorage_(shareMemory_)(THPStorage *self)
+{
+  HANDLE_TH_ERRORS
+  THStorage *storage = self->cdata;
+  if (storage->allocator != &THRefcountedMapAllocator) {
+    std::string name = THPSharedMemory_newName();
+    THMapAllocatorContext *ctx = THMapAllocatorContext_new(name.c_str(),
+        TH_ALLOCATOR_MAPPED_SHAREDMEM | TH_ALLOCATOR_MAPPED_EXCLUSIVE);
+    THStoragePtr new_storage = THStorage_(newWithAllocator)(LIBRARY_STATE
+        storage->size, &THRefcountedMapAllocator, ctx);
+    memcpy(new_storage->data, storage->data, storage->size * sizeof(real));
+    // Move the shared memory into self, and free the old memory together with
+    // the temporary storage
+    std::swap(storage->data, new_storage->data);
+    std::swap(storage->allocator, new_storage->allocator);
+    std::swap(storage->allocatorContext, new_storage->allocatorContext);
+    // The accounting of the memory moves with it
+    new_storage->flag = TH_STORAGE_REFCOUNTED |
+        (storage->flag & (TH_STORAGE_FREEMEM | TH_STORAGE_ACCOUNTED));
+    THStorage_(setFlag)(LIBRARY_STATE storage, TH_STORAGE_FREEMEM | TH_STORAGE_ACCOUNTED);
+    THStorage_(clearFlag)(LIBRARY_STATE storage, TH_STORAGE_RESIZABLE);
+  }
+  Py_INCREF(self);
+  return (PyObject*)self;
+  END_HANDLE_TH_ERRORS
+}
+
+static PyObject * THPStorage_(isShared)(THPStorage *self)
+{
+  if (self->cdata->allocator == &THRefcountedMapAllocator)
+    Py_RETURN_TRUE;
+  Py_RETURN_FALSE;
+}
+
+// Returns a name and size that can be used to map the memory in another
+// process. The handle holds a reference to the memory, so it stays alive
+// even if this storage is freed first; the reference is handed over to the
+// storage created by _new_shared, so every handle has to be used once.
+static PyObject * THPStorage_(shareHandle)(THPStorage *self)
+{
+  HANDLE_TH_ERRORS
+  THStorage *storage = self->cdata;
+  THPUtils_assert(storage->allocator == &THRefcountedMapAllocator,
+      "storage isn't in shared memory - call share_memory_() first");
+  THMapAllocatorContext *ctx = (THMapAllocatorContext*)storage->allocatorContext;
+  THRefcountedMapAllocator_incref(ctx, storage->data);
+  return Py_BuildValue("(sl)", THMapAllocatorContext_filename(ctx), storage->size);
+  END_HANDLE_TH_ERRORS
+}
+
+static PyObject * THPStorage_(newShared)(PyObject *_unused, PyObject *args)
+{
+  HANDLE_TH_ERRORS
+  const char *name;
+  long size;
+  if (!PyArg_ParseTuple(args, "sl", &name, &size))
+    return NULL;
+  THMapAllocatorContext *ctx = THMapAllocatorContext_new(name, TH_ALLOCATOR_MAPPED_SHAREDMEM);
+  THStoragePtr storage = THStorage_(newWithAllocator)(LIBRARY_STATE size,
+      &THRefcountedMapAllocator, ctx);
+  THStorage_(clearFlag)(LIBRARY_STATE storage, TH_STORAGE_RESIZABLE);
+  // The new storage holds its own reference, so the one of the handle can
+  // be released
+  THRefcountedMapAllocator_decref(ctx, storage->data);
+  PyObject *result = THPStorage_(newObject)(storage);
+  storage.release();
+  return result;
+  END_HANDLE_TH_ERRORS
+}
+#endif
+
 PyObject * THPStorage_(writeFile)(THPStorage *self, PyObject *file)
 {
   HANDLE_TH_ERRORS
@@ -70,7 +275,11 @@ PyObject * THPStorage_(writeFile)(THPStorage *self, PyObject *file)
     THPUtils_setError("_write_file couln't retrieve file descriptor from given object");
     return NULL;
   }
-  THPStorage_(writeFileRaw)(self->cdata, fd);
+  {
+    // Let other threads run while the data is written out (see save_async)
+    AutoNoGIL no_gil;
+    THPStorage_(writeFileRaw)(self->cdata, fd);
+  }
   Py_RETURN_NONE;
   END_HANDLE_TH_ERRORS
 }
@@ -83,7 +292,12 @@ PyObject * THPStorage_(newWithFile)(PyObject *_unused, PyObject *file)
     THPUtils_setError("_new_with_file couln't retrieve file descriptor from given object");
     return NULL;
   }
-  THStoragePtr storage = THPStorage_(readFileRaw)(fd);
+  THStoragePtr storage;
+  {
+    // Let other threads run while the data is read (see load_sharded)
+    AutoNoGIL no_gil;
+    storage = THPStorage_(readFileRaw)(fd);
+  }
   PyObject *result = THPStorage_(newObject)(storage);
   storage.release();
   return result;
@@ -91,6 +305,7 @@ PyObject * THPStorage_(newWithFile)(PyObject *_unused, PyObject *file)
 }
 
 static PyMethodDef THPStorage_(methods)[] = {
+  {"data_ptr", (PyCFunction)THPStorage_(dataPtr), METH_NOARGS, NULL},
   {"elementSize", (PyCFunction)THPStorage_(elementSize), METH_NOARGS, NULL},
   {"fill_", (PyCFunction)THPStorage_(fill_), METH_O, NULL},
   {"free", (PyCFunction)THPStorage_(free), METH_NOARGS, NULL},
@@ -98,7 +313,20 @@ static PyMethodDef THPStorage_(methods)[] = {
   {"resize_", (PyCFunction)THPStorage_(resize_), METH_O, NULL},
   {"retain", (PyCFunction)THPStorage_(retain), METH_NOARGS, NULL},
   {"size", (PyCFunction)THPStorage_(size), METH_NOARGS, NULL},
+#ifndef THC_GENERIC_FILE
+  {"tolist", (PyCFunction)THPStorage_(tolist), METH_NOARGS, NULL},
+#endif
   {"_write_file", (PyCFunction)THPStorage_(writeFile), METH_O, NULL},
   {"_new_with_file", (PyCFunction)THPStorage_(newWithFile), METH_O | METH_STATIC, NULL},
+#ifndef THC_GENERIC_FILE
+  {"_new_with_buffer", (PyCFunction)THPStorage_(newWithBuffer), METH_VARARGS | METH_STATIC, NULL},
+  {"_new_with_mapping", (PyCFunction)THPStorage_(newWithMapping), METH_VARARGS | METH_STATIC, NULL},
+  {"_flush", (PyCFunction)THPStorage_(flush), METH_NOARGS, NULL},
+  {"_advise", (PyCFunction)THPStorage_(advise), METH_VARARGS, NULL},
+  {"share_memory_", (PyCFunction)THPStorage_(shareMemory_), METH_NOARGS, NULL},
+  {"isShared", (PyCFunction)THPStorage_(isShared), METH_NOARGS, NULL},
+  {"_share_handle", (PyCFunction)THPStorage_(shareHandle), METH_NOARGS, NULL},
+  {"_new_shared", (PyCFunction)THPStorage_(newShared), METH_VARARGS | METH_STATIC, NULL},
+#endif
   {NULL}
 };
@@ -351,7 +351,7 @@ static bool THPTensor_(_index)(THPTensor *self, PyObject *index,
 static PyObject * THPTensor_(getValue)(THPTensor *self, PyObject *index)
 {
   HANDLE_TH_ERRORS
-#ifndef THC_GENERIC_FILE
+#if !defined(THC_GENERIC_FILE) && !defined(TH_REAL_IS_HALF)
   if(THPByteTensor_IsSubclass(index)) {
     THTensor *t = THTensor_(new)(LIBRARY_STATE_NOARGS);
     THTensor_(maskedSelect)(LIBRARY_STATE t, self->cdata, ((THPByteTensor*)index)->cdata);
@@ -388,7 +388,7 @@ static PyObject * THPTensor_(getValue)(THPTensor *self, PyObject *index)
 int THPTensor_(setValue)(THPTensor *self, PyObject *index, PyObject *value)
 {
   HANDLE_TH_ERRORS
-#if !defined(THC_GENERIC_FILE) || defined(THC_REAL_IS_FLOAT)
+#if (!defined(THC_GENERIC_FILE) && !defined(TH_REAL_IS_HALF)) || defined(THC_REAL_IS_FLOAT)
 #ifdef THC_REAL_IS_FLOAT
   if (THCPByteTensor_IsSubclass(index)) {
     THCPByteTensor *mask = (THCPByteTensor*)index;
@@ -426,7 +426,12 @@ int THPTensor_(setValue)(THPTensor *self, PyObject *index, PyObject *value)
       if (THPUtils_(checkReal)(value)) {
         if (!THPUtils_(parseReal)(value, &v))
           return -1;
+#ifdef TH_REAL_IS_HALF
+        // There's no math for half tensors in TH, so there's no fill either
+        TH_TENSOR_APPLY(real, tresult, *tresult_data = v;);
+#else
         THTensor_(fill)(LIBRARY_STATE tresult, v);
+#endif
       } else {
         // TODO: try to do this without creating a temporary object
         THPTensorPtr tmp = (THPTensor*)THPTensor_(newObject)(tresult_ptr.get());
@@ -20,6 +20,9 @@ IMPLEMENT_COPY_WRAPPER(copyInt,     THPTensor,          THPIntTensor)
 IMPLEMENT_COPY_WRAPPER(copyLong,    THPTensor,          THPLongTensor)
 IMPLEMENT_COPY_WRAPPER(copyFloat,   THPTensor,          THPFloatTensor)
 IMPLEMENT_COPY_WRAPPER(copyDouble,  THPTensor,          THPDoubleTensor)
+#ifndef THC_GENERIC_FILE
+IMPLEMENT_COPY_WRAPPER(copyHalf,    THPTensor,          THPHalfTensor)
+#endif
 
 #ifdef THC_GENERIC_FILE
 IMPLEMENT_COPY_WRAPPER(copyCuda,        THCPTensor,     THCPTensor)
@@ -30,6 +30,8 @@ bool THPUtils_(parseSlice)(PyObject *slice, Py_ssize_t len, Py_ssize_t *ostart,
 
 #ifdef THC_REAL_IS_HALF
 #define CONVERT(expr) THC_float2half((expr))
+#elif defined(TH_REAL_IS_HALF)
+#define CONVERT(expr) TH_float2half((expr))
 #else
 #define CONVERT(expr) (expr)
 #endif
@@ -89,6 +91,8 @@ PyObject * THPUtils_(newReal)(real value)
   return PyFloat_FromDouble(value);
 #elif defined(THC_REAL_IS_HALF)
   return PyFloat_FromDouble(THC_half2float(value));
+#elif defined(TH_REAL_IS_HALF)
+  return PyFloat_FromDouble(TH_half2float(value));
 #else
   // TODO: return long if result doesn't fit
   return PyInt_FromLong(value);
@@ -3,5 +3,7 @@
 
 #include "generic/serialization.h"
 #include <TH/THGenerateAllTypes.h>
+#include "generic/serialization.h"
+#include <TH/THGenerateHalfType.h>
 
 #endif
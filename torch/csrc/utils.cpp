@@ -5,6 +5,8 @@
 
 #include "generic/utils.cpp"
 #include <TH/THGenerateAllTypes.h>
+#include "generic/utils.cpp"
+#include <TH/THGenerateHalfType.h>
 
 bool THPUtils_checkLong(PyObject *index) {
     return PyLong_Check(index) || PyInt_Check(index);
@@ -68,6 +70,26 @@ THLongStorage * THPUtils_getLongStorage(PyObject *args, int ignore_first) {
   return result.release();
 }
 
+// Converts a LongStorage or a sequence of integers into a LongStorage.
+// Returns NULL and sets an error if that's not possible.
+THLongStorage * THPUtils_unpackLongSequence(PyObject *arg) {
+  if (THPLongStorage_IsSubclass(arg)) {
+    THLongStorage *storage = ((THPLongStorage*)arg)->cdata;
+    THLongStorage_retain(storage);
+    return storage;
+  }
+  THPObjectPtr sequence = PySequence_Fast(arg, "expected a LongStorage or a sequence of integers");
+  if (!sequence)
+    return NULL;
+  Py_ssize_t length = PySequence_Fast_GET_SIZE(sequence.get());
+  THLongStoragePtr result = THLongStorage_newWithSize(length);
+  for (Py_ssize_t i = 0; i < length; ++i) {
+    if (!THPUtils_getLong(PySequence_Fast_GET_ITEM(sequence.get(), i), &result->data[i]))
+      return NULL;
+  }
+  return result.release();
+}
+
 void THPUtils_setError(const char *format, ...)
 {
   static const size_t ERROR_BUFFER_SIZE = 1000;
@@ -11,6 +11,7 @@ int THPUtils_getLong(PyObject *index, long *result);
 long THPUtils_unpackLong(PyObject *index);
 int THPUtils_getCallable(PyObject *arg, PyObject **result);
 THLongStorage * THPUtils_getLongStorage(PyObject *args, int ignore_first=0);
+THLongStorage * THPUtils_unpackLongSequence(PyObject *arg);
 void THPUtils_setError(const char *format, ...);
 void THPUtils_invalidArguments(PyObject *given_args, const char *expected_args_desc);
 
@@ -40,8 +41,18 @@ private:
   T *ptr = nullptr;
 };
 
+// Releases the GIL for the lifetime of the object. Only code that doesn't
+// touch any Python objects can run while it's alive.
+struct AutoNoGIL {
+  AutoNoGIL() : save(PyEval_SaveThread()) {}
+  ~AutoNoGIL() { PyEval_RestoreThread(save); }
+  PyThreadState *save;
+};
+
 #include "generic/utils.h"
 #include <TH/THGenerateAllTypes.h>
+#include "generic/utils.h"
+#include <TH/THGenerateHalfType.h>
 
 typedef THPPointer<PyObject> THPObjectPtr;
 typedef THPPointer<THPGenerator> THPGeneratorPtr;
@@ -29,6 +29,7 @@
 """
 
 import torch
+from torch.nn.functions.batchnorm import fold_batchnorm
 from .Module import Module
 from .utils import clear
 
@@ -162,6 +163,13 @@ class BatchNormalization(Module):
     def accGradParameters(self, input, gradOutput, scale=1.):
         return self._backward(input, gradOutput, scale, None, self.gradWeight, self.gradBias)
 
+    def _foldInto(self, weight, bias):
+        # Returns weight and bias of a layer with output features along the
+        # first dimension (e.g. Linear), that make it compute what it computed
+        # followed by this module in evaluation mode
+        return fold_batchnorm(weight, bias, self.running_mean,
+                self.running_var, self.eps, self.weight, self.bias)
+
     def read(self, file, version):
         super(BatchNormalization, self).read(self, file)
         if version < 2:
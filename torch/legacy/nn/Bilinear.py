@@ -56,72 +56,57 @@ class Bilinear(Module):
 
     def updateOutput(self, input):
         self._assertInput(input)
+        batchSize = input[0].size(0)
+        outputSize, inputSize1, inputSize2 = self.weight.size()
 
-        # set up buffer:
+        # buff2[b][k][i] = sum_j weight[k][i][j] * input[1][b][j], for all
+        # output units at once
         self.buff2 = self.buff2 or input[0].new()
-        self.buff2.resizeAs_(input[1])
+        torch.mm(self.buff2, input[1], self.weight.view(outputSize * inputSize1, inputSize2).t())
 
         # compute output scores:
-        self.output.resize_(input[0].size(0), self.weight.size(0))
-        for k in range(self.weight.size(0)):
-            torch.mm(self.buff2, input[0], self.weight[k])
-            self.buff2.mul_(input[1])
-            torch.sum(self.output.narrow(1, k, 1), self.buff2, 1)
+        torch.bmm(self.output, self.buff2.view(batchSize, outputSize, inputSize1),
+                input[0].contiguous().view(batchSize, inputSize1, 1))
+        self.output.resize_(batchSize, outputSize)
 
         if self.bias:
             self.output.add_(self.bias.view(1, self.bias.nElement()).expandAs(self.output))
 
         return self.output
 
+    def _outer(self, input, gradOutput):
+        # buff1[b][k][i] = gradOutput[b][k] * input[0][b][i]
+        batchSize = input[0].size(0)
+        self.buff1 = self.buff1 or input[0].new()
+        torch.bmm(self.buff1, gradOutput.contiguous().view(batchSize, self.weight.size(0), 1),
+                input[0].contiguous().view(batchSize, 1, self.weight.size(1)))
+        return self.buff1.view(batchSize, self.weight.size(0) * self.weight.size(1))
 
     def updateGradInput(self, input, gradOutput):
         if not self.gradInput:
             return
 
         self._assertInputGradOutput(input, gradOutput)
+        batchSize = input[0].size(0)
+        outputSize, inputSize1, inputSize2 = self.weight.size()
+
         # compute d output / d input:
-        self.gradInput[0].resizeAs_(input[0]).fill_(0)
-        self.gradInput[1].resizeAs_(input[1]).fill_(0)
-
-        #: first slice of weight tensor (k = 1)
-        self.gradInput[0].addmm_(input[1], self.weight[0].t())
-        self.gradInput[0].mul_(gradOutput.narrow(1, 0, 1).expand(self.gradInput[0].size(0),
-            self.gradInput[0].size(1)))
-        self.gradInput[1].addmm_(input[0], self.weight[0])
-        self.gradInput[1].mul_(gradOutput.narrow(1, 0, 1).expand(self.gradInput[1].size(0),
-            self.gradInput[1].size(1)))
-
-        #: remaining slices of weight tensor
-        if self.weight.size(0) > 1:
-            self.buff1 = self.buff1 or input[0].new()
-            self.buff1.resizeAs_(input[0])
-
-            for k in range(1, self.weight.size(0)):
-                torch.mm(self.buff1, input[1], self.weight[k].t())
-                self.buff1.mul_(gradOutput.narrow(1, k, 1).expand(self.gradInput[0].size(0),
-                    self.gradInput[0].size(1)))
-                self.gradInput[0].add_(self.buff1)
-
-                torch.mm(self.buff2, input[0], self.weight[k])
-                self.buff2.mul_(gradOutput.narrow(1, k, 1).expand(self.gradInput[1].size(0),
-                    self.gradInput[1].size(1)))
-                self.gradInput[1].add_(self.buff2)
+        torch.bmm(self.gradInput[0], gradOutput.contiguous().view(batchSize, 1, outputSize),
+                self.buff2.view(batchSize, outputSize, inputSize1))
+        self.gradInput[0].resizeAs_(input[0])
+        torch.mm(self.gradInput[1], self._outer(input, gradOutput),
+                self.weight.view(outputSize * inputSize1, inputSize2))
 
         return self.gradInput
 
 
-
     def accGradParameters(self, input, gradOutput, scale=1):
         self._assertInputGradOutput(input, gradOutput)
-
-        # make sure we have buffer:
-        self.buff1 = self.buff1 or input[0].new()
-        self.buff1.resizeAs_(input[0])
+        outputSize, inputSize1, inputSize2 = self.weight.size()
 
         # accumulate parameter gradients:
-        for k in range(self.weight.size(0)):
-            torch.mul(self.buff1, input[0], gradOutput.narrow(1, k, 1).expandAs(input[0]))
-            self.gradWeight[k].addmm_(self.buff1.t(), input[1])
+        self.gradWeight.view(outputSize * inputSize1, inputSize2).addmm_(
+                1, scale, self._outer(input, gradOutput).t(), input[1])
 
         if self.bias:
             self.gradBias.add_(scale, gradOutput.sum(0))
@@ -1,6 +1,6 @@
 import torch
 from .Module import Module
-from .utils import clear
+from .utils import clear, newByteTensor
 
 class Dropout(Module):
 
@@ -9,7 +9,9 @@ class Dropout(Module):
         self.p = p
         self.inplace = inplace
         self.train = True
-        self.noise = torch.Tensor()
+        # Dropped elements are kept as a byte mask, instead of a noise tensor
+        # of the input's type
+        self.noise = torch.ByteTensor()
 
     def updateOutput(self, input):
         if self.inplace:
@@ -18,10 +20,9 @@ class Dropout(Module):
             self.output.resizeAs_(input).copy_(input)
 
         if self.p > 0 and self.train:
-            self.noise.resizeAs_(input)
-            self.noise.bernoulli_(1-self.p)
-            self.noise.div_(1-self.p)
-            self.output.mul_(self.noise)
+            self.noise.resize_(input.size())
+            self.noise.bernoulli_(self.p)
+            self.output.maskedFill_(self.noise, 0).div_(1-self.p)
 
         return self.output
 
@@ -32,13 +33,22 @@ class Dropout(Module):
             self.gradInput.resizeAs_(gradOutput).copy_(gradOutput)
 
         if self.p > 0 and self.train:
-            self.gradInput.mul_(self.noise) # simply mask the gradients with the noise vector
+            self.gradInput.maskedFill_(self.noise, 0).div_(1-self.p) # simply mask the gradients with the noise vector
 
         return self.gradInput
 
     def setp(self, p):
         self.p = p
 
+    def type(self, type=None, tensorCache=None):
+        if not type:
+           return self._type
+
+        self.noise = None
+        super(Dropout, self).type(type, tensorCache)
+        self.noise = newByteTensor(type)
+        return self
+
     def __repr__(self):
         return super(Dropout, self).__repr__() + '({:.4f})'.format(self.p)
 
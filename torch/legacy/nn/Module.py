@@ -276,7 +276,7 @@ class Module(object):
     def listModules(self):
         # include self first
         modules = [self]
-        if self.modules:
+        if getattr(self, 'modules', None):
             for child in self.modules:
                 modules.extend(child.listModules())
         return modules
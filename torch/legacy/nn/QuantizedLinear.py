@@ -0,0 +1,62 @@
+import torch
+from torch.nn.functions.quantized import quantize_weight
+from .Module import Module
+from .utils import clear
+
+class QuantizedLinear(Module):
+    """Inference-only int8 version of a Linear module.
+
+    The weight is quantized with one scale per output, and inputs are
+    quantized with a single scale, so that values in [-inputRange,
+    inputRange] are representable (see Sequential.quantize).
+    """
+
+    def __init__(self, linear, inputRange):
+        super(QuantizedLinear, self).__init__()
+        self.quantizedWeight, self.weightScale = quantize_weight(linear.weight)
+        self.bias = linear.bias.clone() if linear.bias is not None else None
+        self.inputRange = inputRange
+        self.quantizedInput = None
+        self.type(linear.type())
+
+    def parameters(self):
+        return
+
+    def updateOutput(self, input):
+        assert input.dim() == 2
+        if self.quantizedInput is None:
+            self.quantizedInput = torch.CharTensor()
+        self._backend.LinearInt8_updateOutput(
+            self._backend.library_state,
+            input,
+            self.output,
+            self.quantizedWeight,
+            self.weightScale,
+            self.bias,
+            self.quantizedInput,
+            self.inputRange / 127 if self.inputRange > 0 else 1
+        )
+        return self.output
+
+    def updateGradInput(self, input, gradOutput):
+        raise RuntimeError('QuantizedLinear only supports inference')
+
+    def type(self, type=None, tensorCache=None):
+        if not type:
+           return self._type
+
+        quantizedWeight = self.quantizedWeight
+        self.quantizedWeight = None
+        self.quantizedInput = None
+        super(QuantizedLinear, self).type(type, tensorCache)
+        self.quantizedWeight = quantizedWeight
+        return self
+
+    def clearState(self):
+        clear(self, 'quantizedInput')
+        return super(QuantizedLinear, self).clearState()
+
+    def __repr__(self):
+        return super(QuantizedLinear, self).__repr__() + \
+                '({} -> {})'.format(self.quantizedWeight.size(1), self.quantizedWeight.size(0)) + \
+                (' without bias' if self.bias is None else '')
@@ -0,0 +1,82 @@
+import torch
+from torch.nn.functions.quantized import quantize_weight
+from .Module import Module
+from .utils import clear
+
+class QuantizedSpatialConvolution(Module):
+    """Inference-only int8 version of a SpatialConvolution module.
+
+    The weight is quantized with one scale per output plane, and inputs are
+    quantized with a single scale, so that values in [-inputRange,
+    inputRange] are representable (see Sequential.quantize).
+    """
+
+    def __init__(self, conv, inputRange):
+        super(QuantizedSpatialConvolution, self).__init__()
+        self.nInputPlane = conv.nInputPlane
+        self.nOutputPlane = conv.nOutputPlane
+        self.kW = conv.kW
+        self.kH = conv.kH
+        self.dW = conv.dW
+        self.dH = conv.dH
+        self.padW = conv.padW
+        self.padH = conv.padH
+
+        self.quantizedWeight, self.weightScale = quantize_weight(conv.weight)
+        self.bias = conv.bias.clone() if conv.bias is not None else None
+        self.inputRange = inputRange
+        self.columns = None
+        self.type(conv.type())
+
+    def parameters(self):
+        return
+
+    def updateOutput(self, input):
+        if self.columns is None:
+            self.columns = torch.CharTensor()
+        self._backend.SpatialConvolutionInt8_updateOutput(
+            self._backend.library_state,
+            input,
+            self.output,
+            self.quantizedWeight,
+            self.weightScale,
+            self.bias,
+            self.columns,
+            self.kW, self.kH,
+            self.dW, self.dH,
+            self.padW, self.padH,
+            self.inputRange / 127 if self.inputRange > 0 else 1
+        )
+        return self.output
+
+    def updateGradInput(self, input, gradOutput):
+        raise RuntimeError('QuantizedSpatialConvolution only supports inference')
+
+    def type(self, type=None, tensorCache=None):
+        if not type:
+           return self._type
+
+        quantizedWeight = self.quantizedWeight
+        self.quantizedWeight = None
+        self.columns = None
+        super(QuantizedSpatialConvolution, self).type(type, tensorCache)
+        self.quantizedWeight = quantizedWeight
+        return self
+
+    def clearState(self):
+        clear(self, 'columns')
+        return super(QuantizedSpatialConvolution, self).clearState()
+
+    def __repr__(self):
+        s = super(QuantizedSpatialConvolution, self).__repr__()
+        s += '({} -> {}, {}x{}'.format(self.nInputPlane, self.nOutputPlane, self.kW, self.kH)
+        if self.dW != 1 or self.dH != 1 or self.padW != 0 or self.padH != 0:
+            s += ', {}, {}'.format(self.dW, self.dH)
+
+        if self.padW != 0 or self.padH != 0:
+            s += ', {}, {}'.format(self.padW, self.padH)
+
+        s += ')'
+        if self.bias is None:
+           s += ' without bias'
+        return s
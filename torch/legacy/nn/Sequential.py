@@ -3,6 +3,9 @@ from .Container import Container
 
 class Sequential(Container):
 
+    _memoryPlanning = False
+    _memoryPlan = None
+
     def __len__(self):
         return len(self.modules)
 
@@ -30,12 +33,99 @@ class Sequential(Container):
             self.gradInput = torch.Tensor()
 
     def updateOutput(self, input):
+        planKey = None
+        if self._memoryPlanning and not getattr(self, 'train', True) and torch.isTensor(input):
+            planKey = (torch.typename(input), tuple(input.size()),
+                    tuple(id(module) for module in self.modules))
+        if self._memoryPlan is not None and self._memoryPlan[0] != planKey:
+            self._releaseMemoryPlan()
+
+        outputs = []
         currentOutput = input
         for i, module in enumerate(self.modules):
             currentOutput = module.updateOutput(currentOutput)
+            outputs.append(currentOutput)
         self.output = currentOutput
+
+        # The forward with a new plan key is the shape propagation pass
+        if planKey is not None and self._memoryPlan is None:
+            self._memoryPlan = self._makeMemoryPlan(planKey, input, outputs)
         return self.output
 
+    def planMemory(self, enabled=True):
+        """Makes updateOutput in evaluation mode (after evaluate()) write the
+        outputs of the modules into a few shared buffers, instead of keeping
+        a separate output for every module.
+
+        The first forward for an input of a new size (or type) finds how long
+        every output is used, and outputs that aren't used at the same time
+        are assigned to the same buffer - for a chain of modules, that's two
+        buffers. The outputs of the modules (e.g. modules[i].output) are then
+        overwritten by later modules. The buffers are released when the
+        container is back in training mode.
+        """
+        self._memoryPlanning = enabled
+        if not enabled and self._memoryPlan is not None:
+            self._releaseMemoryPlan()
+        return self
+
+    def _makeMemoryPlan(self, key, input, outputs):
+        # values are [first index, last index, size, modules] of outputs that
+        # own their memory - outputs that are views of the previous one (e.g.
+        # of View or an in-place ReLU) extend the lifetime of its value
+        def storageKey(tensor):
+            storage = tensor.storage() if torch.isTensor(tensor) else None
+            return storage._cdata if storage is not None else None
+
+        values = []
+        prevValue = None
+        prevStorage = storageKey(input)
+        for i, (module, output) in enumerate(zip(self.modules, outputs)):
+            if prevValue is not None:
+                prevValue[1] = i
+            outputStorage = storageKey(output)
+            if outputStorage is not None and outputStorage == prevStorage:
+                value = prevValue
+            elif outputStorage is not None and output is module.output:
+                value = [i, i, output.storage().size(), [module]]
+                values.append(value)
+            else:
+                # Outputs that don't come from module.output (e.g. of containers)
+                # aren't planned
+                value = None
+            prevValue, prevStorage = value, outputStorage
+        if prevValue is not None:
+            # The output of the container is used until the next forward
+            prevValue[1] = len(outputs)
+
+        # Values are sorted by their first index, so greedy interval coloring
+        # uses as few buffers as possible
+        buffers = []
+        for value in values:
+            valueType = torch.typename(value[3][0].output)
+            free = [b for b in buffers if b[0] == valueType and b[1] < value[0]]
+            if free:
+                buffer = max(free, key=lambda b: b[2])
+            else:
+                buffer = [valueType, None, 0, []]
+                buffers.append(buffer)
+            buffer[1] = value[1]
+            buffer[2] = max(buffer[2], value[2])
+            buffer[3].extend(value[3])
+
+        planned = []
+        for _, _, size, modules in buffers:
+            storage = modules[0].output.new(size).storage()
+            for module in modules:
+                module.output = module.output.new().set_(storage)
+                planned.append(module)
+        return key, planned, [buffer[2] for buffer in buffers]
+
+    def _releaseMemoryPlan(self):
+        for module in self._memoryPlan[1]:
+            module.output = module.output.new()
+        self._memoryPlan = None
+
     def _iter_with_prev(self):
         return zip(self.modules[-2::-1], self.modules[-1:0:-1])
 
@@ -68,6 +158,90 @@ class Sequential(Container):
             currentGradOutput = current.gradInput
         self.modules[0].accUpdateGradParameters(input, currentGradOutput, lr)
 
+    def foldBatchNorm(self, input=None, precision=1e-5):
+        """Folds batch normalization modules in evaluation mode into the
+        Linear or SpatialConvolution modules that precede them, and removes
+        them.
+
+        If input is given, the outputs for it before and after folding are
+        compared, and if they differ by more than precision (relative to the
+        largest absolute output), the container is left unchanged and
+        a RuntimeError is raised. Returns the number of removed modules.
+        """
+        from .BatchNormalization import BatchNormalization
+        from .Linear import Linear
+        from .SpatialConvolution import SpatialConvolution
+        if input is not None:
+            expected = self.updateOutput(input).clone()
+
+        oldModules = self.modules
+        oldParameters = []
+        modules = []
+        for module in self.modules:
+            prev = modules[-1] if modules else None
+            if (isinstance(module, BatchNormalization) and not module.train and
+                    isinstance(prev, (Linear, SpatialConvolution))):
+                oldParameters.append((prev, prev.weight, prev.bias, prev.gradBias))
+                prev.weight, prev.bias = module._foldInto(prev.weight, prev.bias)
+                if prev.gradBias is None:
+                    prev.gradBias = prev.bias.new(prev.bias.size()).zero_()
+            else:
+                modules.append(module)
+        self.modules = modules
+
+        if input is not None and oldParameters:
+            output = self.updateOutput(input)
+            error = (output - expected).abs().max()
+            if error > precision * max(1, expected.abs().max()):
+                self.modules = oldModules
+                for layer, weight, bias, gradBias in reversed(oldParameters):
+                    layer.weight, layer.bias, layer.gradBias = weight, bias, gradBias
+                raise RuntimeError("outputs differ by {} after folding batch "
+                        "normalization".format(error))
+
+        if len(self.modules) > 0:
+            self.output = self.modules[-1].output
+            self.gradInput = self.modules[0].gradInput
+        return len(oldModules) - len(modules)
+
+    def quantize(self, *inputs):
+        """Replaces Linear and SpatialConvolution modules with their int8
+        versions (QuantizedLinear and QuantizedSpatialConvolution) for
+        inference.
+
+        inputs are sample batches. They are passed through the container to
+        calibrate the range of the inputs of every replaced module, so there
+        has to be at least one. Returns the number of replaced modules.
+        """
+        from .Linear import Linear
+        from .SpatialConvolution import SpatialConvolution
+        from .QuantizedLinear import QuantizedLinear
+        from .QuantizedSpatialConvolution import QuantizedSpatialConvolution
+        if not inputs:
+            raise ValueError("quantize needs at least one calibration input")
+
+        ranges = [0] * len(self.modules)
+        for input in inputs:
+            for i, module in enumerate(self.modules):
+                if isinstance(module, (Linear, SpatialConvolution)):
+                    ranges[i] = max(ranges[i], input.abs().max())
+                input = module.updateOutput(input)
+
+        count = 0
+        for i, module in enumerate(self.modules):
+            if isinstance(module, Linear):
+                self.modules[i] = QuantizedLinear(module, ranges[i])
+            elif isinstance(module, SpatialConvolution):
+                self.modules[i] = QuantizedSpatialConvolution(module, ranges[i])
+            else:
+                continue
+            count += 1
+
+        if len(self.modules) > 0:
+            self.output = self.modules[-1].output
+            self.gradInput = self.modules[0].gradInput
+        return count
+
     def __repr__(self):
         tab = '  '
         line = '\n'
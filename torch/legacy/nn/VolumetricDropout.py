@@ -1,6 +1,6 @@
 import torch
 from .Module import Module
-from .utils import clear
+from .utils import clear, newByteTensor
 
 class VolumetricDropout(Module):
 
@@ -8,7 +8,7 @@ class VolumetricDropout(Module):
         super(VolumetricDropout, self).__init__()
         self.p = p
         self.train = True
-        self.noise = torch.Tensor()
+        self.noise = torch.ByteTensor()
 
     def updateOutput(self, input):
         self.output.resizeAs_(input).copy_(input)
@@ -16,11 +16,11 @@ class VolumetricDropout(Module):
             assert input.dim() == 5
             self.noise.resize_(input.size(0), input.size(1), 1, 1, 1)
 
-            self.noise.bernoulli_(1-self.p)
+            self.noise.bernoulli_(self.p)
             # We expand the random dropouts to the entire feature map because the
             # features are likely correlated accross the map and so the dropout
             # should also be correlated.
-            self.output.mul_(self.noise.expandAs(input))
+            self.output.maskedFill_(self.noise.expandAs(input), 0)
         else:
             self.output.mul_(1-self.p)
 
@@ -29,7 +29,7 @@ class VolumetricDropout(Module):
     def updateGradInput(self, input, gradOutput):
         if self.train:
             self.gradInput.resizeAs_(gradOutput).copy_(gradOutput)
-            self.gradInput.mul_(self.noise.expandAs(input)) # simply mask the gradients with the noise vector
+            self.gradInput.maskedFill_(self.noise.expandAs(input), 0) # simply mask the gradients with the noise vector
         else:
             raise RuntimeError('backprop only defined while training')
 
@@ -38,6 +38,15 @@ class VolumetricDropout(Module):
     def setp(self, p):
         self.p = p
 
+    def type(self, type=None, tensorCache=None):
+        if not type:
+           return self._type
+
+        self.noise = None
+        super(VolumetricDropout, self).type(type, tensorCache)
+        self.noise = newByteTensor(type)
+        return self
+
     def __repr__(self):
         return super(VolumetricDropout, self).__repr__() + '({:.4f})'.format(self.p)
 
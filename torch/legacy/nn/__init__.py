@@ -81,6 +81,8 @@ from .PairwiseDistance import PairwiseDistance
 from .ParallelCriterion import ParallelCriterion
 from .PartialLinear import PartialLinear
 from .Power import Power
+from .QuantizedLinear import QuantizedLinear
+from .QuantizedSpatialConvolution import QuantizedSpatialConvolution
 from .RReLU import RReLU # TODO implement
 from .ReLU6 import ReLU6
 from .Replicate import Replicate
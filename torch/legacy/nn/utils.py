@@ -135,6 +135,13 @@ def contiguousView(output, input, *args):
         output.set_(output.view(*args))
     return output
 
+# returns an empty ByteTensor that can be used as a mask of tensors of
+# the given type (e.g. in maskedFill_)
+def newByteTensor(type):
+    if type.startswith('torch.cuda.'):
+        return torch.cuda.ByteTensor()
+    return torch.ByteTensor()
+
 # go over specified fields and clear them. accepts
 # nn.clearState(self, ['_buffer', '_buffer2']) and
 # nn.clearState(self, '_buffer', '_buffer2')
@@ -1,4 +1,5 @@
 #include "THAllocator.h"
+#include "THAtomic.h"
 
 /* stuff for mapped files */
 #ifdef _WIN32
@@ -52,6 +53,11 @@ THMapAllocatorContext *THMapAllocatorContext_new(const char *filename, int share
   return ctx;
 }
 
+const char *THMapAllocatorContext_filename(THMapAllocatorContext *ctx)
+{
+  return ctx->filename;
+}
+
 long THMapAllocatorContext_size(THMapAllocatorContext *ctx)
 {
   return ctx->size;
@@ -277,6 +283,42 @@ static void THMapAllocator_free(void* ctx_, void* data) {
   THMapAllocatorContext_free(ctx);
 }
 
+void THMapAllocator_sync(THMapAllocatorContext *ctx, void *data)
+{
+#ifdef _WIN32
+  if(!FlushViewOfFile(data, 0))
+    THError("could not flush the mapped file <%s>", ctx->filename);
+#else
+  if(msync(data, ctx->size, MS_SYNC) == -1)
+    THError("could not flush the mapped file <%s>", ctx->filename);
+#endif
+}
+
+void THMapAllocator_advise(void *data, long size, int advice)
+{
+#ifndef _WIN32
+  /* the address has to be aligned to a page */
+  long page_size = sysconf(_SC_PAGESIZE);
+  long misalignment = (long)((size_t)data % page_size);
+  int flag;
+  switch(advice)
+  {
+    case TH_MAP_ADVICE_NORMAL:     flag = MADV_NORMAL; break;
+    case TH_MAP_ADVICE_SEQUENTIAL: flag = MADV_SEQUENTIAL; break;
+    case TH_MAP_ADVICE_RANDOM:     flag = MADV_RANDOM; break;
+    case TH_MAP_ADVICE_WILLNEED:   flag = MADV_WILLNEED; break;
+    case TH_MAP_ADVICE_DONTNEED:   flag = MADV_DONTNEED; break;
+    default:
+      THError("invalid advice %d", advice);
+      return;
+  }
+  if(size <= 0)
+    return;
+  if(madvise((char*)data - misalignment, size + misalignment, flag) == -1)
+    THError("madvise failed");
+#endif
+}
+
 #else
 
 THMapAllocatorContext *THMapAllocatorContext_new(const char *filename, int shared) {
@@ -284,6 +326,11 @@ THMapAllocatorContext *THMapAllocatorContext_new(const char *filename, int share
   return NULL;
 }
 
+const char *THMapAllocatorContext_filename(THMapAllocatorContext *ctx) {
+  THError("file mapping not supported on your system");
+  return NULL;
+}
+
 void THMapAllocatorContext_free(THMapAllocatorContext *ctx) {
   THError("file mapping not supported on your system");
 }
@@ -302,6 +349,14 @@ static void THMapAllocator_free(void* ctx, void* data) {
   THError("file mapping not supported on your system");
 }
 
+void THMapAllocator_sync(THMapAllocatorContext *ctx, void *data) {
+  THError("file mapping not supported on your system");
+}
+
+void THMapAllocator_advise(void *data, long size, int advice) {
+  THError("file mapping not supported on your system");
+}
+
 #endif
 
 THAllocator THMapAllocator = {
@@ -309,3 +364,127 @@ THAllocator THMapAllocator = {
   &THMapAllocator_realloc,
   &THMapAllocator_free
 };
+
+#if defined(HAVE_MMAP) && defined(HAVE_SHM_OPEN) && defined(HAVE_SHM_UNLINK)
+
+/* placed at the beginning of the mapping; the data starts after
+   TH_REFCOUNTED_MAP_HEADER bytes, so it stays aligned */
+typedef struct {
+  int refcount;
+} THMapInfo;
+
+#define TH_REFCOUNTED_MAP_HEADER 64
+
+static void *THRefcountedMapAllocator_alloc(void *ctx_, long size)
+{
+  THMapAllocatorContext *ctx = ctx_;
+  int create = ctx->shared & TH_ALLOCATOR_MAPPED_EXCLUSIVE;
+  int fd;
+  char *data;
+  THMapInfo *info;
+
+  if((fd = shm_open(ctx->filename, O_RDWR | (create ? O_CREAT | O_EXCL : 0), (mode_t)0600)) == -1)
+    THError("unable to open shared memory object <%s>", ctx->filename);
+
+  if(create)
+  {
+    ctx->size = size + TH_REFCOUNTED_MAP_HEADER;
+    if(ftruncate(fd, ctx->size) == -1)
+    {
+      close(fd);
+      shm_unlink(ctx->filename);
+      THError("unable to resize shared memory object <%s> to the right size", ctx->filename);
+    }
+  }
+  else
+  {
+    struct stat file_stat;
+    if(fstat(fd, &file_stat) == -1)
+    {
+      close(fd);
+      THError("unable to stat shared memory object <%s>", ctx->filename);
+    }
+    ctx->size = file_stat.st_size;
+    if(ctx->size < size + TH_REFCOUNTED_MAP_HEADER)
+    {
+      close(fd);
+      THError("shared memory object <%s> is smaller than the required mapping size <%ld>", ctx->filename, size);
+    }
+  }
+
+  data = mmap(NULL, ctx->size, PROT_READ|PROT_WRITE, MAP_SHARED, fd, 0);
+  close(fd);
+  if(data == MAP_FAILED)
+  {
+    if(create)
+      shm_unlink(ctx->filename);
+    THError("unable to mmap shared memory object <%s>", ctx->filename);
+  }
+
+  info = (THMapInfo*)data;
+  if(create)
+    THAtomicSet(&info->refcount, 1);
+  else
+    THAtomicIncrementRef(&info->refcount);
+  return data + TH_REFCOUNTED_MAP_HEADER;
+}
+
+static void *THRefcountedMapAllocator_realloc(void* ctx, void* ptr, long size) {
+  THError("cannot realloc shared memory");
+  return NULL;
+}
+
+void THRefcountedMapAllocator_incref(THMapAllocatorContext *ctx, void *data)
+{
+  THMapInfo *info = (THMapInfo*)((char*)data - TH_REFCOUNTED_MAP_HEADER);
+  THAtomicIncrementRef(&info->refcount);
+}
+
+void THRefcountedMapAllocator_decref(THMapAllocatorContext *ctx, void *data)
+{
+  THMapInfo *info = (THMapInfo*)((char*)data - TH_REFCOUNTED_MAP_HEADER);
+  if(THAtomicDecrementRef(&info->refcount))
+    shm_unlink(ctx->filename);
+}
+
+static void THRefcountedMapAllocator_free(void* ctx_, void* data) {
+  THMapAllocatorContext *ctx = ctx_;
+  char *base = (char*)data - TH_REFCOUNTED_MAP_HEADER;
+
+  THRefcountedMapAllocator_decref(ctx, data);
+  if(munmap(base, ctx->size))
+    THError("could not unmap the shared memory file");
+  THMapAllocatorContext_free(ctx);
+}
+
+#else
+
+static void *THRefcountedMapAllocator_alloc(void* ctx_, long size) {
+  THError("refcounted file mapping not supported on your system");
+  return NULL;
+}
+
+static void *THRefcountedMapAllocator_realloc(void* ctx, void* ptr, long size) {
+  THError("refcounted file mapping not supported on your system");
+  return NULL;
+}
+
+static void THRefcountedMapAllocator_free(void* ctx_, void* data) {
+  THError("refcounted file mapping not supported on your system");
+}
+
+void THRefcountedMapAllocator_incref(THMapAllocatorContext *ctx, void *data) {
+  THError("refcounted file mapping not supported on your system");
+}
+
+void THRefcountedMapAllocator_decref(THMapAllocatorContext *ctx, void *data) {
+  THError("refcounted file mapping not supported on your system");
+}
+
+#endif
+
+THAllocator THRefcountedMapAllocator = {
+  &THRefcountedMapAllocator_alloc,
+  &THRefcountedMapAllocator_realloc,
+  &THRefcountedMapAllocator_free
+};
@@ -5,6 +5,7 @@
 
 #define TH_ALLOCATOR_MAPPED_SHARED 1
 #define TH_ALLOCATOR_MAPPED_SHAREDMEM 2
+#define TH_ALLOCATOR_MAPPED_EXCLUSIVE 4
 
 /* Custom allocator
  */
@@ -22,10 +23,36 @@ extern THAllocator THDefaultAllocator;
 /* file map allocator
  */
 typedef struct THMapAllocatorContext_  THMapAllocatorContext;
-THMapAllocatorContext *THMapAllocatorContext_new(const char *filename, int shared);
+TH_API THMapAllocatorContext *THMapAllocatorContext_new(const char *filename, int shared);
+TH_API const char *THMapAllocatorContext_filename(THMapAllocatorContext *ctx);
 long THMapAllocatorContext_size(THMapAllocatorContext *ctx);
 void THMapAllocatorContext_free(THMapAllocatorContext *ctx);
 
+/* writes changes of mapped data back to the file */
+TH_API void THMapAllocator_sync(THMapAllocatorContext *ctx, void *data);
+
+/* tells the OS how the given part of mapped data is going to be accessed
+   (one of TH_MAP_ADVICE_*), so it can read pages ahead or drop them */
+#define TH_MAP_ADVICE_NORMAL     0
+#define TH_MAP_ADVICE_SEQUENTIAL 1
+#define TH_MAP_ADVICE_RANDOM     2
+#define TH_MAP_ADVICE_WILLNEED   3
+#define TH_MAP_ADVICE_DONTNEED   4
+TH_API void THMapAllocator_advise(void *data, long size, int advice);
+
 extern THAllocator THMapAllocator;
 
+/* shared memory allocator (POSIX shm) that can be mapped by other processes
+ * using the name of the context. The memory starts with a reference count of
+ * all users in all processes, and the name is unlinked when it drops to zero.
+ * With TH_ALLOCATOR_MAPPED_EXCLUSIVE, new memory is created, otherwise the
+ * existing one is mapped.
+ */
+extern THAllocator THRefcountedMapAllocator;
+
+/* change the reference count of memory allocated by THRefcountedMapAllocator,
+ * e.g. to keep it alive while its name is sent to another process */
+TH_API void THRefcountedMapAllocator_incref(THMapAllocatorContext *ctx, void *data);
+TH_API void THRefcountedMapAllocator_decref(THMapAllocatorContext *ctx, void *data);
+
 #endif
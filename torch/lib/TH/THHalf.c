@@ -0,0 +1,128 @@
+#include "THHalf.h"
+
+/* The F16C conversions are compiled separately, with -mf16c (see
+   generic/simd/half_f16c.c), when the compiler supports it */
+#if defined(USE_F16C) && defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
+#define TH_HAVE_F16C_DISPATCH
+#include <cpuid.h>
+void TH_halfArray2floatArray_f16c(float *dst, const THHalf *src, long n);
+void TH_floatArray2halfArray_f16c(THHalf *dst, const float *src, long n);
+#endif
+
+/* Bit manipulations based on "Half to float done quick" by Fabian Giesen,
+   handling infinities, NaNs and denormals */
+
+typedef union
+{
+  unsigned int u;
+  float f;
+} THFloatBits;
+
+float TH_half2float(THHalf h)
+{
+  THFloatBits magic = { 113u << 23 };
+  unsigned int shifted_exp = 0x7c00u << 13; /* exponent mask after shift */
+  unsigned int exp;
+  THFloatBits o;
+
+  o.u = (h.x & 0x7fffu) << 13;      /* exponent/mantissa bits */
+  exp = shifted_exp & o.u;          /* just the exponent */
+  o.u += (127 - 15) << 23;          /* exponent adjust */
+
+  if(exp == shifted_exp)            /* Inf/NaN? */
+    o.u += (128 - 16) << 23;        /* extra exp adjust */
+  else if(exp == 0)                 /* zero/denormal? */
+  {
+    o.u += 1 << 23;                 /* extra exp adjust */
+    o.f -= magic.f;                 /* renormalize */
+  }
+
+  o.u |= (h.x & 0x8000u) << 16;     /* sign bit */
+  return o.f;
+}
+
+THHalf TH_float2half(float f)
+{
+  THFloatBits f32infty = { 255u << 23 };
+  THFloatBits f16max = { (127u + 16) << 23 };
+  THFloatBits denorm_magic = { ((127u - 15) + (23 - 10) + 1) << 23 };
+  THFloatBits in;
+  unsigned int sign;
+  THHalf o;
+
+  in.f = f;
+  sign = in.u & 0x80000000u;
+  in.u ^= sign;
+
+  if(in.u >= f16max.u)              /* result is Inf or NaN */
+    o.x = (in.u > f32infty.u) ? 0x7e00 : 0x7c00;
+  else if(in.u < (113u << 23))      /* zero or denormal */
+  {
+    /* let the FPU do the rounding by adding a number with a suitable
+       exponent, and subtract it from the bits afterwards */
+    in.f += denorm_magic.f;
+    o.x = (unsigned short)(in.u - denorm_magic.u);
+  }
+  else
+  {
+    unsigned int mant_odd = (in.u >> 13) & 1; /* resulting mantissa is odd */
+    in.u += ((unsigned int)(15 - 127) << 23) + 0xfff; /* exponent and rounding bias */
+    in.u += mant_odd;
+    o.x = (unsigned short)(in.u >> 13);
+  }
+
+  o.x |= (unsigned short)(sign >> 16);
+  return o;
+}
+
+#ifdef TH_HAVE_F16C_DISPATCH
+
+static int TH_hasF16C(void)
+{
+  static int result = -1;
+  if(result < 0)
+  {
+    unsigned int eax, ebx, ecx, edx;
+    int has_f16c = 0;
+    /* F16C works on AVX registers, so the OS has to save them as well */
+    if(__get_cpuid(1, &eax, &ebx, &ecx, &edx) &&
+       (ecx & (1u << 29)) && (ecx & (1u << 28)) && (ecx & (1u << 27)))
+    {
+      unsigned int xcr0_lo, xcr0_hi;
+      __asm__ volatile ("xgetbv" : "=a"(xcr0_lo), "=d"(xcr0_hi) : "c"(0));
+      has_f16c = (xcr0_lo & 6) == 6;
+    }
+    result = has_f16c;
+  }
+  return result;
+}
+
+#endif
+
+void TH_halfArray2floatArray(float *dst, const THHalf *src, long n)
+{
+  long i;
+#ifdef TH_HAVE_F16C_DISPATCH
+  if(TH_hasF16C())
+  {
+    TH_halfArray2floatArray_f16c(dst, src, n);
+    return;
+  }
+#endif
+  for(i = 0; i < n; i++)
+    dst[i] = TH_half2float(src[i]);
+}
+
+void TH_floatArray2halfArray(THHalf *dst, const float *src, long n)
+{
+  long i;
+#ifdef TH_HAVE_F16C_DISPATCH
+  if(TH_hasF16C())
+  {
+    TH_floatArray2halfArray_f16c(dst, src, n);
+    return;
+  }
+#endif
+  for(i = 0; i < n; i++)
+    dst[i] = TH_float2half(src[i]);
+}
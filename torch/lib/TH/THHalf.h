@@ -0,0 +1,24 @@
+#ifndef TH_HALF_INC
+#define TH_HALF_INC
+
+#include "THGeneral.h"
+
+/******************************************************************************
+ * 16-bit IEEE 754 floating point numbers. They are used only to store data
+ * compactly, all arithmetic has to be done after converting them to float.
+ ******************************************************************************/
+
+typedef struct
+{
+  unsigned short x;
+} THHalf;
+
+TH_API float TH_half2float(THHalf h);
+TH_API THHalf TH_float2half(float f);
+
+/* Conversions of whole arrays. They use the F16C instructions if the CPU
+   supports them. Rounding is to the nearest even value. */
+TH_API void TH_halfArray2floatArray(float *dst, const THHalf *src, long n);
+TH_API void TH_floatArray2halfArray(THHalf *dst, const float *src, long n);
+
+#endif
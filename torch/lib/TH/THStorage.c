@@ -1,8 +1,27 @@
 #include "THAtomic.h"
 #include "THStorage.h"
 
+static THStorageMemoryHook storageMemoryHook = NULL;
+
+void THSetStorageMemoryHook(THStorageMemoryHook hook)
+{
+  storageMemoryHook = hook;
+}
+
+#define THStorage_reportMemory(storage, event, delta)                        \
+  do {                                                                       \
+    if(storageMemoryHook)                                                    \
+      storageMemoryHook(TH_CONCAT_STRING_2(Real,Storage), storage, event, delta); \
+  } while(0)
+
 #include "generic/THStorage.c"
 #include "THGenerateAllTypes.h"
 
+#include "generic/THStorage.c"
+#include "THGenerateHalfType.h"
+
 #include "generic/THStorageCopy.c"
 #include "THGenerateAllTypes.h"
+
+#include "generic/THStorageCopy.c"
+#include "THGenerateHalfType.h"
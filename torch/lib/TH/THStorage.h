@@ -3,6 +3,7 @@
 
 #include "THGeneral.h"
 #include "THAllocator.h"
+#include "THHalf.h"
 
 #define THStorage        TH_CONCAT_3(TH,Real,Storage)
 #define THStorage_(NAME) TH_CONCAT_4(TH,Real,Storage_,NAME)
@@ -11,10 +12,28 @@
 #define TH_STORAGE_GET(storage, idx) ((storage)->data[(idx)])
 #define TH_STORAGE_SET(storage, idx, value) ((storage)->data[(idx)] = (value))
 
+/* Events reported to the storage memory hook */
+#define TH_STORAGE_EVENT_ALLOC  0
+#define TH_STORAGE_EVENT_RESIZE 1
+#define TH_STORAGE_EVENT_FREE   2
+
+/* Called whenever a storage is created, resized or freed, with the change of
+   its size in bytes. type is a constant string naming the storage type
+   (e.g. "FloatStorage"), so it can be compared by pointer. */
+typedef void (*THStorageMemoryHook)(const char *type, void *storage, int event, long delta);
+
+TH_API void THSetStorageMemoryHook(THStorageMemoryHook hook);
+
 #include "generic/THStorage.h"
 #include "THGenerateAllTypes.h"
 
+#include "generic/THStorage.h"
+#include "THGenerateHalfType.h"
+
 #include "generic/THStorageCopy.h"
 #include "THGenerateAllTypes.h"
 
+#include "generic/THStorageCopy.h"
+#include "THGenerateHalfType.h"
+
 #endif
@@ -10,9 +10,15 @@
 #include "generic/THTensor.c"
 #include "THGenerateAllTypes.h"
 
+#include "generic/THTensor.c"
+#include "THGenerateHalfType.h"
+
 #include "generic/THTensorCopy.c"
 #include "THGenerateAllTypes.h"
 
+#include "generic/THTensorCopy.c"
+#include "THGenerateHalfType.h"
+
 #include "generic/THTensorRandom.c"
 #include "THGenerateAllTypes.h"
 
@@ -16,9 +16,15 @@ typedef struct {
 #include "generic/THTensor.h"
 #include "THGenerateAllTypes.h"
 
+#include "generic/THTensor.h"
+#include "THGenerateHalfType.h"
+
 #include "generic/THTensorCopy.h"
 #include "THGenerateAllTypes.h"
 
+#include "generic/THTensorCopy.h"
+#include "THGenerateHalfType.h"
+
 #include "THTensorMacros.h"
 
 /* random numbers */
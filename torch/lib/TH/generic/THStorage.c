@@ -35,9 +35,11 @@ THStorage* THStorage_(newWithAllocator)(long size,
   storage->data = allocator->malloc(allocatorContext, sizeof(real)*size);
   storage->size = size;
   storage->refcount = 1;
-  storage->flag = TH_STORAGE_REFCOUNTED | TH_STORAGE_RESIZABLE | TH_STORAGE_FREEMEM;
+  storage->flag = TH_STORAGE_REFCOUNTED | TH_STORAGE_RESIZABLE | TH_STORAGE_FREEMEM |
+                  TH_STORAGE_ACCOUNTED;
   storage->allocator = allocator;
   storage->allocatorContext = allocatorContext;
+  THStorage_reportMemory(storage, TH_STORAGE_EVENT_ALLOC, (long)sizeof(real)*size);
   return storage;
 }
 
@@ -49,8 +51,10 @@ THStorage* THStorage_(newWithMapping)(const char *filename, long size, int share
                                                     &THMapAllocator,
                                                     ctx);
 
-  if(size <= 0)
+  if(size <= 0) {
     storage->size = THMapAllocatorContext_size(ctx)/sizeof(real);
+    THStorage_reportMemory(storage, TH_STORAGE_EVENT_RESIZE, (long)sizeof(real)*(storage->size - size));
+  }
 
   THStorage_(clearFlag)(storage, TH_STORAGE_RESIZABLE);
 
@@ -98,6 +102,11 @@ void THStorage_(setFlag)(THStorage *storage, const char flag)
 
 void THStorage_(clearFlag)(THStorage *storage, const char flag)
 {
+  /* A storage that doesn't free its memory doesn't own it */
+  if((flag & TH_STORAGE_FREEMEM) && (storage->flag & TH_STORAGE_ACCOUNTED)) {
+    THStorage_reportMemory(storage, TH_STORAGE_EVENT_FREE, -(long)sizeof(real)*storage->size);
+    storage->flag &= ~TH_STORAGE_ACCOUNTED;
+  }
   storage->flag &= ~flag;
 }
 
@@ -122,15 +131,22 @@ void THStorage_(free)(THStorage *storage)
       if(storage->flag & TH_STORAGE_VIEW) {
         THStorage_(free)(storage->view);
       }
+      if(storage->flag & TH_STORAGE_ACCOUNTED) {
+        THStorage_reportMemory(storage, TH_STORAGE_EVENT_FREE, -(long)sizeof(real)*storage->size);
+      }
       THFree(storage);
     }
   }
 }
 
+/* Takes ownership of data, which has to be allocated with THAlloc */
 THStorage* THStorage_(newWithData)(real *data, long size)
 {
-  return THStorage_(newWithDataAndAllocator)(data, size,
-                                             &THDefaultAllocator, NULL);
+  THStorage *storage = THStorage_(newWithDataAndAllocator)(data, size,
+                                                           &THDefaultAllocator, NULL);
+  THStorage_(setFlag)(storage, TH_STORAGE_ACCOUNTED);
+  THStorage_reportMemory(storage, TH_STORAGE_EVENT_ALLOC, (long)sizeof(real)*size);
+  return storage;
 }
 
 THStorage* THStorage_(newWithDataAndAllocator)(real* data, long size,
@@ -143,6 +159,8 @@ THStorage* THStorage_(newWithDataAndAllocator)(real* data, long size,
   storage->flag = TH_STORAGE_REFCOUNTED | TH_STORAGE_RESIZABLE | TH_STORAGE_FREEMEM;
   storage->allocator = allocator;
   storage->allocatorContext = allocatorContext;
+  /* The data belongs to the caller (e.g. it's a view of another storage or a
+     Python buffer), so it isn't reported to the memory hook */
   return storage;
 }
 
@@ -150,6 +168,7 @@ void THStorage_(resize)(THStorage *storage, long size)
 {
   if(storage->flag & TH_STORAGE_RESIZABLE)
   {
+    long old_size = storage->size;
     if(storage->allocator->realloc == NULL) {
       /* case when the allocator does not have a realloc defined */
       real *old_data = storage->data;
@@ -179,6 +198,13 @@ void THStorage_(resize)(THStorage *storage, long size)
 						  sizeof(real)*size);
       storage->size = size;
     }
+    if(storage->flag & TH_STORAGE_ACCOUNTED) {
+      THStorage_reportMemory(storage, TH_STORAGE_EVENT_RESIZE, (long)sizeof(real)*(size - old_size));
+    } else {
+      /* The data was moved into memory owned by the storage */
+      storage->flag |= TH_STORAGE_ACCOUNTED;
+      THStorage_reportMemory(storage, TH_STORAGE_EVENT_ALLOC, (long)sizeof(real)*size);
+    }
   } else {
     THError("Trying to resize storage that is not resizable");
   }
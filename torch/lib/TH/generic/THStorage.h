@@ -20,6 +20,9 @@
 #define TH_STORAGE_RESIZABLE  2
 #define TH_STORAGE_FREEMEM    4
 #define TH_STORAGE_VIEW       8
+/* Set while the memory of the storage is owned by it and counted by the memory
+   hook (see THSetStorageMemoryHook) */
+#define TH_STORAGE_ACCOUNTED  16
 
 typedef struct THStorage
 {
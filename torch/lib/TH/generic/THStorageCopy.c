@@ -16,13 +16,20 @@ void THStorage_(copy)(THStorage *storage, THStorage *src)
 }
 
 
+/* Half values have to be converted through float */
+#ifdef TH_REAL_IS_HALF
+#define TH_STORAGE_CONVERT(x) TH_float2half((float)(x))
+#else
+#define TH_STORAGE_CONVERT(x) (real)(x)
+#endif
+
 #define IMPLEMENT_THStorage_COPY(TYPENAMESRC) \
 void THStorage_(copy##TYPENAMESRC)(THStorage *storage, TH##TYPENAMESRC##Storage *src) \
 { \
   long i; \
   THArgCheck(storage->size == src->size, 2, "size mismatch"); \
   for(i = 0; i < storage->size; i++) \
-    storage->data[i] = (real)src->data[i]; \
+    storage->data[i] = TH_STORAGE_CONVERT(src->data[i]); \
 }
 
 IMPLEMENT_THStorage_COPY(Byte)
@@ -30,7 +37,36 @@ IMPLEMENT_THStorage_COPY(Char)
 IMPLEMENT_THStorage_COPY(Short)
 IMPLEMENT_THStorage_COPY(Int)
 IMPLEMENT_THStorage_COPY(Long)
-IMPLEMENT_THStorage_COPY(Float)
 IMPLEMENT_THStorage_COPY(Double)
 
+#ifdef TH_REAL_IS_HALF
+void THStorage_(copyFloat)(THStorage *storage, THFloatStorage *src)
+{
+  THArgCheck(storage->size == src->size, 2, "size mismatch");
+  TH_floatArray2halfArray(storage->data, src->data, storage->size);
+}
+
+void THStorage_(copyHalf)(THStorage *storage, THHalfStorage *src)
+{
+  THStorage_(copy)(storage, src);
+}
+#else
+IMPLEMENT_THStorage_COPY(Float)
+
+void THStorage_(copyHalf)(THStorage *storage, THHalfStorage *src)
+{
+  long i;
+  THArgCheck(storage->size == src->size, 2, "size mismatch");
+#ifdef TH_REAL_IS_FLOAT
+  TH_halfArray2floatArray(storage->data, src->data, storage->size);
+#else
+  for(i = 0; i < storage->size; i++)
+    storage->data[i] = (real)TH_half2float(src->data[i]);
+#endif
+}
+#endif
+
+#undef TH_STORAGE_CONVERT
+#undef IMPLEMENT_THStorage_COPY
+
 #endif
@@ -4,13 +4,20 @@
 
 void THTensor_(copy)(THTensor *tensor, THTensor *src)
 {
-  TH_TENSOR_APPLY2(real, tensor, real, src, *tensor_data = (real)(*src_data);)
+  TH_TENSOR_APPLY2(real, tensor, real, src, *tensor_data = *src_data;)
 }
 
+/* Half values have to be converted through float */
+#ifdef TH_REAL_IS_HALF
+#define TH_TENSOR_CONVERT(x) TH_float2half((float)(x))
+#else
+#define TH_TENSOR_CONVERT(x) (real)(x)
+#endif
+
 #define IMPLEMENT_THTensor_COPY(TYPENAMESRC, TYPE_SRC) \
 void THTensor_(copy##TYPENAMESRC)(THTensor *tensor, TH##TYPENAMESRC##Tensor *src) \
 { \
-  TH_TENSOR_APPLY2(real, tensor, TYPE_SRC, src, *tensor_data = (real)(*src_data);) \
+  TH_TENSOR_APPLY2(real, tensor, TYPE_SRC, src, *tensor_data = TH_TENSOR_CONVERT(*src_data);) \
 }
 
 IMPLEMENT_THTensor_COPY(Byte, unsigned char)
@@ -18,7 +25,46 @@ IMPLEMENT_THTensor_COPY(Char, char)
 IMPLEMENT_THTensor_COPY(Short, short)
 IMPLEMENT_THTensor_COPY(Int, int)
 IMPLEMENT_THTensor_COPY(Long, long)
-IMPLEMENT_THTensor_COPY(Float, float)
 IMPLEMENT_THTensor_COPY(Double, double)
 
+#ifdef TH_REAL_IS_HALF
+void THTensor_(copyFloat)(THTensor *tensor, THFloatTensor *src)
+{
+  /* contiguous tensors are converted in bulk */
+  if(THTensor_(isContiguous)(tensor) && THFloatTensor_isContiguous(src) &&
+     THTensor_(nElement)(tensor) == THFloatTensor_nElement(src))
+  {
+    TH_floatArray2halfArray(THTensor_(data)(tensor), THFloatTensor_data(src),
+                            THTensor_(nElement)(tensor));
+    return;
+  }
+  TH_TENSOR_APPLY2(real, tensor, float, src, *tensor_data = TH_float2half(*src_data);)
+}
+
+void THTensor_(copyHalf)(THTensor *tensor, THHalfTensor *src)
+{
+  THTensor_(copy)(tensor, src);
+}
+#else
+IMPLEMENT_THTensor_COPY(Float, float)
+
+void THTensor_(copyHalf)(THTensor *tensor, THHalfTensor *src)
+{
+#ifdef TH_REAL_IS_FLOAT
+  /* contiguous tensors are converted in bulk */
+  if(THTensor_(isContiguous)(tensor) && THHalfTensor_isContiguous(src) &&
+     THTensor_(nElement)(tensor) == THHalfTensor_nElement(src))
+  {
+    TH_halfArray2floatArray(THTensor_(data)(tensor), THHalfTensor_data(src),
+                            THTensor_(nElement)(tensor));
+    return;
+  }
+#endif
+  TH_TENSOR_APPLY2(real, tensor, THHalf, src, *tensor_data = (real)TH_half2float(*src_data);)
+}
+#endif
+
+#undef TH_TENSOR_CONVERT
+#undef IMPLEMENT_THTensor_COPY
+
 #endif
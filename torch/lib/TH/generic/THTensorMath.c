@@ -3,6 +3,7 @@
 #else
 
 #define TH_OMP_OVERHEAD_THRESHOLD 100000
+#define TH_BMM_MAX_PARALLEL_PRODUCT (128 * 128 * 128)
 
 void THTensor_(fill)(THTensor *r_, real value)
 {
@@ -793,6 +794,73 @@ void THTensor_(match)(THTensor *r_, THTensor *m1, THTensor *m2, real gain)
   THTensor_(free)(m2);
 }
 
+/* r_ = beta * t + alpha * (S * dense), where the sparse matrix S (of
+   t->size[0] rows and dense->size[0] columns) has the nnz elements values,
+   at rows indices[0] and columns indices[1]. Duplicate elements are
+   summed. */
+void THTensor_(spaddmm)(THTensor *r_, real beta, THTensor *t, real alpha, THLongTensor *indices, THTensor *values, THTensor *dense)
+{
+  long i, nnz, nRows, nCols, nDense;
+  long *rows, *cols;
+  real *values_data, *r_data, *dense_data;
+
+  if( (t->nDimension != 2) || (dense->nDimension != 2) )
+    THError("matrices expected, got %dD, %dD tensors", t->nDimension, dense->nDimension);
+  THArgCheck(indices->nDimension == 2 && indices->size[0] == 2, 5,
+      "indices should be a 2 x nnz tensor");
+  nnz = indices->size[1];
+  THArgCheck(values->nDimension == 1 && values->size[0] == nnz, 6,
+      "values should be a vector of nnz elements");
+
+  nRows = t->size[0];
+  nCols = t->size[1];
+  nDense = dense->size[0];
+  if(dense->size[1] != nCols) {
+    THDescBuff bt = THTensor_(sizeDesc)(t);
+    THDescBuff bd = THTensor_(sizeDesc)(dense);
+    THError("size mismatch, t: %s, dense: %s", bt.str, bd.str);
+  }
+
+  indices = THLongTensor_newContiguous(indices);
+  values = THTensor_(newContiguous)(values);
+  rows = THLongTensor_data(indices);
+  cols = rows + nnz;
+  for(i = 0; i < nnz; i++)
+  {
+    if(rows[i] - TH_INDEX_BASE < 0 || rows[i] - TH_INDEX_BASE >= nRows ||
+       cols[i] - TH_INDEX_BASE < 0 || cols[i] - TH_INDEX_BASE >= nDense)
+    {
+      THLongTensor_free(indices);
+      THTensor_(free)(values);
+      THError("index (%ld, %ld) out of range of a %ldx%ld sparse matrix",
+          rows[i], cols[i], nRows, nDense);
+    }
+  }
+
+  if(t != r_)
+  {
+    THTensor_(resizeAs)(r_, t);
+    THTensor_(copy)(r_, t);
+  }
+  if(beta == 0)
+    THTensor_(zero)(r_);
+  else if(beta != 1)
+    THTensor_(mul)(r_, r_, beta);
+
+  values_data = THTensor_(data)(values);
+  r_data = THTensor_(data)(r_);
+  dense_data = THTensor_(data)(dense);
+  for(i = 0; i < nnz; i++)
+  {
+    THBlas_(axpy)(nCols, alpha * values_data[i],
+                  dense_data + (cols[i] - TH_INDEX_BASE) * dense->stride[0], dense->stride[1],
+                  r_data + (rows[i] - TH_INDEX_BASE) * r_->stride[0], r_->stride[1]);
+  }
+
+  THLongTensor_free(indices);
+  THTensor_(free)(values);
+}
+
 void THTensor_(addmm)(THTensor *r_, real beta, THTensor *t, real alpha, THTensor *m1, THTensor *m2)
 {
   char transpose_r, transpose_m1, transpose_m2;
@@ -937,7 +1005,10 @@ void THTensor_(addr)(THTensor *r_, real beta, THTensor *t, real alpha, THTensor
     THTensor_(copy)(r_, t);
   }
 
-  if(beta != 1)
+  /* like in gemm, a zero beta means r_ is not read (it might be uninitialized) */
+  if(beta == 0)
+    THTensor_(zero)(r_);
+  else if(beta != 1)
     THTensor_(mul)(r_, r_, beta);
 
   if(r_->stride[0] == 1)
@@ -1032,21 +1103,24 @@ void THTensor_(baddbmm)(THTensor *result, real beta, THTensor *t, real alpha, TH
     THTensor_(copy)(result, t);
   }
 
-  THTensor *matrix1 = THTensor_(new)();
-  THTensor *matrix2 = THTensor_(new)();
-  THTensor *result_matrix = THTensor_(new)();
+  /* Batches of small products are split between threads. Large products
+     are computed one at a time, so that they can use a multithreaded BLAS */
+  long productSize = dim1 * dim2 * THTensor_(size)(batch1, 2);
+  int parallel = bs > 1 && productSize <= TH_BMM_MAX_PARALLEL_PRODUCT &&
+    bs * productSize > TH_OMP_OVERHEAD_THRESHOLD;
 
-  for (batch = 0; batch < THTensor_(size)(batch1, 0); ++batch) {
-    THTensor_(select)(matrix1, batch1, 0, batch);
-    THTensor_(select)(matrix2, batch2, 0, batch);
-    THTensor_(select)(result_matrix, result, 0, batch);
+  #pragma omp parallel for if(parallel) private(batch)
+  for (batch = 0; batch < bs; ++batch) {
+    THTensor *matrix1 = THTensor_(newSelect)(batch1, 0, batch);
+    THTensor *matrix2 = THTensor_(newSelect)(batch2, 0, batch);
+    THTensor *result_matrix = THTensor_(newSelect)(result, 0, batch);
 
     THTensor_(addmm)(result_matrix, beta, result_matrix, alpha, matrix1, matrix2);
-  }
 
-  THTensor_(free)(matrix1);
-  THTensor_(free)(matrix2);
-  THTensor_(free)(result_matrix);
+    THTensor_(free)(matrix1);
+    THTensor_(free)(matrix2);
+    THTensor_(free)(result_matrix);
+  }
 }
 
 long THTensor_(numel)(THTensor *t)
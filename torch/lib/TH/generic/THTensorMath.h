@@ -53,6 +53,7 @@ TH_API void THTensor_(addcdiv)(THTensor *r_, THTensor *t, real value, THTensor *
 
 TH_API void THTensor_(addmv)(THTensor *r_, real beta, THTensor *t, real alpha, THTensor *mat,  THTensor *vec);
 TH_API void THTensor_(addmm)(THTensor *r_, real beta, THTensor *t, real alpha, THTensor *mat1, THTensor *mat2);
+TH_API void THTensor_(spaddmm)(THTensor *r_, real beta, THTensor *t, real alpha, THLongTensor *indices, THTensor *values, THTensor *dense);
 TH_API void THTensor_(addr)(THTensor *r_,  real beta, THTensor *t, real alpha, THTensor *vec1, THTensor *vec2);
 
 TH_API void THTensor_(addbmm)(THTensor *r_, real beta, THTensor *t, real alpha, THTensor *batch1, THTensor *batch2);
@@ -0,0 +1,23 @@
+#include <immintrin.h>
+#include "../../THHalf.h"
+
+/* F16C versions of TH_halfArray2floatArray and TH_floatArray2halfArray. They
+   are compiled with -mavx -mf16c and only called on CPUs that support them. */
+
+void TH_halfArray2floatArray_f16c(float *dst, const THHalf *src, long n)
+{
+  long i;
+  for(i = 0; i + 8 <= n; i += 8)
+    _mm256_storeu_ps(dst + i, _mm256_cvtph_ps(_mm_loadu_si128((const __m128i*)(src + i))));
+  for(; i < n; i++)
+    dst[i] = TH_half2float(src[i]);
+}
+
+void TH_floatArray2halfArray_f16c(THHalf *dst, const float *src, long n)
+{
+  long i;
+  for(i = 0; i + 8 <= n; i += 8)
+    _mm_storeu_si128((__m128i*)(dst + i), _mm256_cvtps_ph(_mm256_loadu_ps(src + i), 0));
+  for(; i < n; i++)
+    dst[i] = TH_float2half(src[i]);
+}
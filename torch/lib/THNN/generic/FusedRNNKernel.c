@@ -0,0 +1,265 @@
+#ifndef TH_GENERIC_FILE
+#define TH_GENERIC_FILE "generic/FusedRNNKernel.c"
+#else
+
+/*
+ * Pointwise parts of a timestep of LSTM and GRU layers. The matrix products
+ * are computed by the caller (all gates of a timestep at once), so these
+ * only apply the gate nonlinearities and update the state, in a single pass
+ * over each batch x hiddenSize block.
+ */
+
+static inline real THNN_(FusedRNN_sigmoid)(real x)
+{
+  return 1. / (1. + exp(-x));
+}
+
+void THNN_(LSTMFused_updateOutput)(
+          THNNState *state,
+          THTensor *gates,
+          THTensor *cx,
+          THTensor *hy,
+          THTensor *cy)
+{
+  THArgCheck(gates->nDimension == 2 && gates->size[1] % 4 == 0, 2,
+      "batch x 4*hiddenSize gates expected");
+  THArgCheck(THTensor_(isContiguous)(gates), 2, "gates must be contiguous");
+  long batchSize = gates->size[0];
+  long hiddenSize = gates->size[1] / 4;
+  THArgCheck(THTensor_(nElement)(cx) == batchSize * hiddenSize, 3,
+      "cell state should have batch x hiddenSize elements");
+
+  cx = THTensor_(newContiguous)(cx);
+  THTensor_(resize2d)(hy, batchSize, hiddenSize);
+  THTensor_(resize2d)(cy, batchSize, hiddenSize);
+  THArgCheck(THTensor_(isContiguous)(hy), 4, "hy must be contiguous");
+  THArgCheck(THTensor_(isContiguous)(cy), 5, "cy must be contiguous");
+
+  real *gates_data = THTensor_(data)(gates);
+  real *cx_data = THTensor_(data)(cx);
+  real *hy_data = THTensor_(data)(hy);
+  real *cy_data = THTensor_(data)(cy);
+
+  long b;
+#pragma omp parallel for private(b)
+  for (b = 0; b < batchSize; b++)
+  {
+    real *ingate = gates_data + b*4*hiddenSize;
+    real *forgetgate = ingate + hiddenSize;
+    real *cellgate = ingate + 2*hiddenSize;
+    real *outgate = ingate + 3*hiddenSize;
+    long j;
+    for (j = 0; j < hiddenSize; j++)
+    {
+      long k = b*hiddenSize + j;
+      real i = ingate[j] = THNN_(FusedRNN_sigmoid)(ingate[j]);
+      real f = forgetgate[j] = THNN_(FusedRNN_sigmoid)(forgetgate[j]);
+      real g = cellgate[j] = tanh(cellgate[j]);
+      real o = outgate[j] = THNN_(FusedRNN_sigmoid)(outgate[j]);
+      real c = f * cx_data[k] + i * g;
+      cy_data[k] = c;
+      hy_data[k] = o * tanh(c);
+    }
+  }
+
+  THTensor_(free)(cx);
+}
+
+void THNN_(LSTMFused_updateGradInput)(
+          THNNState *state,
+          THTensor *gates,
+          THTensor *cx,
+          THTensor *cy,
+          THTensor *gradHy,
+          THTensor *gradCy,
+          THTensor *gradGates,
+          THTensor *gradCx)
+{
+  THArgCheck(gates->nDimension == 2 && gates->size[1] % 4 == 0, 2,
+      "batch x 4*hiddenSize gates expected");
+  long batchSize = gates->size[0];
+  long hiddenSize = gates->size[1] / 4;
+  THArgCheck(THTensor_(nElement)(gradHy) == batchSize * hiddenSize, 5,
+      "gradHy should have batch x hiddenSize elements");
+
+  gates = THTensor_(newContiguous)(gates);
+  cx = THTensor_(newContiguous)(cx);
+  cy = THTensor_(newContiguous)(cy);
+  gradHy = THTensor_(newContiguous)(gradHy);
+  if (gradCy)
+    gradCy = THTensor_(newContiguous)(gradCy);
+  THTensor_(resize2d)(gradGates, batchSize, 4*hiddenSize);
+  THTensor_(resize2d)(gradCx, batchSize, hiddenSize);
+  THArgCheck(THTensor_(isContiguous)(gradGates), 7, "gradGates must be contiguous");
+  THArgCheck(THTensor_(isContiguous)(gradCx), 8, "gradCx must be contiguous");
+
+  real *gates_data = THTensor_(data)(gates);
+  real *cx_data = THTensor_(data)(cx);
+  real *cy_data = THTensor_(data)(cy);
+  real *gradHy_data = THTensor_(data)(gradHy);
+  real *gradCy_data = gradCy ? THTensor_(data)(gradCy) : NULL;
+  real *gradGates_data = THTensor_(data)(gradGates);
+  real *gradCx_data = THTensor_(data)(gradCx);
+
+  long b;
+#pragma omp parallel for private(b)
+  for (b = 0; b < batchSize; b++)
+  {
+    real *ingate = gates_data + b*4*hiddenSize;
+    real *gradIngate = gradGates_data + b*4*hiddenSize;
+    long j;
+    for (j = 0; j < hiddenSize; j++)
+    {
+      long k = b*hiddenSize + j;
+      real i = ingate[j];
+      real f = ingate[hiddenSize + j];
+      real g = ingate[2*hiddenSize + j];
+      real o = ingate[3*hiddenSize + j];
+      real tanhCy = tanh(cy_data[k]);
+      real gradC = gradHy_data[k] * o * (1 - tanhCy * tanhCy);
+      if (gradCy_data)
+        gradC += gradCy_data[k];
+      gradIngate[j] = gradC * g * i * (1 - i);
+      gradIngate[hiddenSize + j] = gradC * cx_data[k] * f * (1 - f);
+      gradIngate[2*hiddenSize + j] = gradC * i * (1 - g * g);
+      gradIngate[3*hiddenSize + j] = gradHy_data[k] * tanhCy * o * (1 - o);
+      gradCx_data[k] = gradC * f;
+    }
+  }
+
+  THTensor_(free)(gates);
+  THTensor_(free)(cx);
+  THTensor_(free)(cy);
+  THTensor_(free)(gradHy);
+  if (gradCy)
+    THTensor_(free)(gradCy);
+}
+
+/* storage holds r, z, n, the hidden part of the new gate and hx, which are
+   needed by the backward */
+void THNN_(GRUFused_updateOutput)(
+          THNNState *state,
+          THTensor *inputGates,
+          THTensor *hiddenGates,
+          THTensor *hx,
+          THTensor *hy,
+          THTensor *storage)
+{
+  THArgCheck(inputGates->nDimension == 2 && inputGates->size[1] % 3 == 0, 2,
+      "batch x 3*hiddenSize gates expected");
+  THArgCheck(THTensor_(isSameSizeAs)(inputGates, hiddenGates), 3,
+      "input and hidden gates should have the same size");
+  long batchSize = inputGates->size[0];
+  long hiddenSize = inputGates->size[1] / 3;
+  THArgCheck(THTensor_(nElement)(hx) == batchSize * hiddenSize, 4,
+      "hidden state should have batch x hiddenSize elements");
+
+  inputGates = THTensor_(newContiguous)(inputGates);
+  hiddenGates = THTensor_(newContiguous)(hiddenGates);
+  hx = THTensor_(newContiguous)(hx);
+  THTensor_(resize2d)(hy, batchSize, hiddenSize);
+  THTensor_(resize2d)(storage, batchSize, 5*hiddenSize);
+  THArgCheck(THTensor_(isContiguous)(hy), 5, "hy must be contiguous");
+  THArgCheck(THTensor_(isContiguous)(storage), 6, "storage must be contiguous");
+
+  real *inputGates_data = THTensor_(data)(inputGates);
+  real *hiddenGates_data = THTensor_(data)(hiddenGates);
+  real *hx_data = THTensor_(data)(hx);
+  real *hy_data = THTensor_(data)(hy);
+  real *storage_data = THTensor_(data)(storage);
+
+  long b;
+#pragma omp parallel for private(b)
+  for (b = 0; b < batchSize; b++)
+  {
+    real *ig = inputGates_data + b*3*hiddenSize;
+    real *hg = hiddenGates_data + b*3*hiddenSize;
+    real *saved = storage_data + b*5*hiddenSize;
+    long j;
+    for (j = 0; j < hiddenSize; j++)
+    {
+      long k = b*hiddenSize + j;
+      real r = THNN_(FusedRNN_sigmoid)(ig[j] + hg[j]);
+      real z = THNN_(FusedRNN_sigmoid)(ig[hiddenSize + j] + hg[hiddenSize + j]);
+      real hn = hg[2*hiddenSize + j];
+      real n = tanh(ig[2*hiddenSize + j] + r * hn);
+      real h = hx_data[k];
+      hy_data[k] = (1 - z) * n + z * h;
+      saved[j] = r;
+      saved[hiddenSize + j] = z;
+      saved[2*hiddenSize + j] = n;
+      saved[3*hiddenSize + j] = hn;
+      saved[4*hiddenSize + j] = h;
+    }
+  }
+
+  THTensor_(free)(inputGates);
+  THTensor_(free)(hiddenGates);
+  THTensor_(free)(hx);
+}
+
+/* gradHx only gets the gradient of the direct dependency of hy on hx; the
+   one going through the hidden gates is added by the caller */
+void THNN_(GRUFused_updateGradInput)(
+          THNNState *state,
+          THTensor *gradHy,
+          THTensor *storage,
+          THTensor *gradInputGates,
+          THTensor *gradHiddenGates,
+          THTensor *gradHx)
+{
+  THArgCheck(storage->nDimension == 2 && storage->size[1] % 5 == 0, 3,
+      "batch x 5*hiddenSize storage expected");
+  long batchSize = storage->size[0];
+  long hiddenSize = storage->size[1] / 5;
+  THArgCheck(THTensor_(nElement)(gradHy) == batchSize * hiddenSize, 2,
+      "gradHy should have batch x hiddenSize elements");
+
+  gradHy = THTensor_(newContiguous)(gradHy);
+  storage = THTensor_(newContiguous)(storage);
+  THTensor_(resize2d)(gradInputGates, batchSize, 3*hiddenSize);
+  THTensor_(resize2d)(gradHiddenGates, batchSize, 3*hiddenSize);
+  THTensor_(resize2d)(gradHx, batchSize, hiddenSize);
+  THArgCheck(THTensor_(isContiguous)(gradInputGates), 4, "gradInputGates must be contiguous");
+  THArgCheck(THTensor_(isContiguous)(gradHiddenGates), 5, "gradHiddenGates must be contiguous");
+  THArgCheck(THTensor_(isContiguous)(gradHx), 6, "gradHx must be contiguous");
+
+  real *gradHy_data = THTensor_(data)(gradHy);
+  real *storage_data = THTensor_(data)(storage);
+  real *gradInputGates_data = THTensor_(data)(gradInputGates);
+  real *gradHiddenGates_data = THTensor_(data)(gradHiddenGates);
+  real *gradHx_data = THTensor_(data)(gradHx);
+
+  long b;
+#pragma omp parallel for private(b)
+  for (b = 0; b < batchSize; b++)
+  {
+    real *saved = storage_data + b*5*hiddenSize;
+    real *gig = gradInputGates_data + b*3*hiddenSize;
+    real *ghg = gradHiddenGates_data + b*3*hiddenSize;
+    long j;
+    for (j = 0; j < hiddenSize; j++)
+    {
+      long k = b*hiddenSize + j;
+      real r = saved[j];
+      real z = saved[hiddenSize + j];
+      real n = saved[2*hiddenSize + j];
+      real hn = saved[3*hiddenSize + j];
+      real h = saved[4*hiddenSize + j];
+      real gh = gradHy_data[k];
+      real gradN = gh * (1 - z) * (1 - n * n);
+      real gradR = gradN * hn * r * (1 - r);
+      real gradZ = gh * (h - n) * z * (1 - z);
+      gig[j] = ghg[j] = gradR;
+      gig[hiddenSize + j] = ghg[hiddenSize + j] = gradZ;
+      gig[2*hiddenSize + j] = gradN;
+      ghg[2*hiddenSize + j] = gradN * r;
+      gradHx_data[k] = gh * z;
+    }
+  }
+
+  THTensor_(free)(gradHy);
+  THTensor_(free)(storage);
+}
+
+#endif
@@ -0,0 +1,188 @@
+#ifndef TH_GENERIC_FILE
+#define TH_GENERIC_FILE "generic/LinearInt8.c"
+#else
+
+/*
+ * Symmetric int8 quantization: a value x is stored as q = round(x / scale),
+ * clamped to [-127, 127]. Inputs have a single scale (calibrated from sample
+ * batches), weights have one scale per output channel, so a dot product of
+ * quantized rows, accumulated in int32, only has to be multiplied by
+ * inputScale * weightScale[k] to give the output.
+ *
+ * The data of CharTensors is plain char, which is unsigned on some platforms
+ * (e.g. ARM and POWER), so it's always accessed as signed char.
+ */
+
+static inline signed char THNN_(Int8_quantize)(real x, real invScale)
+{
+  real v = x * invScale;
+  if (v > 127)
+    v = 127;
+  else if (v < -127)
+    v = -127;
+  return (signed char)(v >= 0 ? v + 0.5 : v - 0.5);
+}
+
+#ifndef THNN_INT8_GEMM_DEFINED
+#define THNN_INT8_GEMM_DEFINED
+
+/* The int32 products don't depend on real, so they're only defined once */
+
+/* The AVX2 product is compiled separately, with -mavx2 (see int8_gemm_avx2.c),
+   when the compiler supports it */
+#if defined(THNN_HAVE_INT8_AVX2) && defined(__GNUC__) && \
+    (defined(__x86_64__) || defined(__i386__))
+#define THNN_HAVE_INT8_AVX2_DISPATCH
+#include <cpuid.h>
+void THNN_Int8_gemm_avx2(long m, long n, long k, signed char *a, signed char *b, int *c,
+                         long blockSize);
+#endif
+
+/* Rows of b are processed in blocks of about 64KB, which stay in cache while
+   they are multiplied with all rows of a */
+static long THNN_Int8_blockSize(long k)
+{
+  long blockSize = k > 0 ? 65536 / k : 65536;
+  return blockSize < 4 ? 4 : blockSize;
+}
+
+static void THNN_Int8_gemm_default(long m, long n, long k, signed char *a, signed char *b, int *c)
+{
+  long blockSize = THNN_Int8_blockSize(k);
+  long i, j, j0, l;
+  for (j0 = 0; j0 < n; j0 += blockSize) {
+    long j1 = j0 + blockSize < n ? j0 + blockSize : n;
+    for (i = 0; i < m; i++) {
+      signed char *ai = a + i*k;
+      for (j = j0; j < j1; j++) {
+        signed char *bj = b + j*k;
+        int acc = 0;
+        for (l = 0; l < k; l++)
+          acc += ai[l] * bj[l];
+        c[i*n + j] = acc;
+      }
+    }
+  }
+}
+
+#ifdef THNN_HAVE_INT8_AVX2_DISPATCH
+
+static int THNN_Int8_hasAVX2(void)
+{
+  static int result = -1;
+  if (result < 0) {
+    unsigned int eax, ebx, ecx, edx;
+    int has_avx2 = 0;
+    /* AVX registers have to be saved by the OS as well */
+    if (__get_cpuid(1, &eax, &ebx, &ecx, &edx) &&
+        (ecx & (1u << 28)) && (ecx & (1u << 27))) {
+      unsigned int xcr0_lo, xcr0_hi;
+      __asm__ volatile ("xgetbv" : "=a"(xcr0_lo), "=d"(xcr0_hi) : "c"(0));
+      if ((xcr0_lo & 6) == 6 && __get_cpuid_max(0, NULL) >= 7) {
+        __cpuid_count(7, 0, eax, ebx, ecx, edx);
+        has_avx2 = (ebx & (1u << 5)) != 0;
+      }
+    }
+    result = has_avx2;
+  }
+  return result;
+}
+
+#endif
+
+/* c = a * b^T, with a (m x k) and b (n x k) row-major int8 matrices, and
+   c (m x n) an int32 matrix */
+static void THNN_Int8_gemm(long m, long n, long k, signed char *a, signed char *b, int *c)
+{
+#ifdef THNN_HAVE_INT8_AVX2_DISPATCH
+  if (THNN_Int8_hasAVX2()) {
+    THNN_Int8_gemm_avx2(m, n, k, a, b, c, THNN_Int8_blockSize(k));
+    return;
+  }
+#endif
+  THNN_Int8_gemm_default(m, n, k, a, b, c);
+}
+
+#endif
+
+/* output[i*strideI + j*strideJ] = alpha * scale[j] * (a[i] . b[j]) + bias[j],
+   with a (m x k) and b (n x k) row-major int8 matrices */
+static void THNN_(Int8_gemm)(
+          long m, long n, long k,
+          signed char *a,
+          signed char *b,
+          real *output,
+          long strideI,
+          long strideJ,
+          real alpha,
+          real *scale,
+          real *bias)
+{
+  int *products = (int*)THAlloc(sizeof(int) * m * n);
+  long i, j;
+  THNN_Int8_gemm(m, n, k, a, b, products);
+  for (i = 0; i < m; i++) {
+    for (j = 0; j < n; j++)
+      output[i*strideI + j*strideJ] = alpha * scale[j] * products[i*n + j] +
+          (bias ? bias[j] : 0);
+  }
+  THFree(products);
+}
+
+void THNN_(LinearInt8_updateOutput)(
+          THNNState *state,
+          THTensor *input,
+          THTensor *output,
+          THCharTensor *weight,
+          THTensor *weightScale,
+          THTensor *bias,
+          THCharTensor *quantizedInput,
+          real inputScale)
+{
+  THArgCheck(input->nDimension == 2, 2, "2D (batch mode) tensor expected");
+  THArgCheck(weight->nDimension == 2, 4, "2D weight tensor expected");
+  THArgCheck(inputScale > 0, 8, "input scale should be positive");
+
+  long batchSize = input->size[0];
+  long nInput = input->size[1];
+  long nOutput = weight->size[0];
+  long i;
+
+  if (weight->size[1] != nInput)
+    THError("Wrong input size! Input has %d features, expected %d",
+        nInput, weight->size[1]);
+  THArgCheck(THTensor_(nElement)(weightScale) == nOutput, 5,
+      "one weight scale per output channel expected");
+
+  input = THTensor_(newContiguous)(input);
+  weight = THCharTensor_newContiguous(weight);
+  weightScale = THTensor_(newContiguous)(weightScale);
+  if (bias)
+    bias = THTensor_(newContiguous)(bias);
+
+  THCharTensor_resize2d(quantizedInput, batchSize, nInput);
+  THTensor_(resize2d)(output, batchSize, nOutput);
+
+  real *input_data = THTensor_(data)(input);
+  signed char *quantizedInput_data = (signed char*)THCharTensor_data(quantizedInput);
+  real invScale = 1 / inputScale;
+  for (i = 0; i < batchSize*nInput; i++)
+    quantizedInput_data[i] = THNN_(Int8_quantize)(input_data[i], invScale);
+
+  THNN_(Int8_gemm)(
+      batchSize, nOutput, nInput,
+      quantizedInput_data,
+      THCharTensor_data(weight),
+      THTensor_(data)(output), nOutput, 1,
+      inputScale,
+      THTensor_(data)(weightScale),
+      bias ? THTensor_(data)(bias) : NULL);
+
+  THTensor_(free)(input);
+  THCharTensor_free(weight);
+  THTensor_(free)(weightScale);
+  if (bias)
+    THTensor_(free)(bias);
+}
+
+#endif
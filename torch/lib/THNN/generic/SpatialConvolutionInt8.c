@@ -0,0 +1,155 @@
+#ifndef TH_GENERIC_FILE
+#define TH_GENERIC_FILE "generic/SpatialConvolutionInt8.c"
+#else
+
+/*
+ * Int8 convolution (see LinearInt8.c for the quantization scheme). Every
+ * frame is quantized and then unfolded, with one row of nInputPlane*kH*kW
+ * values per output pixel, so the convolution is a product of int8 matrices
+ * with the same layout as in LinearInt8.
+ */
+
+static void THNN_(SpatialConvolutionInt8_updateOutput_frame)(
+          real *input,
+          real *output,
+          signed char *weight,
+          real *weightScale,
+          real *bias,
+          signed char *columns,
+          int kW, int kH,
+          int dW, int dH,
+          int padW, int padH,
+          long nInputPlane,
+          long inputWidth,
+          long inputHeight,
+          long nOutputPlane,
+          long outputWidth,
+          long outputHeight,
+          real inputScale)
+{
+  long nPixels = outputWidth * outputHeight;
+  long rowSize = nInputPlane * kH * kW;
+  long planeSize = inputHeight * inputWidth;
+  signed char *quantized = (signed char*)THAlloc(nInputPlane * planeSize);
+  real invScale = 1 / inputScale;
+  long i, oy, ox, c;
+  int ky, kx;
+
+  for (i = 0; i < nInputPlane * planeSize; i++)
+    quantized[i] = THNN_(Int8_quantize)(input[i], invScale);
+
+  for (oy = 0; oy < outputHeight; oy++) {
+    for (ox = 0; ox < outputWidth; ox++) {
+      signed char *row = columns + (oy*outputWidth + ox)*rowSize;
+      for (c = 0; c < nInputPlane; c++) {
+        signed char *plane = quantized + c*planeSize;
+        for (ky = 0; ky < kH; ky++) {
+          long y = oy*dH - padH + ky;
+          long x0 = ox*dW - padW;
+          if (y < 0 || y >= inputHeight) {
+            memset(row, 0, kW);
+          } else if (x0 >= 0 && x0 + kW <= inputWidth) {
+            memcpy(row, plane + y*inputWidth + x0, kW);
+          } else {
+            for (kx = 0; kx < kW; kx++) {
+              long x = x0 + kx;
+              row[kx] = (x >= 0 && x < inputWidth) ? plane[y*inputWidth + x] : 0;
+            }
+          }
+          row += kW;
+        }
+      }
+    }
+  }
+  THFree(quantized);
+
+  THNN_(Int8_gemm)(
+      nPixels, nOutputPlane, rowSize,
+      columns, weight,
+      output, 1, nPixels,
+      inputScale, weightScale, bias);
+}
+
+void THNN_(SpatialConvolutionInt8_updateOutput)(
+          THNNState *state,
+          THTensor *input,
+          THTensor *output,
+          THCharTensor *weight,
+          THTensor *weightScale,
+          THTensor *bias,
+          THCharTensor *columns,
+          int kW, int kH,
+          int dW, int dH,
+          int padW, int padH,
+          real inputScale)
+{
+  THArgCheck(input->nDimension == 3 || input->nDimension == 4, 2,
+      "3D or 4D (batch mode) tensor expected");
+  THArgCheck(weight->nDimension == 2, 4,
+      "2D weight tensor expected (nOutputPlane x nInputPlane*kH*kW)");
+  THArgCheck(inputScale > 0, 13, "input scale should be positive");
+
+  int batch = input->nDimension == 4;
+  long batchSize    = batch ? input->size[0] : 1;
+  long nInputPlane  = input->size[batch];
+  long inputHeight  = input->size[batch + 1];
+  long inputWidth   = input->size[batch + 2];
+  long nOutputPlane = weight->size[0];
+  long outputWidth  = (inputWidth + 2*padW - kW) / dW + 1;
+  long outputHeight = (inputHeight + 2*padH - kH) / dH + 1;
+  long nPixels = outputWidth * outputHeight;
+  long rowSize = nInputPlane * kH * kW;
+
+  if (outputWidth < 1 || outputHeight < 1)
+    THError("Given input size: (%dx%dx%d). Calculated output size: (%dx%dx%d). Output size is too small",
+        nInputPlane,inputHeight,inputWidth,nOutputPlane,outputHeight,outputWidth);
+  if (weight->size[1] != rowSize)
+    THError("Wrong number of input channels! Input has %d channels, expected %d",
+        nInputPlane, weight->size[1] / (kH*kW));
+  THArgCheck(THTensor_(nElement)(weightScale) == nOutputPlane, 5,
+      "one weight scale per output channel expected");
+
+  input = THTensor_(newContiguous)(input);
+  weight = THCharTensor_newContiguous(weight);
+  weightScale = THTensor_(newContiguous)(weightScale);
+  if (bias)
+    bias = THTensor_(newContiguous)(bias);
+
+  if (batch)
+    THTensor_(resize4d)(output, batchSize, nOutputPlane, outputHeight, outputWidth);
+  else
+    THTensor_(resize3d)(output, nOutputPlane, outputHeight, outputWidth);
+  THCharTensor_resize3d(columns, batchSize, nPixels, rowSize);
+
+  real *input_data = THTensor_(data)(input);
+  real *output_data = THTensor_(data)(output);
+  signed char *weight_data = (signed char*)THCharTensor_data(weight);
+  signed char *columns_data = (signed char*)THCharTensor_data(columns);
+  real *weightScale_data = THTensor_(data)(weightScale);
+  real *bias_data = bias ? THTensor_(data)(bias) : NULL;
+
+  long t;
+#pragma omp parallel for private(t)
+  for (t = 0; t < batchSize; t++)
+  {
+    THNN_(SpatialConvolutionInt8_updateOutput_frame)(
+        input_data + t*nInputPlane*inputHeight*inputWidth,
+        output_data + t*nOutputPlane*nPixels,
+        weight_data,
+        weightScale_data,
+        bias_data,
+        columns_data + t*nPixels*rowSize,
+        kW, kH, dW, dH, padW, padH,
+        nInputPlane, inputWidth, inputHeight,
+        nOutputPlane, outputWidth, outputHeight,
+        inputScale);
+  }
+
+  THTensor_(free)(input);
+  THCharTensor_free(weight);
+  THTensor_(free)(weightScale);
+  if (bias)
+    THTensor_(free)(bias);
+}
+
+#endif
@@ -0,0 +1,231 @@
+#ifndef TH_GENERIC_FILE
+#define TH_GENERIC_FILE "generic/SpatialConvolutionWinograd.c"
+#else
+
+/*
+ * Winograd F(2x2, 3x3) convolution (Lavin & Gray, "Fast Algorithms for
+ * Convolutional Neural Networks"). Every 2x2 output tile is computed from
+ * a 4x4 input tile d as
+ *
+ *   Y = A^T [ (G g G^T) .* (B^T d B) ] A
+ *
+ * The transforms only need additions. The elementwise products, summed over
+ * input planes, become 16 matrix products of the transformed weight
+ * (nOutputPlane x nInputPlane) and the transformed input
+ * (nInputPlane x nTiles), so there is no im2col copy of the input.
+ */
+
+static void THNN_(SpatialConvolutionWinograd_transformWeight)(
+          real *weight,
+          real *transformedWeight,
+          long nOutputPlane,
+          long nInputPlane)
+{
+  long k, c;
+  int i, j;
+  for (k = 0; k < nOutputPlane; k++) {
+    for (c = 0; c < nInputPlane; c++) {
+      real *g = weight + (k*nInputPlane + c)*9;
+      real tmp[4][3];
+      /* G g */
+      for (i = 0; i < 3; i++) {
+        tmp[0][i] = g[i];
+        tmp[1][i] = (g[i] + g[3+i] + g[6+i]) / 2;
+        tmp[2][i] = (g[i] - g[3+i] + g[6+i]) / 2;
+        tmp[3][i] = g[6+i];
+      }
+      /* (G g) G^T */
+      for (i = 0; i < 4; i++) {
+        real u[4];
+        u[0] = tmp[i][0];
+        u[1] = (tmp[i][0] + tmp[i][1] + tmp[i][2]) / 2;
+        u[2] = (tmp[i][0] - tmp[i][1] + tmp[i][2]) / 2;
+        u[3] = tmp[i][2];
+        for (j = 0; j < 4; j++)
+          transformedWeight[((i*4 + j)*nOutputPlane + k)*nInputPlane + c] = u[j];
+      }
+    }
+  }
+}
+
+static void THNN_(SpatialConvolutionWinograd_updateOutput_frame)(
+          real *input,
+          real *output,
+          real *transformedWeight,
+          real *bias,
+          real *transformedInput,
+          real *product,
+          int padW,
+          int padH,
+          long nInputPlane,
+          long inputWidth,
+          long inputHeight,
+          long nOutputPlane,
+          long outputWidth,
+          long outputHeight)
+{
+  long tilesW = (outputWidth + 1) / 2;
+  long tilesH = (outputHeight + 1) / 2;
+  long nTiles = tilesW * tilesH;
+  long c, k, ty, tx;
+  int i, j;
+
+  /* B^T d B of every tile, stored as 16 matrices (nInputPlane x nTiles) */
+  for (c = 0; c < nInputPlane; c++) {
+    real *plane = input + c*inputHeight*inputWidth;
+    for (ty = 0; ty < tilesH; ty++) {
+      for (tx = 0; tx < tilesW; tx++) {
+        real d[4][4];
+        real tmp[4][4];
+        long y0 = ty*2 - padH;
+        long x0 = tx*2 - padW;
+        for (i = 0; i < 4; i++) {
+          for (j = 0; j < 4; j++) {
+            long y = y0 + i;
+            long x = x0 + j;
+            d[i][j] = (y >= 0 && y < inputHeight && x >= 0 && x < inputWidth) ?
+                plane[y*inputWidth + x] : 0;
+          }
+        }
+        /* B^T d */
+        for (j = 0; j < 4; j++) {
+          tmp[0][j] = d[0][j] - d[2][j];
+          tmp[1][j] = d[1][j] + d[2][j];
+          tmp[2][j] = d[2][j] - d[1][j];
+          tmp[3][j] = d[1][j] - d[3][j];
+        }
+        /* (B^T d) B */
+        real *dst = transformedInput + c*nTiles + ty*tilesW + tx;
+        long step = nInputPlane*nTiles;
+        for (i = 0; i < 4; i++) {
+          dst[(i*4 + 0)*step] = tmp[i][0] - tmp[i][2];
+          dst[(i*4 + 1)*step] = tmp[i][1] + tmp[i][2];
+          dst[(i*4 + 2)*step] = tmp[i][2] - tmp[i][1];
+          dst[(i*4 + 3)*step] = tmp[i][1] - tmp[i][3];
+        }
+      }
+    }
+  }
+
+  /* product[e] = transformedWeight[e] * transformedInput[e]
+     (note: gemm assumes column-major matrices) */
+  for (i = 0; i < 16; i++) {
+    THBlas_(gemm)(
+        'n', 'n',
+        nTiles, nOutputPlane, nInputPlane,
+        1,
+        transformedInput + i*nInputPlane*nTiles, nTiles,
+        transformedWeight + i*nOutputPlane*nInputPlane, nInputPlane,
+        0,
+        product + i*nOutputPlane*nTiles, nTiles
+    );
+  }
+
+  /* A^T m A of every tile */
+  for (k = 0; k < nOutputPlane; k++) {
+    real *plane = output + k*outputHeight*outputWidth;
+    real b = bias ? bias[k] : 0;
+    for (ty = 0; ty < tilesH; ty++) {
+      for (tx = 0; tx < tilesW; tx++) {
+        real m[4][4];
+        real tmp[2][4];
+        real *src = product + k*nTiles + ty*tilesW + tx;
+        long step = nOutputPlane*nTiles;
+        for (i = 0; i < 4; i++)
+          for (j = 0; j < 4; j++)
+            m[i][j] = src[(i*4 + j)*step];
+        /* A^T m */
+        for (j = 0; j < 4; j++) {
+          tmp[0][j] = m[0][j] + m[1][j] + m[2][j];
+          tmp[1][j] = m[1][j] - m[2][j] - m[3][j];
+        }
+        /* (A^T m) A */
+        for (i = 0; i < 2; i++) {
+          long y = ty*2 + i;
+          long x = tx*2;
+          if (y >= outputHeight)
+            break;
+          plane[y*outputWidth + x] = tmp[i][0] + tmp[i][1] + tmp[i][2] + b;
+          if (x + 1 < outputWidth)
+            plane[y*outputWidth + x + 1] = tmp[i][1] - tmp[i][2] - tmp[i][3] + b;
+        }
+      }
+    }
+  }
+}
+
+void THNN_(SpatialConvolutionWinograd_updateOutput)(
+          THNNState *state,
+          THTensor *input,
+          THTensor *output,
+          THTensor *weight,
+          THTensor *bias,
+          THTensor *transformedInput,
+          THTensor *product,
+          int padW,
+          int padH)
+{
+  THArgCheck(input->nDimension == 4, 2, "4D (batch mode) tensor expected");
+  THArgCheck(weight->nDimension == 4 && weight->size[2] == 3 && weight->size[3] == 3, 4,
+      "weight tensor should be 4D, with 3x3 kernels");
+
+  long batchSize    = input->size[0];
+  long nInputPlane  = input->size[1];
+  long inputHeight  = input->size[2];
+  long inputWidth   = input->size[3];
+  long nOutputPlane = weight->size[0];
+  long outputWidth  = inputWidth + 2*padW - 2;
+  long outputHeight = inputHeight + 2*padH - 2;
+  long nTiles = ((outputWidth + 1) / 2) * ((outputHeight + 1) / 2);
+
+  if (outputWidth < 1 || outputHeight < 1)
+    THError("Given input size: (%dx%dx%d). Calculated output size: (%dx%dx%d). Output size is too small",
+        nInputPlane,inputHeight,inputWidth,nOutputPlane,outputHeight,outputWidth);
+  if (weight->size[1] != nInputPlane)
+    THError("Wrong number of input channels! Input has %d channels, expected %d",
+        nInputPlane, weight->size[1]);
+
+  input = THTensor_(newContiguous)(input);
+  weight = THTensor_(newContiguous)(weight);
+  if (bias)
+    bias = THTensor_(newContiguous)(bias);
+
+  THTensor *transformedWeight = THTensor_(newWithSize3d)(16, nOutputPlane, nInputPlane);
+  THNN_(SpatialConvolutionWinograd_transformWeight)(
+      THTensor_(data)(weight), THTensor_(data)(transformedWeight), nOutputPlane, nInputPlane);
+
+  THTensor_(resize4d)(output, batchSize, nOutputPlane, outputHeight, outputWidth);
+  THTensor_(resize3d)(transformedInput, batchSize, 16*nInputPlane, nTiles);
+  THTensor_(resize3d)(product, batchSize, 16*nOutputPlane, nTiles);
+
+  real *input_data = THTensor_(data)(input);
+  real *output_data = THTensor_(data)(output);
+  real *transformedInput_data = THTensor_(data)(transformedInput);
+  real *product_data = THTensor_(data)(product);
+  real *transformedWeight_data = THTensor_(data)(transformedWeight);
+  real *bias_data = bias ? THTensor_(data)(bias) : NULL;
+
+  long t;
+#pragma omp parallel for private(t)
+  for (t = 0; t < batchSize; t++)
+  {
+    THNN_(SpatialConvolutionWinograd_updateOutput_frame)(
+        input_data + t*nInputPlane*inputHeight*inputWidth,
+        output_data + t*nOutputPlane*outputHeight*outputWidth,
+        transformedWeight_data,
+        bias_data,
+        transformedInput_data + t*16*nInputPlane*nTiles,
+        product_data + t*16*nOutputPlane*nTiles,
+        padW, padH,
+        nInputPlane, inputWidth, inputHeight,
+        nOutputPlane, outputWidth, outputHeight);
+  }
+
+  THTensor_(free)(transformedWeight);
+  THTensor_(free)(input);
+  THTensor_(free)(weight);
+  if (bias)
+    THTensor_(free)(bias);
+}
+
+#endif
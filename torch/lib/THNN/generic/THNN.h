@@ -183,6 +183,40 @@ TH_API void THNN_(LookupTable_renorm)(
           real maxNorm,                // maximum norm
           real normType);              // the norm type (e.g., normType=2, then it's 2-norm)
 
+TH_API void THNN_(LSTMFused_updateOutput)(
+          THNNState *state,
+          THTensor *gates,             // batch x 4*hiddenSize pre-activations of the input, forget, cell
+                                       // and output gates (replaced by the activations)
+          THTensor *cx,                // previous cell state
+          THTensor *hy,                // [OUT] hidden state
+          THTensor *cy);               // [OUT] cell state
+TH_API void THNN_(LSTMFused_updateGradInput)(
+          THNNState *state,
+          THTensor *gates,             // gate activations, from updateOutput
+          THTensor *cx,                // previous cell state
+          THTensor *cy,                // cell state, from updateOutput
+          THTensor *gradHy,            // gradient w.r.t. hidden state
+          THTensor *gradCy,            // [OPTIONAL] gradient w.r.t. cell state
+          THTensor *gradGates,         // [OUT] gradient w.r.t. gate pre-activations
+          THTensor *gradCx);           // [OUT] gradient w.r.t. previous cell state
+
+TH_API void THNN_(GRUFused_updateOutput)(
+          THNNState *state,
+          THTensor *inputGates,        // batch x 3*hiddenSize input projections of the reset, update
+                                       // and new gates
+          THTensor *hiddenGates,       // batch x 3*hiddenSize hidden state projections
+          THTensor *hx,                // previous hidden state
+          THTensor *hy,                // [OUT] hidden state
+          THTensor *storage);          // [BUFFER] values saved for updateGradInput
+TH_API void THNN_(GRUFused_updateGradInput)(
+          THNNState *state,
+          THTensor *gradHy,            // gradient w.r.t. hidden state
+          THTensor *storage,           // [BUFFER] from updateOutput
+          THTensor *gradInputGates,    // [OUT] gradient w.r.t. input projections
+          THTensor *gradHiddenGates,   // [OUT] gradient w.r.t. hidden state projections
+          THTensor *gradHx);           // [OUT] gradient w.r.t. previous hidden state (without the
+                                       // part through hiddenGates)
+
 TH_API void THNN_(MarginCriterion_updateOutput)(
           THNNState *state,            // library's state
           THTensor *input,             // input tensor
@@ -633,6 +667,39 @@ TH_API void THNN_(SpatialConvolutionMM_accGradParameters)(
           int padW, int padH,
           real scale);
 
+TH_API void THNN_(SpatialConvolutionWinograd_updateOutput)(
+          THNNState *state,
+          THTensor *input,              // 4D input
+          THTensor *output,             // [OUT] convolution output
+          THTensor *weight,             // 3x3 kernels (nOutputPlane x nInputPlane x 3 x 3)
+          THTensor *bias,               // [OPTIONAL]
+          THTensor *transformedInput,   // [BUFFER]
+          THTensor *product,            // [BUFFER]
+          int padW, int padH);
+
+TH_API void THNN_(LinearInt8_updateOutput)(
+          THNNState *state,
+          THTensor *input,              // 2D input
+          THTensor *output,             // [OUT] 2D output
+          THCharTensor *weight,         // int8 weight (nOutput x nInput)
+          THTensor *weightScale,        // scale of every output channel of weight
+          THTensor *bias,               // [OPTIONAL]
+          THCharTensor *quantizedInput, // [BUFFER]
+          real inputScale);
+
+TH_API void THNN_(SpatialConvolutionInt8_updateOutput)(
+          THNNState *state,
+          THTensor *input,              // 3D or 4D input
+          THTensor *output,             // [OUT] convolution output
+          THCharTensor *weight,         // int8 weight (nOutputPlane x nInputPlane*kH*kW)
+          THTensor *weightScale,        // scale of every output channel of weight
+          THTensor *bias,               // [OPTIONAL]
+          THCharTensor *columns,        // [BUFFER]
+          int kW, int kH,
+          int dW, int dH,
+          int padW, int padH,
+          real inputScale);
+
 TH_API void THNN_(SpatialConvolutionLocal_updateOutput)(
           THNNState *state,
           THTensor *input,
@@ -43,6 +43,9 @@
 #include "generic/LookupTable.c"
 #include "THGenerateFloatTypes.h"
 
+#include "generic/FusedRNNKernel.c"
+#include "THGenerateFloatTypes.h"
+
 #include "generic/MSECriterion.c"
 #include "THGenerateFloatTypes.h"
 
@@ -115,6 +118,15 @@
 #include "generic/SpatialConvolutionMM.c"
 #include "THGenerateFloatTypes.h"
 
+#include "generic/SpatialConvolutionWinograd.c"
+#include "THGenerateFloatTypes.h"
+
+#include "generic/LinearInt8.c"
+#include "THGenerateFloatTypes.h"
+
+#include "generic/SpatialConvolutionInt8.c"
+#include "THGenerateFloatTypes.h"
+
 #include "generic/SpatialConvolutionLocal.c"
 #include "THGenerateFloatTypes.h"
 
@@ -0,0 +1,83 @@
+#include <immintrin.h>
+#include "TH.h"
+
+/* AVX2 version of THNN_Int8_gemm (see generic/LinearInt8.c). It's compiled
+   with -mavx2 and only called on CPUs that support it. */
+
+static inline int THNN_Int8_hsum_avx2(__m256i v)
+{
+  __m128i s = _mm_add_epi32(_mm256_castsi256_si128(v), _mm256_extracti128_si256(v, 1));
+  s = _mm_add_epi32(s, _mm_shuffle_epi32(s, 0x4e));
+  s = _mm_add_epi32(s, _mm_shuffle_epi32(s, 0xb1));
+  return _mm_cvtsi128_si32(s);
+}
+
+/* Groups of 4 rows of a are widened to 16 bits (zero padded to a multiple
+   of 16 values), so that only the rows of b have to be widened in the inner
+   loop. Products of 4 rows of a and 2 rows of b are computed at a time with
+   vpmaddwd, which multiplies pairs of 16-bit values and adds them in 32
+   bits. */
+void THNN_Int8_gemm_avx2(long m, long n, long k, signed char *a, signed char *b, int *c,
+                         long blockSize)
+{
+  long k16 = k / 16 * 16;
+  long kp = (k + 15) / 16 * 16;
+  short *wide = (short*)THAlloc(sizeof(short) * 4 * kp);
+  long i, j, j0, l, r, s;
+
+  for (j0 = 0; j0 < n; j0 += blockSize) {
+    long j1 = j0 + blockSize < n ? j0 + blockSize : n;
+    for (i = 0; i < m; i += 4) {
+      for (r = 0; r < 4; r++) {
+        short *row = wide + r*kp;
+        signed char *ar = a + (i + r)*k;
+        if (i + r >= m) {
+          for (l = 0; l < kp; l++)
+            row[l] = 0;
+          continue;
+        }
+        for (l = 0; l < k16; l += 16)
+          _mm256_storeu_si256((__m256i*)(row + l),
+              _mm256_cvtepi8_epi16(_mm_loadu_si128((__m128i*)(ar + l))));
+        for (; l < kp; l++)
+          row[l] = l < k ? ar[l] : 0;
+      }
+      for (j = j0; j < j1; j += 2) {
+        signed char *b0 = b + j*k;
+        signed char *b1 = j + 1 < j1 ? b0 + k : b0;
+        /* Values of b past the end of a row are multiplied with the zero
+           padding of a, so the last chunk can be read whole, unless it goes
+           past the end of b */
+        long kv = b1 + kp <= b + n*k ? kp : k16;
+        __m256i acc[4][2];
+        int result[4][2];
+        for (r = 0; r < 4; r++)
+          acc[r][0] = acc[r][1] = _mm256_setzero_si256();
+        for (l = 0; l < kv; l += 16) {
+          __m256i w0 = _mm256_cvtepi8_epi16(_mm_loadu_si128((__m128i*)(b0 + l)));
+          __m256i w1 = _mm256_cvtepi8_epi16(_mm_loadu_si128((__m128i*)(b1 + l)));
+          for (r = 0; r < 4; r++) {
+            __m256i x = _mm256_loadu_si256((__m256i*)(wide + r*kp + l));
+            acc[r][0] = _mm256_add_epi32(acc[r][0], _mm256_madd_epi16(x, w0));
+            acc[r][1] = _mm256_add_epi32(acc[r][1], _mm256_madd_epi16(x, w1));
+          }
+        }
+        for (r = 0; r < 4; r++) {
+          for (s = 0; s < 2; s++) {
+            signed char *bs = s == 0 ? b0 : b1;
+            int sum = THNN_Int8_hsum_avx2(acc[r][s]);
+            for (l = kv; l < k; l++)
+              sum += wide[r*kp + l] * bs[l];
+            result[r][s] = sum;
+          }
+        }
+        for (r = 0; r < 4 && i + r < m; r++) {
+          c[(i + r)*n + j] = result[r][0];
+          if (j + 1 < j1)
+            c[(i + r)*n + j + 1] = result[r][1];
+        }
+      }
+    }
+  }
+  THFree(wide);
+}
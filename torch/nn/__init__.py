@@ -1,2 +1,3 @@
 
 from .modules import *
+from .summary import summary
@@ -1,16 +1,33 @@
 from .backend import FunctionBackend
 
 class THNNFunctionBackend(FunctionBackend):
-    pass
+
+    def __reduce__(self):
+        # There's only one instance - pickle a reference to it
+        return _get_thnn_function_backend, ()
 
 
 def _initialize_backend():
     from ..functions.thnn import _generated_functions
-    from ..functions.linear import LinearFunction
+    from ..functions.linear import LinearFunction, SparseLinearFunction, \
+        BilinearFunction
+    from ..functions.conv import Conv2dFunction
+    from ..functions.dropout import DropoutFunction
+    from ..functions.embedding import EmbeddingFunction
+    from ..functions.rnn import LSTMFunction, GRUFunction
+    from ..functions.quantized import LinearInt8Function, Conv2dInt8Function
 
     backend.register_function('Linear', LinearFunction)
+    backend.register_function('SparseLinear', SparseLinearFunction)
+    backend.register_function('Bilinear', BilinearFunction)
+    backend.register_function('Conv2d', Conv2dFunction)
+    backend.register_function('Dropout', DropoutFunction)
+    backend.register_function('Embedding', EmbeddingFunction)
+    backend.register_function('LSTM', LSTMFunction)
+    backend.register_function('GRU', GRUFunction)
+    backend.register_function('LinearInt8', LinearInt8Function)
+    backend.register_function('Conv2dInt8', Conv2dInt8Function)
     name_remap = {
-        'SpatialConvolutionMMFunction': 'Conv2dFunction',
         'SpatialMaxPoolingFunction': 'MaxPooling2dFunction',
         'SoftMaxFunction': 'SoftmaxFunction',
         'LogSoftMaxFunction': 'LogSoftmaxFunction',
@@ -22,5 +39,9 @@ def _initialize_backend():
         backend.register_function(new_name.replace('Function', ''), cls)
 
 
+def _get_thnn_function_backend():
+    return backend
+
+
 backend = THNNFunctionBackend()
 _initialize_backend()
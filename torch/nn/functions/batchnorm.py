@@ -0,0 +1,19 @@
+def fold_batchnorm(weight, bias, running_mean, running_var, eps,
+        bn_weight=None, bn_bias=None):
+    """Folds batch normalization in evaluation mode into a preceding layer
+    with output features along the first dimension (e.g. Linear or Conv2d).
+
+    Returns the weight and bias that make the layer compute what it computed
+    followed by the batch normalization. bias, bn_weight and bn_bias can be
+    None.
+    """
+    scale = running_var.clone().add_(eps).rsqrt_()
+    if bn_weight is not None:
+        scale.mul_(bn_weight)
+    shift = bias.clone() if bias is not None else scale.new(scale.size()).zero_()
+    shift.add_(-1, running_mean).mul_(scale)
+    if bn_bias is not None:
+        shift.add_(bn_bias)
+    weight_2d = weight.contiguous().view(weight.size(0), -1)
+    weight_2d = weight_2d.clone().mul_(scale.view(-1, 1).expandAs(weight_2d))
+    return weight_2d.view(weight.size()), shift
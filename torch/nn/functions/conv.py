@@ -0,0 +1,313 @@
+import json
+import math
+import os
+import time
+
+import torch
+from torch.autograd import Function
+from torch._thnn import type2backend
+
+# Chosen algorithm for every (type, input size, weight size, stride, padding)
+_algorithm_cache = {}
+_cache_file = None
+# DFT matrices, keyed by tensor type, size and the rows and columns
+_matrix_cache = {}
+
+
+def set_algorithm_cache_file(path):
+    """Makes the autotuner remember chosen algorithms in a file.
+
+    Algorithms stored in the file are loaded now, and every new choice is
+    written back to it, so the benchmarks don't have to be repeated by
+    other processes. Passing None stops saving.
+    """
+    global _cache_file
+    _cache_file = path
+    if path is not None and os.path.exists(path):
+        with open(path) as f:
+            _algorithm_cache.update(json.load(f))
+
+
+def clear_algorithm_cache():
+    """Forgets all algorithms chosen by the autotuner (the file is kept)."""
+    _algorithm_cache.clear()
+
+
+def _save_algorithm_cache():
+    if _cache_file is None:
+        return
+    tmp_path = _cache_file + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(_algorithm_cache, f, indent=1, sort_keys=True)
+    os.rename(tmp_path, _cache_file)
+
+
+def _dft_matrices(tensor, size, rows, cols, conjugates=False):
+    """Returns cos and sin of 2*pi*r*c/size for r in range(*rows), c in range(*cols).
+
+    If conjugates is True, rows of r that have a conjugate frequency
+    (size - r) are doubled.
+    """
+    key = (type(tensor), size, rows, cols, conjugates)
+    matrices = _matrix_cache.get(key)
+    if matrices is None:
+        freqs = list(range(*rows))
+        angle = torch.ger(tensor.new(freqs), tensor.new(list(range(*cols))))
+        angle.mul_(2 * math.pi / size)
+        matrices = (angle.clone().cos_(), angle.sin_())
+        if conjugates:
+            for i, r in enumerate(freqs):
+                if 0 < r and 2 * r != size:
+                    for m in matrices:
+                        m.select(0, i).mul_(2)
+        _matrix_cache[key] = matrices
+    return matrices
+
+
+def _bias_plane(bias, num_pixels):
+    # Adding an expanded bias is slow, so this is added to every image
+    # viewed as a (channels, pixels) matrix
+    return torch.ger(bias, bias.new(num_pixels).fill_(1))
+
+
+class Conv2dFunction(Function):
+
+    # Forward algorithms, each implemented by a _forward_<name> method
+    algorithms = ('mm', '1x1', 'winograd', 'fft')
+
+    def __init__(self, kw, kh, dw=1, dh=1, padw=0, padh=0, algorithm=None):
+        super(Conv2dFunction, self).__init__()
+        self.kw = kw
+        self.kh = kh
+        self.dw = dw
+        self.dh = dh
+        self.padw = padw
+        self.padh = padh
+        if algorithm is not None and algorithm not in self.algorithms:
+            raise ValueError("unknown convolution algorithm: " + str(algorithm))
+        self.algorithm = algorithm
+        self.finput = None
+
+    def _applicable(self, algorithm, input):
+        if algorithm == 'mm':
+            return True
+        if type(input) not in (torch.FloatTensor, torch.DoubleTensor) or input.dim() != 4:
+            return False
+        if algorithm == '1x1':
+            return (self.kh == 1 and self.kw == 1 and self.dh == 1 and
+                    self.dw == 1 and self.padh == 0 and self.padw == 0)
+        if algorithm == 'winograd':
+            return self.kh == 3 and self.kw == 3 and self.dh == 1 and self.dw == 1
+        if algorithm == 'fft':
+            # The transforms only pay off for large kernels
+            return self.kh * self.kw >= 25
+        return False
+
+    def _cache_key(self, input, weight):
+        return '{} {} {} {},{} {},{}'.format(
+            torch.typename(input),
+            'x'.join(map(str, input.size())),
+            'x'.join(map(str, weight.size())),
+            self.dh, self.dw, self.padh, self.padw)
+
+    def forward(self, input, weight, bias=None):
+        self.forward_args = (input, weight, bias)
+        if bias is None:
+            bias = weight.new(weight.size(0)).zero_()
+        if self.algorithm is not None:
+            if not self._applicable(self.algorithm, input):
+                raise ValueError("convolution algorithm '{}' can't be used "
+                        "for this input".format(self.algorithm))
+            return getattr(self, '_forward_' + self.algorithm)(input, weight, bias)
+
+        candidates = [a for a in self.algorithms if self._applicable(a, input)]
+        if len(candidates) == 1:
+            return self._forward_mm(input, weight, bias)
+        key = self._cache_key(input, weight)
+        algorithm = _algorithm_cache.get(key)
+        if algorithm in candidates:
+            return getattr(self, '_forward_' + algorithm)(input, weight, bias)
+
+        # Benchmark every applicable algorithm. The first run of each one
+        # allocates buffers and transform matrices, so only the second one
+        # is timed.
+        best_time, best_output = None, None
+        for candidate in candidates:
+            forward_fn = getattr(self, '_forward_' + candidate)
+            forward_fn(input, weight, bias)
+            start = time.time()
+            output = forward_fn(input, weight, bias)
+            elapsed = time.time() - start
+            if best_time is None or elapsed < best_time:
+                best_time, best_output, algorithm = elapsed, output, candidate
+        _algorithm_cache[key] = algorithm
+        _save_algorithm_cache()
+        return best_output
+
+    def _forward_mm(self, input, weight, bias):
+        backend = type2backend[type(input)]
+        output = input.new()
+        self.finput = input.new()
+        backend.SpatialConvolutionMM_updateOutput(backend.library_state,
+                input, output, weight, bias, self.finput, input.new(),
+                self.kw, self.kh, self.dw, self.dh, self.padw, self.padh)
+        return output
+
+    def _output_size(self, input):
+        height = (input.size(2) + 2 * self.padh - self.kh) // self.dh + 1
+        width = (input.size(3) + 2 * self.padw - self.kw) // self.dw + 1
+        return height, width
+
+    def _padded_input(self, input, height, width):
+        """Returns input with padding, zero filled to the given size."""
+        if (self.padh == 0 and self.padw == 0 and input.size(2) == height and
+                input.size(3) == width and input.isContiguous()):
+            return input
+        padded = input.new(input.size(0), input.size(1), height, width).zero_()
+        padded.narrow(2, self.padh, input.size(2)).narrow(3, self.padw, input.size(3)).copy_(input)
+        return padded
+
+    def _unfolded_input(self, input):
+        """Returns input unfolded like SpatialConvolutionMM does it: for every
+        input channel and kernel position, the (out_height * out_width)
+        input pixels that are multiplied with that weight element."""
+        batch_size, in_channels = input.size(0), input.size(1)
+        out_height, out_width = self._output_size(input)
+        padded = self._padded_input(input, input.size(2) + 2 * self.padh,
+                input.size(3) + 2 * self.padw)
+        finput = input.new(batch_size, in_channels, self.kh, self.kw,
+                out_height, out_width)
+        for i in range(self.kh):
+            rows = padded.narrow(2, i, (out_height - 1) * self.dh + 1)
+            rows = rows.unfold(2, 1, self.dh).select(4, 0)
+            for j in range(self.kw):
+                pixels = rows.narrow(3, j, (out_width - 1) * self.dw + 1)
+                pixels = pixels.unfold(3, 1, self.dw).select(4, 0)
+                finput.select(2, i).select(2, j).copy_(pixels)
+        return finput.view(batch_size, in_channels * self.kh * self.kw,
+                out_height * out_width)
+
+    def _forward_1x1(self, input, weight, bias):
+        # A 1x1 convolution is a product of the weight with every image
+        # viewed as a (channels, pixels) matrix
+        batch_size, in_channels = input.size(0), input.size(1)
+        height, width = input.size(2), input.size(3)
+        out_channels = weight.size(0)
+        input = input.contiguous()
+        weight = weight.contiguous().view(out_channels, in_channels)
+        bias_plane = _bias_plane(bias, height * width)
+        output = input.new(batch_size, out_channels, height * width)
+        for i in range(batch_size):
+            output_i = output.select(0, i).copy_(bias_plane)
+            output_i.addmm_(weight, input.select(0, i).view(in_channels, height * width))
+        return output.view(batch_size, out_channels, height, width)
+
+    def _forward_winograd(self, input, weight, bias):
+        backend = type2backend[type(input)]
+        output = input.new()
+        backend.SpatialConvolutionWinograd_updateOutput(backend.library_state,
+                input, output, weight, bias, input.new(), input.new(),
+                self.padw, self.padh)
+        return output
+
+    def _forward_fft(self, input, weight, bias):
+        # Correlation in the frequency domain: the transforms of every input
+        # plane and every kernel are multiplied (one complex matrix product
+        # per frequency sums them over channels) and transformed back.
+        # TH has no FFT, so the 2D transforms are products with DFT matrices,
+        # which still makes the cost independent of the kernel size.
+        # Valid outputs never wrap around, so the padded input size is
+        # enough for the transforms, and since everything is real, only
+        # width // 2 + 1 frequencies along the width are needed.
+        batch_size, in_channels = input.size(0), input.size(1)
+        out_channels = weight.size(0)
+        height = input.size(2) + 2 * self.padh
+        width = input.size(3) + 2 * self.padw
+        out_height, out_width = self._output_size(input)
+        half_width = width // 2 + 1
+        num_freqs = height * half_width
+
+        cos_h, sin_h = _dft_matrices(input, height, (height,), (height,))
+        cos_w, sin_w = _dft_matrices(input, width, (width,), (half_width,))
+
+        def transform(planes, rows, cols, num_planes):
+            # planes are (rows, num_planes, cols); returns the real and
+            # imaginary parts of their transforms as (num_freqs, num_planes)
+            planes = planes.view(rows, num_planes * cols)
+            partial_cos = torch.mm(cos_h.narrow(1, 0, rows), planes).view(height * num_planes, cols)
+            partial_sin = torch.mm(sin_h.narrow(1, 0, rows), planes).view(height * num_planes, cols)
+            cos_w_part, sin_w_part = cos_w.narrow(0, 0, cols), sin_w.narrow(0, 0, cols)
+            real = torch.mm(partial_cos, cos_w_part)
+            real.addmm_(1, -1, partial_sin, sin_w_part)
+            imag = torch.mm(partial_cos, sin_w_part)
+            imag.addmm_(partial_sin, cos_w_part)
+            imag.neg_()
+            freq_major = lambda t: t.view(height, num_planes, half_width).permute(0, 2, 1).contiguous()
+            return freq_major(real), freq_major(imag)
+
+        padded = self._padded_input(input, height, width)
+        planes = padded.permute(2, 0, 1, 3).contiguous()
+        input_real, input_imag = transform(planes, height, width, batch_size * in_channels)
+        input_real = input_real.view(num_freqs, batch_size, in_channels)
+        input_imag = input_imag.view(num_freqs, batch_size, in_channels)
+
+        kernels = weight.permute(2, 1, 0, 3).contiguous()
+        weight_real, weight_imag = transform(kernels, self.kh, self.kw, in_channels * out_channels)
+        weight_real = weight_real.view(num_freqs, in_channels, out_channels)
+        weight_imag = weight_imag.view(num_freqs, in_channels, out_channels)
+
+        # Y = sum_c X * conj(W)
+        product_real = torch.bmm(input_real, weight_real)
+        product_real.baddbmm_(input_imag, weight_imag)
+        product_imag = torch.bmm(input_imag, weight_real)
+        product_imag.baddbmm_(1, -1, input_real, weight_imag)
+
+        # Inverse transform, only at the (strided) output positions. The
+        # frequencies left out along the width are the conjugates of the
+        # ones in between the first and the middle one, so these count twice.
+        inv_cos_h, inv_sin_h = _dft_matrices(input, height,
+                (0, out_height * self.dh, self.dh), (height,))
+        inv_cos_w, inv_sin_w = _dft_matrices(input, width,
+                (half_width,), (0, out_width * self.dw, self.dw), conjugates=True)
+        num_planes = batch_size * out_channels
+        product_real = product_real.view(height, half_width, num_planes).permute(0, 2, 1).contiguous()
+        product_imag = product_imag.view(height, half_width, num_planes).permute(0, 2, 1).contiguous()
+        product_real = product_real.view(height, num_planes * half_width)
+        product_imag = product_imag.view(height, num_planes * half_width)
+        partial_real = torch.mm(inv_cos_h, product_real)
+        partial_real.addmm_(1, -1, inv_sin_h, product_imag)
+        partial_imag = torch.mm(inv_cos_h, product_imag)
+        partial_imag.addmm_(inv_sin_h, product_real)
+        output = torch.mm(partial_real.view(out_height * num_planes, half_width), inv_cos_w)
+        output.addmm_(1, -1, partial_imag.view(out_height * num_planes, half_width), inv_sin_w)
+        output.div_(height * width)
+        output = output.view(out_height, batch_size, out_channels, out_width)
+        output = output.permute(1, 2, 0, 3).contiguous()
+
+        bias_plane = _bias_plane(bias, out_height * out_width)
+        for i in range(batch_size):
+            output.select(0, i).view(out_channels, out_height * out_width).add_(bias_plane)
+        return output
+
+    def backward(self, grad_output):
+        input, weight, bias = self.forward_args
+        backend = type2backend[type(input)]
+        if self.finput is None:
+            # Gradients are always computed by the MM implementation, which
+            # needs the unfolded input
+            self.finput = self._unfolded_input(input)
+        grad_input = grad_weight = grad_bias = None
+        if self.needs_input_grad[0]:
+            grad_input = input.new().resizeAs_(input).zero_()
+            backend.SpatialConvolutionMM_updateGradInput(backend.library_state,
+                    input, grad_output, grad_input, weight, self.finput, input.new(),
+                    self.kw, self.kh, self.dw, self.dh, self.padw, self.padh)
+        if any(self.needs_input_grad[1:]):
+            grad_weight = weight.new().resizeAs_(weight).zero_()
+            grad_bias = weight.new(weight.size(0)).zero_()
+            backend.SpatialConvolutionMM_accGradParameters(backend.library_state,
+                    input, grad_output, grad_weight, grad_bias, self.finput, input.new(),
+                    self.kw, self.kh, self.dw, self.dh, self.padw, self.padh, 1)
+        if bias is None:
+            return grad_input, grad_weight
+        return grad_input, grad_weight, grad_bias
@@ -0,0 +1,28 @@
+from torch.autograd import Function
+
+
+class DropoutFunction(Function):
+
+    def __init__(self, p=0.5, train=True, inplace=False):
+        super(DropoutFunction, self).__init__()
+        if p < 0 or p >= 1:
+            raise ValueError("dropout probability has to be in [0, 1), "
+                    "but got {}".format(p))
+        self.p = p
+        self.train = train
+        self.inplace = inplace
+
+    def forward(self, input):
+        output = input if self.inplace else input.clone()
+        if self.p > 0 and self.train:
+            # Only a byte per element is kept for backward, instead of
+            # a scaled noise tensor of the input's type
+            self.mask = input.new().type(type(input).__module__ + '.ByteTensor')
+            self.mask.resize_(input.size()).bernoulli_(self.p)
+            output.maskedFill_(self.mask, 0).div_(1 - self.p)
+        return output
+
+    def backward(self, grad_output):
+        if self.p > 0 and self.train:
+            return grad_output.clone().maskedFill_(self.mask, 0).div_(1 - self.p)
+        return grad_output
@@ -0,0 +1,49 @@
+import torch
+from torch.autograd import Function
+from torch._thnn import type2backend
+from torch.sparse import _group
+
+
+class EmbeddingFunction(Function):
+
+    def __init__(self, max_norm=None, norm_type=2):
+        super(EmbeddingFunction, self).__init__()
+        self.max_norm = max_norm
+        self.norm_type = norm_type
+
+    def forward(self, indices, weight):
+        if indices.dim() != 1 and indices.dim() != 2:
+            raise ValueError("indices should be a vector or a matrix, but got "
+                    "{}D tensor".format(indices.dim()))
+        flat = indices.contiguous().view(-1).long()
+        # Every row is looked up once, and the gradients of all its
+        # occurrences are summed in backward
+        sorted, order = flat.sort(0)
+        first, group = _group(sorted)
+        self.unique = sorted.indexSelect(0, first)
+        self.inverse = flat.new(flat.nElement()).indexCopy_(0, order, group)
+        self.weight_size = weight.size()
+
+        if self.max_norm is not None:
+            # Only the rows that are looked up are renormalized
+            backend = type2backend[type(weight)]
+            backend.LookupTable_renorm(
+                backend.library_state,
+                self.unique.clone(),
+                weight,
+                self.max_norm,
+                self.norm_type
+            )
+
+        output = weight.indexSelect(0, flat)
+        if indices.dim() == 2:
+            output = output.view(indices.size(0), indices.size(1), weight.size(1))
+        return output
+
+    def backward(self, grad_output):
+        grad_output = grad_output.contiguous().view(-1, self.weight_size[1])
+        values = grad_output.new(self.unique.nElement(), grad_output.size(1)).zero_()
+        values.indexAdd_(0, self.inverse, grad_output)
+        sparse_type = getattr(torch.sparse, type(grad_output).__name__)
+        grad_weight = sparse_type(self.unique.view(1, -1), values, self.weight_size)
+        return None, grad_weight
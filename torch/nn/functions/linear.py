@@ -1,5 +1,6 @@
 import torch
 from torch.autograd import Function
+from torch.autograd.functions.blas import _sparse_mm_grad
 
 
 class LinearFunction(Function):
@@ -9,9 +10,7 @@ class LinearFunction(Function):
         output = input.new(input.size(0), weight.size(0))
         output.addmm_(0, 1, input, weight.t())
         if bias is not None:
-            # cuBLAS doesn't support 0 strides in sger, so we can't use expand
-            self.add_buffer = input.new(1).resize_(input.size(0)).fill_(1)
-            output.addr_(self.add_buffer, bias)
+            output += bias
         return output
 
     def backward(self, grad_output):
@@ -21,8 +20,71 @@ class LinearFunction(Function):
                 self.needs_input_grad[0] else None,
             torch.mm(grad_output.t(), input) if \
                 self.needs_input_grad[1] else None,
-            torch.mv(grad_output.t(), self.add_buffer) if \
+            grad_output.sum(0).view(bias.size()) if \
                 bias is not None and self.needs_input_grad[2] else None,
         )
         return grad_tuple
 
+
+class SparseLinearFunction(Function):
+
+    def forward(self, input, weight, bias=None):
+        self.forward_args = (input, weight, bias)
+        output = weight.new(input.size(0), weight.size(0))
+        if bias is not None:
+            output.copy_(bias.view(1, -1).expand(output.size()))
+            return torch.sparse.addmm(output, 1, output, input, weight.t())
+        return torch.sparse.addmm(output, 0, output, input, weight.t())
+
+    def backward(self, grad_output):
+        input, weight, bias = self.forward_args
+        grad_tuple = (
+            _sparse_mm_grad(input, weight.t(), grad_output) if \
+                self.needs_input_grad[0] else None,
+            torch.sparse.spmm(input.t(), grad_output).t() if \
+                self.needs_input_grad[1] else None,
+            grad_output.sum(0).view(bias.size()) if \
+                bias is not None and self.needs_input_grad[2] else None,
+        )
+        return grad_tuple
+
+
+class BilinearFunction(Function):
+
+    def forward(self, input1, input2, weight, bias=None):
+        self.forward_args = (input1, input2, weight, bias)
+        batch_size = input1.size(0)
+        out_features, in1_features, in2_features = weight.size()
+        # The products of all weight slices with input2 are computed at once,
+        # and then multiplied with input1 as a batch of matrix products
+        self.buffer = torch.mm(input2, weight.view(-1, in2_features).t())
+        output = torch.bmm(self.buffer.view(batch_size, out_features, in1_features),
+                input1.contiguous().view(batch_size, in1_features, 1))
+        output = output.view(batch_size, out_features)
+        if bias is not None:
+            output += bias
+        return output
+
+    def backward(self, grad_output):
+        input1, input2, weight, bias = self.forward_args
+        batch_size = input1.size(0)
+        out_features, in1_features, in2_features = weight.size()
+        grad_output = grad_output.contiguous()
+        if self.needs_input_grad[1] or self.needs_input_grad[2]:
+            # outer[b][k * in1_features + i] = grad_output[b][k] * input1[b][i]
+            outer = torch.bmm(grad_output.view(batch_size, out_features, 1),
+                    input1.contiguous().view(batch_size, 1, in1_features))
+            outer = outer.view(batch_size, -1)
+        grad_tuple = (
+            torch.bmm(grad_output.view(batch_size, 1, out_features),
+                self.buffer.view(batch_size, out_features, in1_features)
+                ).view(batch_size, in1_features) if \
+                self.needs_input_grad[0] else None,
+            torch.mm(outer, weight.view(-1, in2_features)) if \
+                self.needs_input_grad[1] else None,
+            torch.mm(outer.t(), input2).view(weight.size()) if \
+                self.needs_input_grad[2] else None,
+            grad_output.sum(0).view(bias.size()) if \
+                bias is not None and self.needs_input_grad[3] else None,
+        )
+        return grad_tuple
@@ -0,0 +1,89 @@
+import torch
+from torch.autograd import Function
+from torch._thnn import type2backend
+
+
+def quantize_weight(weight):
+    """Quantizes weight to int8, with a separate scale for every output
+    channel (the first dimension).
+
+    Returns a 2D CharTensor (output channels x everything else) and a tensor
+    of scales, such that weight[k] is approximately scale[k] * quantized[k].
+    """
+    weight = weight.contiguous().view(weight.size(0), -1)
+    scale = weight.abs().max(1)[0].div_(127)
+    scale.maskedFill_(scale.eq(0), 1)
+    # Through int, since converting negative floats to char is undefined
+    # where char is unsigned
+    quantized = weight.div(scale.expandAs(weight)).round_().int().char()
+    return quantized, scale.view(-1)
+
+
+def input_scale(input_range):
+    """Returns the scale of int8 inputs with values in [-input_range,
+    input_range]."""
+    return input_range / 127 if input_range > 0 else 1
+
+
+class _QuantizedFunction(Function):
+
+    def backward(self, grad_output):
+        raise RuntimeError("quantized modules only support inference")
+
+
+class LinearInt8Function(_QuantizedFunction):
+
+    def __init__(self, weight, weight_scale, input_scale):
+        super(LinearInt8Function, self).__init__()
+        self.weight = weight
+        self.weight_scale = weight_scale
+        self.input_scale = input_scale
+
+    def forward(self, input, bias=None):
+        backend = type2backend[type(input)]
+        output = input.new()
+        backend.LinearInt8_updateOutput(
+            backend.library_state,
+            input,
+            output,
+            self.weight,
+            self.weight_scale.type(type(input)),
+            bias,
+            torch.CharTensor(),
+            self.input_scale
+        )
+        return output
+
+
+class Conv2dInt8Function(_QuantizedFunction):
+
+    def __init__(self, weight, weight_scale, input_scale, kw, kh, dw=1, dh=1,
+            padw=0, padh=0):
+        super(Conv2dInt8Function, self).__init__()
+        self.weight = weight
+        self.weight_scale = weight_scale
+        self.input_scale = input_scale
+        self.kw = kw
+        self.kh = kh
+        self.dw = dw
+        self.dh = dh
+        self.padw = padw
+        self.padh = padh
+
+    def forward(self, input, bias=None):
+        backend = type2backend[type(input)]
+        output = input.new()
+        backend.SpatialConvolutionInt8_updateOutput(
+            backend.library_state,
+            input,
+            output,
+            self.weight,
+            self.weight_scale.type(type(input)),
+            bias,
+            torch.CharTensor(),
+            self.kw, self.kh,
+            self.dw, self.dh,
+            self.padw, self.padh,
+            self.input_scale
+        )
+        return output
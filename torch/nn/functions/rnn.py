@@ -0,0 +1,174 @@
+import torch
+from torch.autograd import Function
+from torch._thnn import type2backend
+
+
+def _input_projection(input, weight, bias=None):
+    # Projections of the inputs of all timesteps, computed with a single GEMM
+    seq_len, batch_size = input.size(0), input.size(1)
+    gates = input.new(seq_len * batch_size, weight.size(0))
+    beta = 0
+    if bias is not None:
+        gates.copy_(bias.view(1, -1).expand(gates.size()))
+        beta = 1
+    gates.addmm_(beta, 1, input.contiguous().view(seq_len * batch_size, -1), weight.t())
+    return gates.view(seq_len, batch_size, weight.size(0))
+
+
+def _previous_hidden(hx, output):
+    # Hidden state that was the input of every timestep
+    seq_len, batch_size, hidden_size = output.size(0), output.size(1), output.size(2)
+    hx = hx.contiguous().view(1, batch_size, hidden_size)
+    if seq_len == 1:
+        return hx.view(batch_size, hidden_size)
+    previous = torch.cat((hx, output.narrow(0, 0, seq_len - 1)), 0)
+    return previous.view(seq_len * batch_size, hidden_size)
+
+
+class _RNNFunction(Function):
+
+    def _weight_grads(self, grad_input_gates, grad_hidden_gates):
+        input, hx, weight_ih = self.input, self.hx, self.weight_ih
+        seq_len, batch_size = input.size(0), input.size(1)
+        grad_input_gates = grad_input_gates.view(seq_len * batch_size, -1)
+        grad_hidden_gates = grad_hidden_gates.view(seq_len * batch_size, -1)
+        return (
+            torch.mm(grad_input_gates, weight_ih).view(input.size()) if \
+                self.needs_input_grad[0] else None,
+            torch.mm(grad_input_gates.t(), input.contiguous().view(seq_len * batch_size, -1)) if \
+                self.needs_input_grad[-4] else None,
+            torch.mm(grad_hidden_gates.t(), _previous_hidden(hx, self.output)) if \
+                self.needs_input_grad[-3] else None,
+            grad_input_gates.sum(0).view(-1) if \
+                self.needs_input_grad[-2] else None,
+            grad_hidden_gates.sum(0).view(-1) if \
+                self.needs_input_grad[-1] else None,
+        )
+
+
+class LSTMFunction(_RNNFunction):
+
+    def forward(self, input, hx, cx, weight_ih, weight_hh, bias_ih, bias_hh):
+        backend = type2backend[type(input)]
+        seq_len, batch_size = input.size(0), input.size(1)
+        hidden_size = weight_hh.size(1)
+        # The hidden biases are added with the input ones
+        gates = _input_projection(input, weight_ih, bias_ih.add(bias_hh))
+        output = input.new(seq_len, batch_size, hidden_size)
+        cells = input.new(seq_len, batch_size, hidden_size)
+        h, c = hx, cx
+        for t in range(seq_len):
+            gates[t].addmm_(h, weight_hh.t())
+            backend.LSTMFused_updateOutput(
+                backend.library_state,
+                gates[t],
+                c,
+                output[t],
+                cells[t]
+            )
+            h, c = output[t], cells[t]
+
+        self.input, self.hx, self.cx = input, hx, cx
+        self.weight_ih, self.weight_hh = weight_ih, weight_hh
+        self.gates, self.output, self.cells = gates, output, cells
+        return output, h.clone(), c.clone()
+
+    def backward(self, grad_output, grad_hy, grad_cy):
+        backend = type2backend[type(self.gates)]
+        seq_len, batch_size, hidden_size = self.output.size()
+        grad_gates = self.gates.new(self.gates.size())
+        grad_h = grad_hy.clone() if grad_hy is not None else \
+            self.output.new(batch_size, hidden_size).zero_()
+        grad_c = grad_cy
+        for t in range(seq_len - 1, -1, -1):
+            if grad_output is not None:
+                grad_h.add_(grad_output[t])
+            grad_cx = grad_h.new()
+            backend.LSTMFused_updateGradInput(
+                backend.library_state,
+                self.gates[t],
+                self.cells[t - 1] if t > 0 else self.cx,
+                self.cells[t],
+                grad_h,
+                grad_c,
+                grad_gates[t],
+                grad_cx
+            )
+            grad_h = torch.mm(grad_gates[t], self.weight_hh)
+            grad_c = grad_cx
+
+        grad_input, grad_weight_ih, grad_weight_hh, grad_bias_ih, grad_bias_hh = \
+            self._weight_grads(grad_gates, grad_gates)
+        return (
+            grad_input,
+            grad_h if self.needs_input_grad[1] else None,
+            grad_c if self.needs_input_grad[2] else None,
+            grad_weight_ih,
+            grad_weight_hh,
+            grad_bias_ih,
+            grad_bias_hh,
+        )
+
+
+class GRUFunction(_RNNFunction):
+
+    def forward(self, input, hx, weight_ih, weight_hh, bias_ih, bias_hh):
+        backend = type2backend[type(input)]
+        seq_len, batch_size = input.size(0), input.size(1)
+        hidden_size = weight_hh.size(1)
+        # The hidden biases are part of the hidden projection, which is
+        # multiplied by the reset gate
+        input_gates = _input_projection(input, weight_ih, bias_ih)
+        hidden_gates = input.new(batch_size, 3 * hidden_size)
+        output = input.new(seq_len, batch_size, hidden_size)
+        storage = input.new(seq_len, batch_size, 5 * hidden_size)
+        h = hx
+        for t in range(seq_len):
+            hidden_gates.copy_(bias_hh.view(1, -1).expand(hidden_gates.size()))
+            hidden_gates.addmm_(h, weight_hh.t())
+            backend.GRUFused_updateOutput(
+                backend.library_state,
+                input_gates[t],
+                hidden_gates,
+                h,
+                output[t],
+                storage[t]
+            )
+            h = output[t]
+
+        self.input, self.hx = input, hx
+        self.weight_ih, self.weight_hh = weight_ih, weight_hh
+        self.output, self.storage = output, storage
+        return output, h.clone()
+
+    def backward(self, grad_output, grad_hy):
+        backend = type2backend[type(self.storage)]
+        seq_len, batch_size, hidden_size = self.output.size()
+        grad_input_gates = self.storage.new(seq_len, batch_size, 3 * hidden_size)
+        grad_hidden_gates = self.storage.new(seq_len, batch_size, 3 * hidden_size)
+        grad_h = grad_hy.clone() if grad_hy is not None else \
+            self.output.new(batch_size, hidden_size).zero_()
+        for t in range(seq_len - 1, -1, -1):
+            if grad_output is not None:
+                grad_h.add_(grad_output[t])
+            grad_hx = grad_h.new()
+            backend.GRUFused_updateGradInput(
+                backend.library_state,
+                grad_h,
+                self.storage[t],
+                grad_input_gates[t],
+                grad_hidden_gates[t],
+                grad_hx
+            )
+            grad_h = grad_hx.addmm_(grad_hidden_gates[t], self.weight_hh)
+
+        grad_input, grad_weight_ih, grad_weight_hh, grad_bias_ih, grad_bias_hh = \
+            self._weight_grads(grad_input_gates, grad_hidden_gates)
+        return (
+            grad_input,
+            grad_h if self.needs_input_grad[1] else None,
+            grad_weight_ih,
+            grad_weight_hh,
+            grad_bias_ih,
+            grad_bias_hh,
+        )
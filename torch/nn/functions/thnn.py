@@ -112,8 +112,13 @@ def _generate_function_classes(scope_dict):
     classes_to_generate = {fn.name.partition('_')[0] for fn in _function_list}
     exceptions = {
         'SparseLinear',
+        'SpatialConvolutionWinograd',
+        'LinearInt8',
+        'SpatialConvolutionInt8',
         'BatchNormalization',
         'LookupTable',
+        'LSTMFused',
+        'GRUFused',
         'unfolded',
     }
     classes_to_generate -= exceptions
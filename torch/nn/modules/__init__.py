@@ -1,5 +1,5 @@
 
-from .linear import Linear
+from .linear import Linear, SparseLinear, Bilinear
 from .conv import Conv2d
 from .activation import Threshold, ReLU, HardTanh, ReLU6, Sigmoid, Tanh, \
     Softmax, Softmax2d, LogSoftmax
@@ -7,3 +7,7 @@ from .criterion import AbsCriterion, ClassNLLCriterion
 from .container import Container, Sequential
 from .pooling import MaxPooling2d
 from .batchnorm import BatchNorm, BatchNorm2d
+from .dropout import Dropout
+from .embedding import Embedding
+from .rnn import LSTM, GRU
+from .quantized import QuantizedLinear, QuantizedConv2d
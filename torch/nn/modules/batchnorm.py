@@ -2,6 +2,7 @@ import torch
 from torch.autograd import Variable
 
 from .module import Module
+from ..functions.batchnorm import fold_batchnorm
 
 # TODO: check contiguous in THNN
 class BatchNorm(Module):
@@ -47,6 +48,15 @@ class BatchNorm(Module):
         return self._backend.BatchNorm(self.running_mean,
                 self.running_var, self.train, self.momentum, self.eps)(*args)[0]
 
+    def _fold_into(self, weight, bias):
+        """Returns weight and bias of a layer with output features along the
+        first dimension (e.g. Linear or Conv2d), which make the layer compute
+        what it computed followed by this module in evaluation mode."""
+        bn_weight = self.weight.data if self.weight is not None else None
+        bn_bias = self.bias.data if self.bias is not None else None
+        return fold_batchnorm(weight, bias, self.running_mean,
+                self.running_var, self.eps, bn_weight, bn_bias)
 
-class BatchNorm2d(Module):
+
+class BatchNorm2d(BatchNorm):
     expected_dim = 4
@@ -68,3 +68,94 @@ class Sequential(Container):
         for module in self.modules:
             input = module(input)
         return (input,)
+
+    def fold_batchnorm(self, input=None, precision=1e-5):
+        """Folds batch normalization modules in evaluation mode (train = False)
+        into the Linear or Conv2d modules that precede them, and removes them.
+
+        If input is given, the outputs for it before and after folding are
+        compared, and if they differ by more than precision (relative to the
+        largest absolute output), the container is left unchanged and
+        a RuntimeError is raised. Returns the number of removed modules.
+        """
+        from .batchnorm import BatchNorm
+        from .conv import Conv2d
+        from .linear import Linear
+        if input is not None:
+            expected = self(input).data.clone()
+
+        old_modules = self.modules
+        old_parameters = []
+        modules = []
+        for module in self.modules:
+            prev = modules[-1] if modules else None
+            if (isinstance(module, BatchNorm) and not module.train and
+                    isinstance(prev, (Linear, Conv2d))):
+                old_parameters.append((prev, prev.weight.data, prev.bias.data))
+                prev.weight.data, prev.bias.data = module._fold_into(
+                    prev.weight.data, prev.bias.data)
+            else:
+                modules.append(module)
+        self.modules = modules
+
+        if input is not None and old_parameters:
+            output = self(input).data
+            error = (output - expected).abs().max()
+            if error > precision * max(1, expected.abs().max()):
+                self.modules = old_modules
+                for layer, weight, bias in reversed(old_parameters):
+                    layer.weight.data, layer.bias.data = weight, bias
+                raise RuntimeError("outputs differ by {} after folding batch "
+                        "normalization".format(error))
+
+        for module in set(old_modules) - set(modules):
+            self.module_set.discard(module)
+            for name, value in list(self.__dict__.items()):
+                if value is module:
+                    delattr(self, name)
+        return len(old_modules) - len(modules)
+
+    def quantize(self, *inputs):
+        """Replaces Linear and Conv2d modules with their int8 versions
+        (QuantizedLinear and QuantizedConv2d) for inference.
+
+        inputs are sample batches. They are passed through the container to
+        calibrate the range of the inputs of every replaced module, so there
+        has to be at least one. Returns the number of replaced modules.
+        """
+        from .conv import Conv2d
+        from .linear import Linear
+        from .quantized import QuantizedConv2d, QuantizedLinear
+        if not inputs:
+            raise ValueError("quantize needs at least one calibration input")
+
+        ranges = {}
+        def record_range(module, input, output):
+            input_range = input[0].data.abs().max()
+            ranges[module] = max(ranges.get(module, 0), input_range)
+
+        layers = [m for m in self.modules if isinstance(m, (Linear, Conv2d))]
+        for layer in layers:
+            layer.register_forward_hook('quantize', record_range)
+        try:
+            for input in inputs:
+                self(input)
+        finally:
+            for layer in layers:
+                layer.remove_forward_hook('quantize')
+
+        for i, module in enumerate(self.modules):
+            if isinstance(module, Linear):
+                quantized = QuantizedLinear(module, ranges[module])
+            elif isinstance(module, Conv2d):
+                quantized = QuantizedConv2d(module, ranges[module])
+            else:
+                continue
+            quantized.type(type(module.weight.data))
+            self.modules[i] = quantized
+            self.module_set.discard(module)
+            self.module_set.add(quantized)
+            for name, value in list(self.__dict__.items()):
+                if value is module:
+                    setattr(self, name, quantized)
+        return len(layers)
@@ -15,6 +15,9 @@ class Conv2d(Module):
         self.dw = dw
         self.padh = padh
         self.padw = padw
+        # Forward algorithm of Conv2dFunction, or None to let the autotuner
+        # pick the fastest one
+        self.algorithm = None
 
         self.weight = Variable(torch.DoubleTensor(self.out_channels, self.in_channels, self.kh, self.kw))
         self.bias = Variable(torch.DoubleTensor(self.out_channels))
@@ -27,5 +30,6 @@ class Conv2d(Module):
         self.bias.data.uniform_(-stdv, stdv)
 
     def _forward(self, input):
-        return self._backend.Conv2d(self.kw, self.kh, self.dw, self.dh, self.padw, self.padh)(input, self.weight, self.bias)
+        return self._backend.Conv2d(self.kw, self.kh, self.dw, self.dh, self.padw,
+                self.padh, self.algorithm)(input, self.weight, self.bias)
 
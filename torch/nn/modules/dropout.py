@@ -0,0 +1,12 @@
+from .module import Module
+
+
+class Dropout(Module):
+
+    def __init__(self, p=0.5, inplace=False):
+        super(Dropout, self).__init__()
+        self.p = p
+        self.inplace = inplace
+
+    def _forward(self, input):
+        return self._backend.Dropout(self.p, self.train, self.inplace)(input)
@@ -0,0 +1,33 @@
+import torch
+from torch.autograd import Variable
+
+from .module import Module
+
+
+class Embedding(Module):
+    """Lookup table of num_embeddings vectors of size embedding_dim.
+
+    Takes a Variable wrapping a LongTensor of indices (a vector, or a batch
+    x length matrix), and returns their rows of the weight. The gradient
+    w.r.t. the weight is a sparse tensor that only contains the rows that
+    were looked up, so updating it doesn't depend on num_embeddings. If
+    max_norm is given, the rows that are looked up are renormalized to a
+    norm_type-norm of at most max_norm.
+    """
+
+    def __init__(self, num_embeddings, embedding_dim, max_norm=None, norm_type=2):
+        super(Embedding, self).__init__()
+        self.num_embeddings = num_embeddings
+        self.embedding_dim = embedding_dim
+        self.max_norm = max_norm
+        self.norm_type = norm_type
+
+        self.weight = Variable(torch.DoubleTensor(num_embeddings, embedding_dim))
+
+        self.reset_parameters()
+
+    def reset_parameters(self):
+        self.weight.data.normal_(0, 1)
+
+    def _forward(self, input):
+        return self._backend.Embedding(self.max_norm, self.norm_type)(input, self.weight)
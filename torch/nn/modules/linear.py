@@ -24,3 +24,38 @@ class Linear(Module):
 
     def _forward(self, input):
         return self._backend.Linear()(input, self.weight, self.bias)
+
+
+class SparseLinear(Linear):
+    """Linear layer for sparse inputs.
+
+    Expects a Variable wrapping a 2D torch.sparse tensor (batch x
+    in_features), so that the cost of forward and backward scales with the
+    number of specified elements of the input, instead of its full size.
+    """
+
+    def _forward(self, input):
+        return self._backend.SparseLinear()(input, self.weight, self.bias)
+
+
+class Bilinear(Module):
+    """Applies output[b][k] = input1[b]^T weight[k] input2[b] + bias[k]."""
+
+    def __init__(self, in1_features, in2_features, out_features):
+        super(Bilinear, self).__init__()
+        self.in1_features = in1_features
+        self.in2_features = in2_features
+        self.out_features = out_features
+
+        self.weight = Variable(torch.DoubleTensor(out_features, in1_features, in2_features))
+        self.bias = Variable(torch.DoubleTensor(out_features))
+
+        self.reset_parameters()
+
+    def reset_parameters(self):
+        stdv = 1./math.sqrt(self.weight.size(1))
+        self.weight.data.uniform_(-stdv, stdv)
+        self.bias.data.uniform_(-stdv, stdv)
+
+    def _forward(self, input1, input2):
+        return self._backend.Bilinear()(input1, input2, self.weight, self.bias)
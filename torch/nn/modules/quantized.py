@@ -0,0 +1,64 @@
+import torch
+from torch.autograd import Variable
+
+from .module import Module
+from ..functions.quantized import quantize_weight, input_scale
+
+
+class _QuantizedModule(Module):
+
+    def __init__(self, module, input_range):
+        super(_QuantizedModule, self).__init__()
+        self.train = False
+        self.quantized_weight, self.weight_scale = quantize_weight(module.weight.data)
+        self.bias = Variable(module.bias.data.clone(), requires_grad=False)
+        self.input_range = input_range
+
+    def type(self, type, *forwarded_args):
+        quantized_weight = self.quantized_weight
+        super(_QuantizedModule, self).type(type, *forwarded_args)
+        self.quantized_weight = quantized_weight
+        return self
+
+
+class QuantizedLinear(_QuantizedModule):
+    """Inference-only int8 version of a Linear module.
+
+    The weight is quantized with one scale per output feature, and inputs
+    are quantized with a single scale, so that values in [-input_range,
+    input_range] are representable.
+    """
+
+    def __init__(self, linear, input_range):
+        super(QuantizedLinear, self).__init__(linear, input_range)
+        self.in_features = linear.in_features
+        self.out_features = linear.out_features
+
+    def _forward(self, input):
+        return self._backend.LinearInt8(self.quantized_weight,
+                self.weight_scale, input_scale(self.input_range))(input, self.bias)
+
+
+class QuantizedConv2d(_QuantizedModule):
+    """Inference-only int8 version of a Conv2d module.
+
+    The weight is quantized with one scale per output channel, and inputs
+    are quantized with a single scale, so that values in [-input_range,
+    input_range] are representable.
+    """
+
+    def __init__(self, conv, input_range):
+        super(QuantizedConv2d, self).__init__(conv, input_range)
+        self.in_channels = conv.in_channels
+        self.out_channels = conv.out_channels
+        self.kh = conv.kh
+        self.kw = conv.kw
+        self.dh = conv.dh
+        self.dw = conv.dw
+        self.padh = conv.padh
+        self.padw = conv.padw
+
+    def _forward(self, input):
+        return self._backend.Conv2dInt8(self.quantized_weight,
+                self.weight_scale, input_scale(self.input_range), self.kw,
+                self.kh, self.dw, self.dh, self.padw, self.padh)(input, self.bias)
@@ -0,0 +1,79 @@
+import math
+
+import torch
+from torch.autograd import Variable
+
+from .module import Module
+
+
+class _RNNBase(Module):
+
+    def __init__(self, input_size, hidden_size, num_gates):
+        super(_RNNBase, self).__init__()
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+
+        gate_size = num_gates * hidden_size
+        self.weight_ih = Variable(torch.DoubleTensor(gate_size, input_size))
+        self.weight_hh = Variable(torch.DoubleTensor(gate_size, hidden_size))
+        self.bias_ih = Variable(torch.DoubleTensor(gate_size))
+        self.bias_hh = Variable(torch.DoubleTensor(gate_size))
+
+        self.reset_parameters()
+
+    def reset_parameters(self):
+        stdv = 1./math.sqrt(self.hidden_size)
+        for weight in self.parameters():
+            weight.data.uniform_(-stdv, stdv)
+
+    def parameters(self):
+        yield self.weight_ih
+        yield self.weight_hh
+        yield self.bias_ih
+        yield self.bias_hh
+
+    def _initial_state(self, input):
+        state = input.data.new(input.size(1), self.hidden_size).zero_()
+        return Variable(state, requires_grad=False)
+
+
+class LSTM(_RNNBase):
+    """Long short-term memory layer.
+
+    Takes a seq_len x batch x input_size input and optionally the initial
+    hidden and cell states (batch x hidden_size, zero by default), and
+    returns the hidden states of all timesteps, and the last hidden and cell
+    states. The input projections of all timesteps are computed with one
+    matrix product, and every timestep with one product and one pass over
+    the gates.
+    """
+
+    def __init__(self, input_size, hidden_size):
+        super(LSTM, self).__init__(input_size, hidden_size, 4)
+
+    def _forward(self, input, hx=None, cx=None):
+        if hx is None:
+            hx = self._initial_state(input)
+        if cx is None:
+            cx = self._initial_state(input)
+        return self._backend.LSTM()(input, hx, cx, self.weight_ih,
+                self.weight_hh, self.bias_ih, self.bias_hh)
+
+
+class GRU(_RNNBase):
+    """Gated recurrent unit layer.
+
+    Takes a seq_len x batch x input_size input and optionally the initial
+    hidden state (batch x hidden_size, zero by default), and returns the
+    hidden states of all timesteps and the last one. Like LSTM, it computes
+    the input projections of all timesteps with one matrix product.
+    """
+
+    def __init__(self, input_size, hidden_size):
+        super(GRU, self).__init__(input_size, hidden_size, 3)
+
+    def _forward(self, input, hx=None):
+        if hx is None:
+            hx = self._initial_state(input)
+        return self._backend.GRU()(input, hx, self.weight_ih, self.weight_hh,
+                self.bias_ih, self.bias_hh)
@@ -0,0 +1,187 @@
+from collections import namedtuple
+
+import torch
+from torch.autograd import Variable
+from .modules.module import Module
+
+
+LayerSummary = namedtuple('LayerSummary', ['name', 'output_size', 'parameters',
+        'parameter_bytes', 'activation_bytes', 'flops'])
+
+
+class ModelSummary(object):
+    """Per-layer statistics of a forward pass, from summary().
+
+    layers is a list of LayerSummary tuples, in the order in which the
+    layers were run. FLOPs are estimated, counting a multiply-add as two
+    operations and one operation per output element for layers without
+    weights.
+
+    The peak training memory estimate assumes that the input and the outputs
+    of all layers are kept for backward, that every parameter has a gradient
+    of the same size, and that backward needs one more buffer of the size of
+    the largest output. Optimizer state (e.g. momentum) isn't included.
+    """
+
+    def __init__(self, layers, input_bytes, parameters, parameter_bytes):
+        self.layers = layers
+        self.input_bytes = input_bytes
+        # Shared parameters are only counted once
+        self.parameters = parameters
+        self.parameter_bytes = parameter_bytes
+
+    @property
+    def activation_bytes(self):
+        return sum(layer.activation_bytes for layer in self.layers)
+
+    @property
+    def flops(self):
+        return sum(layer.flops for layer in self.layers)
+
+    @property
+    def peak_training_bytes(self):
+        largest = max([layer.activation_bytes for layer in self.layers] or [0])
+        return (self.input_bytes + 2 * self.parameter_bytes +
+                self.activation_bytes + largest)
+
+    def __repr__(self):
+        rows = [('', 'Layer', 'Output size', 'Params', 'Activations', 'FLOPs')]
+        for i, layer in enumerate(self.layers):
+            rows.append((str(i), layer.name, 'x'.join(map(str, layer.output_size)),
+                str(layer.parameters), _format_bytes(layer.activation_bytes),
+                str(layer.flops)))
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = ['  '.join(cell.rjust(width) if i != 1 else cell.ljust(width)
+                    for i, (cell, width) in enumerate(zip(row, widths)))
+                 for row in rows]
+        lines.append('Parameters: {} ({})'.format(self.parameters,
+            _format_bytes(self.parameter_bytes)))
+        lines.append('Activations: {}'.format(_format_bytes(self.activation_bytes)))
+        lines.append('FLOPs: {}'.format(self.flops))
+        lines.append('Estimated peak training memory: {}'.format(
+            _format_bytes(self.peak_training_bytes)))
+        return '\n'.join(lines)
+
+
+def _format_bytes(n):
+    for unit in ['B', 'KB', 'MB']:
+        if n < 1024:
+            return '{:.1f}{}'.format(n, unit) if unit != 'B' else '{}B'.format(n)
+        n /= 1024.
+    return '{:.1f}GB'.format(n)
+
+
+def _tensors(obj):
+    if isinstance(obj, Variable):
+        obj = obj.data
+    if torch.isTensor(obj) or torch.sparse.isSparse(obj):
+        return [obj]
+    if isinstance(obj, (list, tuple)):
+        return [t for elem in obj for t in _tensors(elem)]
+    return []
+
+
+def _tensor_bytes(tensor):
+    if torch.sparse.isSparse(tensor):
+        return _tensor_bytes(tensor.indices()) + _tensor_bytes(tensor.values())
+    if tensor.nElement() == 0:
+        return 0
+    return tensor.nElement() * tensor.storage().elementSize()
+
+
+def _parameters(module):
+    if isinstance(module, Module):
+        parameters = [p.data for p in module.parameters()]
+    else:
+        parameters = module.parameters()
+        parameters = parameters[0] if parameters else []
+    # Quantized modules keep their weight outside of the parameters
+    for name in ('quantized_weight', 'quantizedWeight'):
+        if getattr(module, name, None) is not None:
+            parameters = parameters + [getattr(module, name)]
+    return parameters
+
+
+def _flops(module, inputs, outputs):
+    name = type(module).__name__
+    output = outputs[0]
+    if name in ('LSTM', 'GRU'):
+        weights = module.weight_ih.data.nElement() + module.weight_hh.data.nElement()
+        return 2 * output.size(0) * output.size(1) * weights
+    if name in ('Embedding', 'LookupTable'):
+        return 0
+    if name == 'SparseLinear' and inputs and torch.sparse.isSparse(inputs[0]):
+        return 2 * inputs[0].nnz() * output.size(1)
+    weight = getattr(module, 'weight', None)
+    if weight is None:
+        weight = getattr(module, 'quantized_weight', getattr(module, 'quantizedWeight', None))
+    if isinstance(weight, Variable):
+        weight = weight.data
+    if weight is not None and weight.dim() > 1:
+        # Every output element is a dot product with a slice of the weight
+        return 2 * output.nElement() * (weight.nElement() // weight.size(0))
+    return output.nElement()
+
+
+def _leaves(model):
+    if isinstance(model, Module):
+        if not hasattr(model, 'module_set'):
+            return [model]
+        # Sequential only adds named modules to module_set
+        children = list(getattr(model, 'modules', []))
+        children += [module for module in model.module_set if module not in children]
+        return [leaf for child in children for leaf in _leaves(child)]
+    return [module for module in model.listModules() if not getattr(module, 'modules', None)]
+
+
+def summary(model, *inputs):
+    """Runs model on sample inputs and returns a ModelSummary with the output
+    size, parameter count, activation memory and FLOPs of every layer.
+
+    model can be a torch.nn module, which is called with inputs (Variables),
+    or a torch.legacy.nn module, whose forward gets the input (a tensor or a
+    table). Only the innermost modules (not containers) are reported.
+    """
+    layers = []
+
+    def record(module, input, output):
+        input, output = _tensors(input), _tensors(output)
+        parameters = _parameters(module)
+        layers.append(LayerSummary(
+            type(module).__name__,
+            tuple(output[0].size()) if output else (),
+            sum(p.nElement() for p in parameters),
+            sum(_tensor_bytes(p) for p in parameters),
+            sum(_tensor_bytes(t) for t in output),
+            _flops(module, input, output) if output else 0))
+
+    leaves = _leaves(model)
+    if isinstance(model, Module):
+        for module in set(leaves):
+            module.register_forward_hook('summary', record)
+        try:
+            model(*inputs)
+        finally:
+            for module in set(leaves):
+                module.remove_forward_hook('summary')
+    else:
+        # Legacy modules don't have hooks, so their updateOutput is wrapped
+        for module in set(leaves):
+            def updateOutput(input, module=module, updateOutput=module.updateOutput):
+                output = updateOutput(input)
+                record(module, input, output)
+                return output
+            module.updateOutput = updateOutput
+        try:
+            model.forward(inputs[0] if len(inputs) == 1 else list(inputs))
+        finally:
+            for module in set(leaves):
+                del module.updateOutput
+
+    parameters = {}
+    for module in leaves:
+        for p in _parameters(module):
+            parameters[id(p)] = p
+    return ModelSummary(layers, sum(_tensor_bytes(t) for t in _tensors(inputs)),
+            sum(p.nElement() for p in parameters.values()),
+            sum(_tensor_bytes(p) for p in parameters.values()))
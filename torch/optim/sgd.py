@@ -1,5 +1,6 @@
 from collections import defaultdict
 from .optimizer import Optimizer
+import torch
 
 class SGD(Optimizer):
 
@@ -13,14 +14,21 @@ class SGD(Optimizer):
     def step(self, *input):
         loss = self._forward_backward(input)
         for p in self.parameters:
+            sparse = torch.sparse.isSparse(p.grad)
             if self.momentum != 0:
                 param_state = self.state[id(p)]
                 if not 'momentum_buffer' in param_state:
-                    param_state['momentum_buffer'] = p.grad.clone()
+                    param_state['momentum_buffer'] = p.grad.toDense() if sparse else p.grad.clone()
+                elif sparse:
+                    p.grad.addTo(param_state['momentum_buffer'].mul_(self.momentum), 1 - self.dampening)
                 else:
                     param_state['momentum_buffer'].mul_(self.momentum).add_(1 - self.dampening, p.grad)
                 d_p = param_state['momentum_buffer']
             else:
                 d_p = p.grad
-            p.data.add_(-self.lr, d_p)
+            if torch.sparse.isSparse(d_p):
+                # Only the specified elements are updated
+                d_p.addTo(p.data, -self.lr)
+            else:
+                p.data.add_(-self.lr, d_p)
         return loss
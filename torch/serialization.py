@@ -1,3 +1,4 @@
+import io
 import os
 import sys
 import tempfile
@@ -5,11 +6,14 @@ import tarfile
 import pickle
 import shutil
 import struct
+import threading
 from contextlib import closing, contextmanager
 if sys.version_info[0] == 2:
     import cPickle as pickle
+    string_classes = basestring
 else:
     import pickle
+    string_classes = (str, bytes)
 
 import torch
 
@@ -36,8 +40,7 @@ def mkdtemp():
     shutil.rmtree(path)
 
 
-# TODO: choose pickle protocol
-def save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL):
+def _serialize_objects(obj, pickle_module, pickle_protocol, compact=False):
     serialized_tensors = {}
     serialized_storages = {}
 
@@ -50,27 +53,83 @@ def save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL):
             return str(obj._cdata)
         return None
 
+    pickled = io.BytesIO()
+    pickler = pickle_module.Pickler(pickled, protocol=pickle_protocol)
+    pickler.persistent_id = persistent_id
+    pickler.dump(obj)
+
+    # Tensors are written as (tensor, key of its storage) pairs, so that the
+    # tensor data can later be swapped for a snapshot without changing keys.
+    pickled_storages = set(serialized_storages)
+    for key, tensor in serialized_tensors.items():
+        storage = tensor.storage()
+        serialized_storages[storage._cdata] = storage
+        serialized_tensors[key] = (tensor, storage._cdata)
+
+    if compact:
+        _compact_storages(serialized_tensors, serialized_storages, pickled_storages)
+
+    return pickled.getvalue(), serialized_tensors, serialized_storages
+
+
+def _compact_storages(serialized_tensors, serialized_storages, pickled_storages):
+    # Find the smallest range of each storage that covers all tensors using
+    # it. Storages that were pickled on their own have to be saved whole.
+    ranges = {}
+    for tensor, storage_key in serialized_tensors.values():
+        if storage_key in pickled_storages or tensor.nElement() == 0:
+            continue
+        begin = tensor.storageOffset()
+        end = begin + 1 + sum((size - 1) * stride for size, stride
+                in zip(tensor.size(), tensor.stride()))
+        lo, hi = ranges.get(storage_key, (begin, end))
+        ranges[storage_key] = (min(lo, begin), max(hi, end))
+
+    for key, storage in list(serialized_storages.items()):
+        if key in pickled_storages:
+            continue
+        if key in ranges:
+            lo, hi = ranges[key]
+            serialized_storages[key] = type(storage)(storage, lo, hi - lo)
+        else:
+            serialized_storages[key] = type(storage)()
+
+    # Rebase the tensors onto the compacted storages
+    for key, (tensor, storage_key) in list(serialized_tensors.items()):
+        if storage_key in pickled_storages:
+            continue
+        offset = tensor.storageOffset() - ranges[storage_key][0] \
+            if tensor.nElement() > 0 else 0
+        rebased = tensor.new().set_(serialized_storages[storage_key], offset,
+                tensor.size(), tensor.stride())
+        serialized_tensors[key] = (rebased, storage_key)
+
+
+def _write_storages(f, serialized_storages, pickle_module, pickle_protocol):
+    pickle_module.dump(len(serialized_storages), f, protocol=pickle_protocol)
+    for key, storage in serialized_storages.items():
+        pickle_module.dump((key, type(storage)), f, protocol=pickle_protocol)
+        f.flush()
+        storage._write_file(f)
+
+
+def _write_tar(f, pickled, serialized_tensors, serialized_storages,
+        pickle_module, pickle_protocol, shard_names=None):
     def save_tensors(f):
         pickle_module.dump(len(serialized_tensors), f, protocol=pickle_protocol)
-        for key, tensor in serialized_tensors.items():
-            storage = tensor.storage()
-            serialized_storages[storage._cdata] = storage
-
-            pickle_module.dump((key, type(tensor), storage._cdata), f, protocol=pickle_protocol)
+        for key, (tensor, storage_key) in serialized_tensors.items():
+            pickle_module.dump((key, type(tensor), storage_key), f, protocol=pickle_protocol)
             f.flush()
             tensor._write_metadata(f)
 
     def save_storages(f):
-        pickle_module.dump(len(serialized_storages), f, protocol=pickle_protocol)
-        for key, storage in serialized_storages.items():
-            pickle_module.dump((key, type(storage)), f, protocol=pickle_protocol)
-            f.flush()
-            storage._write_file(f)
+        _write_storages(f, serialized_storages, pickle_module, pickle_protocol)
+
+    def save_shard_names(f):
+        pickle_module.dump(shard_names, f, protocol=pickle_protocol)
 
     def pickle_objects(f):
-        pickler = pickle_module.Pickler(f, protocol=pickle_protocol)
-        pickler.persistent_id = persistent_id
-        pickler.dump(obj)
+        f.write(pickled)
 
     def save_sys_info(f):
         sys_info = dict(
@@ -89,11 +148,253 @@ def save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL):
         _add_to_tar(pickle_objects, tar, 'pickle')
         _add_to_tar(save_tensors, tar, 'tensors')
         _add_to_tar(save_storages, tar, 'storages')
+        if shard_names is not None:
+            _add_to_tar(save_shard_names, tar, 'shards')
+
+
+# TODO: choose pickle protocol
+def save(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL,
+        compact=False):
+    """Saves obj to the file object f.
+
+    If compact is True, only the part of each storage that is used by the
+    saved tensors is written, and the tensors are rebased onto it. Storages
+    saved directly (not only through tensors) are always written whole.
+    """
+    serialized = _serialize_objects(obj, pickle_module, pickle_protocol, compact)
+    _write_tar(f, *serialized, pickle_module=pickle_module,
+            pickle_protocol=pickle_protocol)
+
+
+class _Future(object):
+    """The result of a save_async call."""
+
+    def __init__(self):
+        self._finished = threading.Event()
+        self._exception = None
+
+    def _run(self, fn):
+        try:
+            fn()
+        except BaseException as e:
+            self._exception = e
+        finally:
+            self._finished.set()
+
+    def done(self):
+        return self._finished.is_set()
+
+    def exception(self, timeout=None):
+        """Waits for the save to complete and returns the exception it
+        raised, or None."""
+        self._finished.wait(timeout)
+        if not self._finished.is_set():
+            raise RuntimeError('the save did not complete within the timeout')
+        return self._exception
+
+    def result(self, timeout=None):
+        """Waits for the save to complete, and raises its exception if it
+        failed."""
+        exception = self.exception(timeout)
+        if exception is not None:
+            raise exception
+
+
+class _AsyncSaver(object):
+    """Snapshots storages into reusable staging buffers and writes them out
+    on a single background thread, so that saves complete in order."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.free_buffers = {}
+        self.last_future = None
+
+    def _acquire_buffer(self, storage):
+        key = (type(storage), storage.size())
+        with self.lock:
+            buffers = self.free_buffers.get(key)
+            buffer = buffers.pop() if buffers else None
+        if buffer is None:
+            buffer = type(storage)(storage.size())
+        return buffer.copy_(storage)
+
+    def _release_buffers(self, buffers):
+        with self.lock:
+            for buffer in buffers:
+                key = (type(buffer), buffer.size())
+                self.free_buffers.setdefault(key, []).append(buffer)
+
+    def empty_cache(self):
+        with self.lock:
+            self.free_buffers = {}
+
+    def save(self, obj, f, pickle_module, pickle_protocol, compact):
+        pickled, serialized_tensors, serialized_storages = \
+            _serialize_objects(obj, pickle_module, pickle_protocol, compact)
+
+        snapshot_storages = {key: self._acquire_buffer(storage)
+                for key, storage in serialized_storages.items()}
+        snapshot_tensors = {}
+        for key, (tensor, storage_key) in serialized_tensors.items():
+            snapshot = tensor.new().set_(snapshot_storages[storage_key],
+                    tensor.storageOffset(), tensor.size(), tensor.stride())
+            snapshot_tensors[key] = (snapshot, storage_key)
+
+        def write():
+            try:
+                if isinstance(f, string_classes):
+                    with open(f, 'wb') as opened_file:
+                        _write_tar(opened_file, pickled, snapshot_tensors,
+                                snapshot_storages, pickle_module, pickle_protocol)
+                        _fsync(opened_file)
+                else:
+                    _write_tar(f, pickled, snapshot_tensors, snapshot_storages,
+                            pickle_module, pickle_protocol)
+                    _fsync(f)
+            finally:
+                snapshot_tensors.clear()
+                self._release_buffers(snapshot_storages.values())
+
+        # Every save gets its own (non-daemon, so pending saves finish
+        # before the interpreter exits) thread, which waits for the previous
+        # save to complete
+        future = _Future()
+        with self.lock:
+            previous, self.last_future = self.last_future, future
+
+        def run():
+            if previous is not None:
+                previous._finished.wait()
+            future._run(write)
+
+        threading.Thread(target=run).start()
+        return future
+
+
+def _fsync(f):
+    f.flush()
+    try:
+        fd = f.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        # Not a real file (e.g. io.BytesIO)
+        return
+    os.fsync(fd)
+
+
+_async_saver = _AsyncSaver()
+
+
+def save_async(obj, f, pickle_module=pickle, pickle_protocol=DEFAULT_PROTOCOL,
+        compact=False):
+    """Saves obj like torch.save, but returns as soon as the data of all
+    referenced tensors and storages has been copied to staging buffers.
+
+    Serialization and writing (followed by an fsync) happen on a background
+    thread. f can be a file name or a file object, which mustn't be used
+    until the save completes. The result() method of the returned future
+    waits for that and raises any error of the write. Staging buffers are
+    reused by subsequent saves; empty_async_cache() frees them.
+    """
+    return _async_saver.save(obj, f, pickle_module, pickle_protocol, compact)
+
+
+def empty_async_cache():
+    _async_saver.empty_cache()
+
+
+def save_sharded(obj, f, num_shards, pickle_module=pickle,
+        pickle_protocol=DEFAULT_PROTOCOL, compact=False):
+    """Saves obj like torch.save, but splits the storage data across
+    num_shards files named f + '.shard<i>', balanced by size.
+
+    f must be a file name. It's written as an index that holds everything
+    except the storage data, and it has to be loaded with load_sharded.
+    """
+    if num_shards < 1:
+        raise ValueError('num_shards has to be positive, but got {}'.format(num_shards))
+    pickled, serialized_tensors, serialized_storages = \
+        _serialize_objects(obj, pickle_module, pickle_protocol, compact)
+
+    # Assign storages from the largest to the least loaded shard
+    shards = [{} for i in torch._pyrange(num_shards)]
+    shard_sizes = [0] * num_shards
+    def nbytes(item):
+        return item[1].size() * item[1].elementSize()
+    for item in sorted(serialized_storages.items(), key=nbytes, reverse=True):
+        idx = shard_sizes.index(min(shard_sizes))
+        shards[idx][item[0]] = item[1]
+        shard_sizes[idx] += nbytes(item)
+
+    shard_names = [os.path.basename(f) + '.shard' + str(i)
+            for i in torch._pyrange(num_shards)]
+    shard_dir = os.path.dirname(f)
+
+    def save_shard(args):
+        name, shard = args
+        with open(os.path.join(shard_dir, name), 'wb') as shard_file:
+            _write_storages(shard_file, shard, pickle_module, pickle_protocol)
+
+    _thread_map(save_shard, zip(shard_names, shards), num_shards)
+    with open(f, 'wb') as index_file:
+        _write_tar(index_file, pickled, serialized_tensors, {}, pickle_module,
+                pickle_protocol, shard_names=shard_names)
+
+
+def _thread_map(fn, args, num_threads):
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(num_threads)
+    try:
+        return pool.map(fn, args)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _read_records(f, init, pickle_module, deserialized_objects):
+    num_records = pickle_module.load(f)
+    for i in range(num_records):
+        args = pickle_module.load(f)
+        key, args = args[0], args[1:]
+        obj = init(f, *args)
+        deserialized_objects[key] = obj
 
 
 def load(f, pickle_module=pickle):
+    return _load(f, pickle_module, {})
+
+
+def load_sharded(f, pickle_module=pickle, num_threads=None):
+    """Loads an object saved with save_sharded. The shards are read
+    concurrently, using one thread per shard unless num_threads is given.
+    Files saved with torch.save (which have no shards) are loaded as well.
+    """
+    with closing(tarfile.open(f, mode='r:', format=tarfile.PAX_FORMAT)) as tar:
+        try:
+            shards_file = tar.extractfile('shards')
+        except KeyError:
+            shards_file = None
+        shard_names = pickle_module.load(shards_file) if shards_file else []
+    shard_dir = os.path.dirname(f)
+
+    def load_shard(name):
+        shard_storages = {}
+        with open(os.path.join(shard_dir, name), 'rb', 0) as shard_file:
+            _read_records(shard_file,
+                    lambda f, storage_type: storage_type._new_with_file(f),
+                    pickle_module, shard_storages)
+        return shard_storages
+
     deserialized_objects = {}
+    if shard_names:
+        shard_storages = _thread_map(load_shard, shard_names,
+                num_threads or len(shard_names))
+        for storages in shard_storages:
+            deserialized_objects.update(storages)
+    with open(f, 'rb') as index_file:
+        return _load(index_file, pickle_module, deserialized_objects)
+
 
+def _load(f, pickle_module, deserialized_objects):
     def persistent_load(saved_id):
         return deserialized_objects[int(saved_id)]
 
@@ -103,12 +404,7 @@ def load(f, pickle_module=pickle):
         def extract(name, init):
             tar.extract(name, path=tmpdir)
             with open(os.path.join(tmpdir, name), 'rb', 0) as f:
-                num_storages = pickle_module.load(f)
-                for i in range(num_storages):
-                    args = pickle_module.load(f)
-                    key, args = args[0], args[1:]
-                    obj = init(f, *args)
-                    deserialized_objects[key] = obj
+                _read_records(f, init, pickle_module, deserialized_objects)
 
         extract('storages', lambda f, storage_type: storage_type._new_with_file(f))
         extract('tensors', lambda f, tensor_type, storage_id: \
@@ -120,3 +416,164 @@ def load(f, pickle_module=pickle):
         result = unpickler.load()
         return result
 
+
+class _TensorRef(object):
+    # Stands in for saved tensors and storages when unpickling in load_into
+
+    def __init__(self, key):
+        self.key = key
+
+
+def _named_tensors(obj):
+    from torch.autograd import Variable
+    from torch.nn.modules.module import Module
+    from torch.legacy.nn import Module as LegacyModule
+
+    def named_tensors(obj, prefix):
+        if torch.isTensor(obj) or isinstance(obj, _TensorRef):
+            yield prefix, obj
+            return
+        if isinstance(obj, Variable):
+            items = [(None, obj.data)]
+        elif isinstance(obj, dict):
+            items = obj.items()
+        elif isinstance(obj, (list, tuple)):
+            items = enumerate(obj)
+        elif isinstance(obj, (Module, LegacyModule)):
+            items = obj.__dict__.items()
+        else:
+            return
+        for key, value in items:
+            name = prefix
+            if key is not None:
+                name = prefix + '.' + str(key) if prefix else str(key)
+            for result in named_tensors(value, name):
+                yield result
+
+    return dict(named_tensors(obj, ''))
+
+
+# The C serializers write native-sized longs
+_NATIVE_LONG_SIZE = struct.Struct('l').size
+
+
+def _read_tensor_metadata(f):
+    def read_longs(n):
+        return struct.unpack('{}l'.format(n), f.read(_NATIVE_LONG_SIZE * n))
+    # nDimension is an int, but it's written into a long-sized slot
+    n_dim, = struct.unpack('i', f.read(_NATIVE_LONG_SIZE)[:struct.calcsize('i')])
+    size = read_longs(n_dim)
+    stride = read_longs(n_dim)
+    offset, = read_longs(1)
+    return size, stride, offset
+
+
+def _byte_view(storage, offset=0, count=-1):
+    # A writable memoryview of the bytes of a CPU storage (memoryview.cast
+    # isn't available on Python 2)
+    return memoryview(torch.ByteStorage.from_buffer(storage, offset, count))
+
+
+def _readinto(f, buffer):
+    while len(buffer) > 0:
+        num_read = f.readinto(buffer)
+        if not num_read:
+            raise EOFError('unexpected end of the checkpoint data')
+        buffer = buffer[num_read:]
+
+
+def _is_contiguous(size, stride):
+    expected_stride = 1
+    for s, st in zip(reversed(size), reversed(stride)):
+        if s != 1 and st != expected_stride:
+            return False
+        expected_stride *= s
+    return True
+
+
+def _read_into_tensor(f, data_start, element_size, dst, tensor_type, size,
+        stride, offset):
+    if dst.nElement() == 0:
+        return
+    f.seek(data_start + offset * element_size)
+
+    if type(dst) == tensor_type and dst.isContiguous() and _is_contiguous(size, stride):
+        try:
+            dst_data = _byte_view(dst.storage(), dst.storageOffset() * element_size,
+                    dst.nElement() * element_size)
+        except TypeError:
+            dst_data = None
+        if dst_data is not None:
+            _readinto(f, dst_data)
+            return
+
+    # Read the part of the saved storage that the tensor covers and let
+    # copy_ deal with strides, type conversion and copies to the GPU
+    cpu_tensor_type = getattr(torch, tensor_type.__name__)
+    cpu_storage_type = getattr(torch, tensor_type.__name__.replace('Tensor', 'Storage'))
+    buffer = cpu_storage_type(1 + sum((s - 1) * st for s, st in zip(size, stride)))
+    _readinto(f, _byte_view(buffer))
+    dst.copy_(cpu_tensor_type().set_(buffer, 0, torch.LongStorage(size),
+        torch.LongStorage(stride)))
+
+
+def load_into(f, dest, pickle_module=pickle):
+    """Loads the tensors of an object saved with torch.save into existing
+    tensors, instead of allocating new ones.
+
+    dest can be a dict of tensors or an object holding them, like a module.
+    Tensors are named by their path in dest and in the saved object (e.g.
+    'layer1.weight' for a module, or the key for a dict), and every tensor of
+    dest has to have a saved counterpart of the same size, otherwise a
+    ValueError is raised before any tensor is modified. When their types
+    match and both are contiguous, the data is read from f straight into the
+    existing storage. Otherwise, it's copied through a temporary buffer. f
+    has to be seekable.
+    """
+    dest_tensors = _named_tensors(dest)
+    with closing(tarfile.open(fileobj=f, mode='r:', format=tarfile.PAX_FORMAT)) as tar:
+        unpickler = pickle_module.Unpickler(tar.extractfile('pickle'))
+        unpickler.persistent_load = lambda saved_id: _TensorRef(int(saved_id))
+        saved_tensors = _named_tensors(unpickler.load())
+
+        missing = [name for name in dest_tensors if name not in saved_tensors]
+        if missing:
+            raise KeyError('tensors not found in the checkpoint: ' + ', '.join(sorted(missing)))
+
+        tensors_file = tar.extractfile('tensors')
+        metadata = {}
+        for i in range(pickle_module.load(tensors_file)):
+            key, tensor_type, storage_key = pickle_module.load(tensors_file)
+            metadata[key] = (storage_key, tensor_type) + _read_tensor_metadata(tensors_file)
+
+        # Group destination tensors by the saved storage holding their data
+        to_read = {}
+        seen = set()
+        for name, tensor in dest_tensors.items():
+            key = saved_tensors[name].key
+            if key not in metadata:
+                raise RuntimeError('{} is a storage in the checkpoint, not a tensor'.format(name))
+            storage_key, tensor_metadata = metadata[key][0], metadata[key][1:]
+            saved_size = list(tensor_metadata[1])
+            if list(tensor.size()) != saved_size:
+                raise ValueError('size mismatch for {}: the tensor has size {}, but '
+                    'the saved one has size {}'.format(name,
+                        'x'.join(map(str, tensor.size())), 'x'.join(map(str, saved_size))))
+            if id(tensor) in seen:
+                continue
+            seen.add(id(tensor))
+            to_read.setdefault(storage_key, []).append((tensor, tensor_metadata))
+
+        storages_file = tar.extractfile('storages')
+        for i in range(pickle_module.load(storages_file)):
+            key, storage_type = pickle_module.load(storages_file)
+            size, = struct.unpack('l', storages_file.read(_NATIVE_LONG_SIZE))
+            element_size = storage_type().elementSize()
+            data_start = storages_file.tell()
+            for tensor, tensor_metadata in to_read.pop(key, ()):
+                _read_into_tensor(storages_file, data_start, element_size,
+                        tensor, *tensor_metadata)
+            storages_file.seek(data_start + size * element_size)
+        if to_read:
+            raise RuntimeError('the checkpoint has no data for some of the '
+                'tensors (sharded checkpoints aren\'t supported by load_into)')
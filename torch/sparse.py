@@ -0,0 +1,301 @@
+"""Sparse tensors in coordinate (COO) format, and their products with dense
+matrices."""
+
+import torch
+
+
+class _SparseBase(object):
+    """A tensor with nnz specified elements.
+
+    Can be constructed from an nDimensionI x nnz LongTensor of (0-based)
+    indices, a tensor of the nnz values and the size, or only from a size,
+    for a tensor without specified elements. If the size isn't given, it is
+    inferred from the largest indices.
+
+    The first nDimensionI dimensions are sparse, and the remaining ones are
+    dense: every value is a slice (values[k]) of the tensor, e.g. with 1D
+    indices and 2D values, the tensor is a matrix where only some rows are
+    specified.
+
+    An element can be specified more than once, in which case the values
+    are summed. coalesce() returns a tensor where every element is
+    specified once, with the indices in lexicographic order.
+    """
+
+    def __init__(self, *args):
+        if len(args) >= 2 and torch.isTensor(args[0]):
+            indices, values = args[0], args[1]
+            size = args[2] if len(args) > 2 else None
+            if indices.dim() != 2:
+                raise ValueError("indices should be a 2D tensor (nDimension x nnz), "
+                        "but got {}D".format(indices.dim()))
+            if values.dim() == 0 or values.size(0) != indices.size(1):
+                raise ValueError("values should have nnz = {} slices"
+                        .format(indices.size(1)))
+            if size is None:
+                size = [m + 1 for m in indices.max(1)[0].view(-1).tolist()] + \
+                    values.size().tolist()[1:]
+            self._indices = indices.long()
+            self._values = values.type(self._values_type)
+            self._nDimI = indices.size(0)
+        else:
+            size = args[0] if len(args) == 1 and not isinstance(args[0], int) else args
+            self._indices = torch.LongTensor()
+            self._values = self._values_type()
+            self._nDimI = len(size)
+        self._size = torch.LongStorage(list(size))
+        if self.nnz() > 0 and self._nDimI + self._values.dim() - 1 != len(self._size):
+            raise ValueError("indices and values have {} dimensions, but the tensor "
+                    "has {}".format(self._nDimI + self._values.dim() - 1, len(self._size)))
+        self._coalesced = self.nnz() == 0
+
+    def size(self, dim=None):
+        if dim is None:
+            return torch.LongStorage(list(self._size))
+        return self._size[dim]
+
+    def dim(self):
+        return len(self._size)
+
+    def nDimension(self):
+        return self.dim()
+
+    def nDimensionI(self):
+        return self._nDimI
+
+    def nDimensionV(self):
+        return self.dim() - self._nDimI
+
+    def nnz(self):
+        return self._indices.size(1) if self._indices.nElement() > 0 else 0
+
+    def nElement(self):
+        n = 1
+        for s in self._size:
+            n *= s
+        return n
+
+    def numel(self):
+        return self.nElement()
+
+    def indices(self):
+        return self._indices
+
+    def values(self):
+        return self._values
+
+    def isCoalesced(self):
+        return self._coalesced
+
+    def new(self, *args):
+        if len(args) == 0:
+            args = (self._size,)
+        return type(self)(*args)
+
+    def clone(self):
+        if self.nnz() == 0:
+            return self.new()
+        result = type(self)(self._indices.clone(), self._values.clone(), self._size)
+        result._coalesced = self._coalesced
+        return result
+
+    def type(self, t=None):
+        if t is None:
+            return self.__module__ + '.' + type(self).__name__
+        if isinstance(t, str):
+            t = torch._import_dotted_name(t)
+        if t is type(self):
+            return self
+        if self.nnz() == 0:
+            return t(self._size)
+        return t(self._indices, self._values, self._size)
+
+    def double(self):
+        return self.type(DoubleTensor)
+
+    def float(self):
+        return self.type(FloatTensor)
+
+    def long(self):
+        return self.type(LongTensor)
+
+    def int(self):
+        return self.type(IntTensor)
+
+    def _linearIndices(self):
+        linear = torch.LongTensor(self.nnz()).zero_()
+        stride = 1
+        for d in range(self._nDimI - 1, -1, -1):
+            linear.add_(stride, self._indices[d])
+            stride *= self._size[d]
+        return linear
+
+    def coalesce(self):
+        """Returns a tensor with the same elements, where every element is
+        specified once (with the sum of its values) and the indices are in
+        lexicographic order."""
+        if self._coalesced:
+            return self
+        linear, order = self._linearIndices().sort(0)
+        indices = self._indices.indexSelect(1, order)
+        values = self._values.indexSelect(0, order)
+        if linear.nElement() > 1:
+            first, group = _group(linear)
+            indices = indices.indexSelect(1, first)
+            size = values.size()
+            size[0] = first.nElement()
+            values = values.new(size).zero_().indexAdd_(0, group, values)
+        result = type(self)(indices, values, self._size)
+        result._coalesced = True
+        return result
+
+    def toDense(self):
+        return self.addTo(self._values.new(self._size).zero_())
+
+    def addTo(self, dense, value=1):
+        """Adds value times this tensor to a dense tensor of the same size, in
+        place, and returns it. Only the specified elements are visited."""
+        if list(dense.size()) != list(self._size):
+            raise ValueError("sizes of sparse and dense tensors don't match")
+        if self.nnz() == 0:
+            return dense
+        values = self._values if value == 1 else self._values.mul(value)
+        target = dense if dense.isContiguous() else dense.clone()
+        rows = 1
+        for d in range(self._nDimI):
+            rows *= self._size[d]
+        target.view(rows, -1).indexAdd_(0, self._linearIndices(),
+                values.contiguous().view(self.nnz(), -1))
+        if target is not dense:
+            dense.copy_(target)
+        return dense
+
+    def t(self):
+        return self.transpose(0, 1)
+
+    def transpose(self, dim0, dim1):
+        if dim0 >= self._nDimI or dim1 >= self._nDimI:
+            raise ValueError("only sparse dimensions can be transposed")
+        order = list(range(self._nDimI))
+        order[dim0], order[dim1] = order[dim1], order[dim0]
+        size = list(self._size)
+        size[dim0], size[dim1] = size[dim1], size[dim0]
+        if self.nnz() == 0:
+            return type(self)(size)
+        indices = self._indices.indexSelect(0, torch.LongTensor(order))
+        return type(self)(indices, self._values, size)
+
+    def zero_(self):
+        self._indices = torch.LongTensor()
+        self._values = self._values.new()
+        self._coalesced = True
+        return self
+
+    def mul_(self, value):
+        self._values.mul_(value)
+        return self
+
+    def add_(self, *args):
+        """Adds another sparse tensor of the same size (optionally scaled,
+        add_(value, other)). Its elements are appended, so the result is
+        not coalesced, unless the other tensor is empty."""
+        value, other = (1, args[0]) if len(args) == 1 else args
+        if not isinstance(other, _SparseBase):
+            raise TypeError("only sparse tensors can be added to sparse tensors")
+        if list(other._size) != list(self._size):
+            raise ValueError("sizes of sparse tensors don't match")
+        if other.nnz() == 0:
+            return self
+        values = other._values.type(self._values_type)
+        if value != 1:
+            values = values.mul(value)
+        if self.nnz() == 0:
+            self._indices = other._indices.clone()
+            self._values = values.clone()
+            self._nDimI = other._nDimI
+            self._coalesced = other._coalesced
+        elif other._nDimI != self._nDimI:
+            raise ValueError("numbers of sparse dimensions don't match")
+        else:
+            self._indices = torch.cat((self._indices, other._indices), 1)
+            self._values = torch.cat((self._values, values), 0)
+            self._coalesced = False
+        return self
+
+    def __repr__(self):
+        return '{} of size {} with {} specified elements\nindices:\n{}values:\n{}'.format(
+            self.type(), 'x'.join(str(s) for s in self._size), self.nnz(),
+            self._indices, self._values)
+
+
+class DoubleTensor(_SparseBase):
+    _values_type = torch.DoubleTensor
+class FloatTensor(_SparseBase):
+    _values_type = torch.FloatTensor
+class LongTensor(_SparseBase):
+    _values_type = torch.LongTensor
+class IntTensor(_SparseBase):
+    _values_type = torch.IntTensor
+class ShortTensor(_SparseBase):
+    _values_type = torch.ShortTensor
+class CharTensor(_SparseBase):
+    _values_type = torch.CharTensor
+class ByteTensor(_SparseBase):
+    _values_type = torch.ByteTensor
+
+
+def _group(sorted):
+    """Splits a sorted LongTensor vector into groups of equal values.
+
+    Returns the positions of the first element of every group, and the
+    (0-based) group of every element.
+    """
+    n = sorted.nElement()
+    first = torch.ByteTensor(n).fill_(1)
+    if n > 1:
+        first.narrow(0, 1, n - 1).copy_(
+            sorted.narrow(0, 1, n - 1).ne(sorted.narrow(0, 0, n - 1)))
+    group = first.long().cumsum(0).add_(-1)
+    return first.nonzero().view(-1), group
+
+
+def isSparse(obj):
+    return isinstance(obj, _SparseBase)
+
+
+def addmm(*args):
+    """addmm([result,] [beta,] t, [alpha,] sparse, dense)
+
+    Returns beta * t + alpha * (sparse * dense), like torch.addmm, for a 2D
+    sparse matrix. Duplicate elements of sparse are summed.
+    """
+    args = list(args)
+    num_tensors = sum(1 for arg in args if torch.isTensor(arg) or isSparse(arg))
+    result = args.pop(0) if num_tensors == 4 else None
+    beta = args.pop(0) if not torch.isTensor(args[0]) else 1
+    t = args.pop(0)
+    alpha = args.pop(0) if len(args) == 3 else 1
+    sparse, dense = args
+    if not isSparse(sparse) or sparse.dim() != 2 or sparse.nDimensionI() != 2:
+        raise TypeError("expected a 2D sparse matrix")
+    if sparse.size(0) != t.size(0) or sparse.size(1) != dense.size(0):
+        raise ValueError("size mismatch, t: {}, sparse: {}, dense: {}".format(
+            'x'.join(map(str, t.size())), 'x'.join(map(str, sparse.size())),
+            'x'.join(map(str, dense.size()))))
+    if sparse.nnz() == 0:
+        # Only beta * t is left (and the kernel expects 2 x nnz indices)
+        if result is None:
+            result = t.new()
+        if result is not t:
+            result.resizeAs_(t).copy_(t)
+        return result.zero_() if beta == 0 else result.mul_(beta)
+    values = sparse._values.type(type(dense))
+    if result is None:
+        return torch._C._spaddmm(beta, t, alpha, sparse._indices, values, dense)
+    return torch._C._spaddmm(result, beta, t, alpha, sparse._indices, values, dense)
+
+
+def spmm(sparse, dense):
+    """Returns the product of a 2D sparse matrix and a dense matrix."""
+    t = dense.new(sparse.size(0), dense.size(1))
+    return addmm(0, t, sparse, dense)